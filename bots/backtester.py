@@ -1,21 +1,288 @@
-from data.collectors.alpaca_collector import AlpacaCollector
+import heapq
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
 from strategy.low_risk_swing import LowRiskSwingStrategy
+from config.settings import settings
+
+TRADING_DAYS_PER_YEAR = 252
+MINUTES_PER_SESSION = 390
+
+# Event kinds, ordered so exits on a bar are processed before new entries
+EXIT, ENTRY = 0, 1
+
 
 class Backtester:
-    def __init__(self):
-        self.collector = AlpacaCollector()
-        self.strategy = LowRiskSwingStrategy()
-
-    def run(self, symbol):
-        # SDK Call: Get 1 Year of Data
-        print(f"Fetching data for {symbol}...")
-        data = self.collector.api.get_bars(
-            symbol, "1Day", limit=365
-        ).df
-        
-        # ... logic to loop through data and calculate PnL ...
-        # (Same logic as previous guide)
+    """
+    Event-driven backtest of LowRiskSwingStrategy.
+
+    Indicators and signals are computed once per series (vectorized), then the
+    simulation only visits the bars where something happens: BUY signals while
+    flat, and the exit (SELL signal or ATR stop) of each open position.
+    Sizing and stops follow OrderExecutor: MAX_POSITION_SIZE of portfolio value
+    per entry, stop at entry - ATR * STOP_LOSS_ATR_MULTIPLIER, long only.
+    """
+
+    def __init__(self, initial_capital=100_000.0, collector=None, params=None):
+        self.collector = collector
+        self.strategy = LowRiskSwingStrategy(params)
+        self.initial_capital = initial_capital
+
+    def load_data(self, symbols, start, end=None, timeframe=None):
+        """Fetches historical bars (daily by default). Returns a dict of {symbol: DataFrame}"""
+        if self.collector is None:
+            from data.collectors.alpaca_collector import AlpacaCollector
+            self.collector = AlpacaCollector()
+        print(f"Fetching data for {', '.join(symbols)}...")
+        return self.collector.fetch_historical_bars(symbols, start, end, timeframe)
+
+    def prepare(self, data):
+        """
+        Computes indicators and signals once for each series.
+        Returns a dict of {symbol: dict of NumPy arrays}
+        """
+        series = {}
+        for symbol, bars in data.items():
+            if len(bars) < 2:
+                continue
+
+            df = self.strategy.calculate_indicators(bars)
+            ind = {name: df[name].values for name in
+                   ("close", "sma_short", "sma_long", "rsi", "atr", "macd", "macd_signal")}
+
+            # Score every bar at once: 'latest' is bar t, 'prev' is bar t-1
+            score = np.zeros(len(df), dtype=np.int64)
+            score[1:] = self.strategy.score_arrays(
+                {name: values[1:] for name, values in ind.items()},
+                {name: values[:-1] for name, values in ind.items()},
+            )[0]
+
+            signal = np.zeros(len(df), dtype=np.int8)
+            signal[score >= 4] = 1
+            signal[score <= -4] = -1
+
+            series[symbol] = {
+                "time": self._to_ns(df.index),
+                "close": ind["close"].astype(np.float64),
+                "atr": ind["atr"],
+                "signal": signal,
+            }
+        return series
+
+    def simulate(self, series):
+        """
+        Replays entries and exits in time order across all symbols.
+        Returns a dict with 'equity_curve', 'trades' and 'stats'.
+        """
+        cash = self.initial_capital
+        open_positions = {}  # symbol -> trade dict
+        trades = []
+        cash_events = []     # (time, cash delta)
+        events = []          # heap of (time, kind, symbol, bar index)
+
+        # Precompute "next bar at or after i with a BUY/SELL" lookups per symbol
+        for symbol, s in series.items():
+            n = len(s["close"])
+            valid_atr = np.isfinite(s["atr"]) & (s["atr"] > 0)
+            s["next_buy"] = self._next_index((s["signal"] == 1) & valid_atr, n)
+            s["next_sell"] = self._next_index(s["signal"] == -1, n)
+            self._push_next_entry(events, symbol, s, 0)
+
+        while events:
+            time, kind, symbol, i = heapq.heappop(events)
+            s = series[symbol]
+
+            if kind == EXIT:
+                trade = open_positions.pop(symbol)
+                exit_price = s["close"][i]
+                cash += trade["qty"] * exit_price
+                cash_events.append((time, trade["qty"] * exit_price))
+
+                trade["exit_time"] = time
+                trade["exit_price"] = exit_price
+                trade["exit_index"] = i
+                trade["pnl"] = (exit_price - trade["entry_price"]) * trade["qty"]
+                trade["return"] = exit_price / trade["entry_price"] - 1
+                trades.append(trade)
+
+                self._push_next_entry(events, symbol, s, i + 1)
+                continue
+
+            # ENTRY: size off portfolio value (cash + open positions marked at this time)
+            price = s["close"][i]
+            equity = cash + sum(
+                t["qty"] * self._price_at(series[sym], time) for sym, t in open_positions.items()
+            )
+            qty = int(equity * settings.MAX_POSITION_SIZE / price)
+            if qty < 1:
+                self._push_next_entry(events, symbol, s, i + 1)
+                continue
+
+            stop_loss = price - s["atr"][i] * self.strategy.params["STOP_LOSS_ATR_MULTIPLIER"]
+            cash -= qty * price
+            cash_events.append((time, -qty * price))
+
+            exit_index, reason = self._find_exit(s, i, stop_loss)
+            open_positions[symbol] = {
+                "symbol": symbol,
+                "entry_time": time,
+                "entry_index": i,
+                "qty": qty,
+                "entry_price": price,
+                "stop_loss": stop_loss,
+                "exit_reason": reason,
+            }
+            heapq.heappush(events, (s["time"][exit_index], EXIT, symbol, exit_index))
+
+        equity_curve = self._equity_curve(series, trades, cash_events)
+        trades_df = pd.DataFrame(trades, columns=[
+            "symbol", "entry_time", "exit_time", "qty", "entry_price", "exit_price",
+            "stop_loss", "pnl", "return", "exit_reason", "entry_index", "exit_index",
+        ]).sort_values("entry_time", ignore_index=True)
+        for column in ("entry_time", "exit_time"):
+            trades_df[column] = pd.to_datetime(trades_df[column].astype(np.int64), utc=True)
+
+        return {
+            "equity_curve": equity_curve,
+            "trades": trades_df.drop(columns=["entry_index", "exit_index"]),
+            "stats": self._stats(equity_curve, trades_df),
+        }
+
+    def run(self, symbols, days=365, timeframe=None):
+        """Fetches history, runs the simulation and prints a summary"""
+        if isinstance(symbols, str):
+            symbols = [symbols]
+
+        start = datetime.utcnow() - timedelta(days=days)
+        data = self.load_data(symbols, start, timeframe=timeframe)
+        result = self.simulate(self.prepare(data))
+
+        for key, value in result["stats"].items():
+            print(f"{key:<16}: {value:.4f}" if isinstance(value, float) else f"{key:<16}: {value}")
         print("Backtest complete.")
+        return result
+
+    # ---------------------------------------------------------------- helpers
+
+    @staticmethod
+    def _to_ns(index):
+        """DatetimeIndex -> int64 nanoseconds (UTC)"""
+        return np.asarray(pd.DatetimeIndex(index).as_unit("ns").asi8, dtype=np.int64)
+
+    @staticmethod
+    def _next_index(mask, n):
+        """next[i] = first j >= i where mask[j], or n if there is none"""
+        candidates = np.where(mask, np.arange(n), n)
+        return np.minimum.accumulate(candidates[::-1])[::-1]
+
+    @staticmethod
+    def _push_next_entry(events, symbol, s, start):
+        n = len(s["close"])
+        if start < n:
+            i = s["next_buy"][start]
+            if i < n:
+                heapq.heappush(events, (s["time"][i], ENTRY, symbol, i))
+
+    @staticmethod
+    def _find_exit(s, entry, stop_loss):
+        """
+        First bar after 'entry' where a SELL fires or the close hits the stop.
+        Scans in growing blocks so the cost is proportional to the holding period.
+        Returns (bar index, reason)
+        """
+        close = s["close"]
+        n = len(close)
+        sell = s["next_sell"][entry + 1] if entry + 1 < n else n
+
+        start, block = entry + 1, 64
+        stop = n
+        while start < min(sell, n):
+            end = min(start + block, sell, n)
+            hits = np.flatnonzero(close[start:end] <= stop_loss)
+            if len(hits):
+                stop = start + hits[0]
+                break
+            start, block = end, block * 2
+
+        if stop < sell:
+            return stop, "stop_loss"
+        if sell < n:
+            return sell, "signal"
+        return n - 1, "end_of_data"
+
+    @staticmethod
+    def _price_at(s, time):
+        """Latest close at or before 'time'"""
+        i = np.searchsorted(s["time"], time, side="right") - 1
+        return s["close"][max(i, 0)]
+
+    def _equity_curve(self, series, trades, cash_events):
+        """Cash plus marked-to-market positions on the union of all bar times"""
+        if not series:
+            return pd.Series(dtype=np.float64, name="equity")
+
+        times = np.sort(np.concatenate([s["time"] for s in series.values()]))
+        times = times[np.concatenate([[True], times[1:] != times[:-1]])]
+
+        # Cash: step function of entry/exit cash flows
+        cash = np.full(len(times), self.initial_capital)
+        if cash_events:
+            event_times, deltas = map(np.asarray, zip(*sorted(cash_events)))
+            cum = np.concatenate([[0.0], np.cumsum(deltas)])
+            cash += cum[np.searchsorted(event_times, times, side="right")]
+
+        # Holdings: qty held from the entry bar up to (not including) the exit bar
+        holdings = np.zeros(len(times))
+        by_symbol = {}
+        for trade in trades:
+            by_symbol.setdefault(trade["symbol"], []).append(trade)
+
+        for symbol, symbol_trades in by_symbol.items():
+            s = series[symbol]
+            qty = np.zeros(len(s["close"]) + 1)
+            for trade in symbol_trades:
+                qty[trade["entry_index"]] += trade["qty"]
+                qty[trade["exit_index"]] -= trade["qty"]
+            value = np.cumsum(qty[:-1]) * s["close"]
+
+            # Forward-fill onto the union timeline
+            idx = np.searchsorted(s["time"], times, side="right") - 1
+            holdings += np.where(idx >= 0, value[np.maximum(idx, 0)], 0.0)
+
+        index = pd.to_datetime(times, utc=True)
+        return pd.Series(cash + holdings, index=index, name="equity")
+
+    def _stats(self, equity_curve, trades):
+        if equity_curve.empty:
+            return {}
+
+        returns = equity_curve.pct_change().dropna()
+        drawdown = equity_curve / equity_curve.cummax() - 1
+        periods = self._periods_per_year(equity_curve.index)
+        sharpe = 0.0
+        if len(returns) > 1 and returns.std() > 0:
+            sharpe = float(np.sqrt(periods) * returns.mean() / returns.std())
+
+        return {
+            "final_equity": float(equity_curve.iloc[-1]),
+            "total_return": float(equity_curve.iloc[-1] / self.initial_capital - 1),
+            "max_drawdown": float(drawdown.min()),
+            "sharpe": sharpe,
+            "trades": int(len(trades)),
+            "win_rate": float((trades["pnl"] > 0).mean()) if len(trades) else 0.0,
+        }
+
+    @staticmethod
+    def _periods_per_year(index):
+        """Annualization factor inferred from the median bar spacing"""
+        if len(index) < 2:
+            return TRADING_DAYS_PER_YEAR
+        spacing = pd.Series(index).diff().median()
+        if spacing >= pd.Timedelta(days=1):
+            return TRADING_DAYS_PER_YEAR
+        bars_per_session = pd.Timedelta(minutes=MINUTES_PER_SESSION) / spacing
+        return TRADING_DAYS_PER_YEAR * bars_per_session
+
 
 if __name__ == "__main__":
-    Backtester().run("SPY")
\ No newline at end of file
+    Backtester().run("SPY")
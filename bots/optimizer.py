@@ -0,0 +1,217 @@
+import itertools
+import math
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+from bots.backtester import Backtester
+from strategy.indicators import Indicators, get_indicators
+from strategy.low_risk_swing import STRATEGY_PARAMS
+
+# Params that change indicator columns; sets sharing them reuse cached columns
+INDICATOR_PARAMS = ("SMA_SHORT", "SMA_LONG", "RSI_PERIOD")
+FIELDS = ("high", "low", "close")
+
+# Per-process state, set up once by _init_worker
+_worker = {}
+
+
+class CachedIndicators(Indicators):
+    """
+    Indicators bound to ONE price series that memoize every (indicator, args)
+    result, so parameter sets sharing e.g. SMA_LONG compute it only once.
+    """
+
+    def __init__(self, max_entries=64, backend=None):
+        self.max_entries = max_entries
+        self.base = get_indicators(backend)  # computes the misses
+        self._cache = {}
+
+    def _cached(self, key, compute):
+        if key not in self._cache:
+            if len(self._cache) >= self.max_entries:
+                # Evict the oldest entry (dicts keep insertion order)
+                self._cache.pop(next(iter(self._cache)))
+            self._cache[key] = compute()
+        return self._cache[key]
+
+    def sma(self, data, period):
+        return self._cached(("sma", period), lambda: self.base.sma(data, period))
+
+    def ema(self, data, period):
+        return self._cached(("ema", period), lambda: self.base.ema(data, period))
+
+    def rsi(self, data, period=14):
+        return self._cached(("rsi", period), lambda: self.base.rsi(data, period))
+
+    def atr(self, data, period=14):
+        return self._cached(("atr", period), lambda: self.base.atr(data, period))
+
+    def macd(self, data, fast=12, slow=26, signal=9):
+        return self._cached(("macd", fast, slow, signal), lambda: self.base.macd(data, fast, slow, signal))
+
+
+class SharedPriceData:
+    """
+    Packs every symbol's timestamps and high/low/close into one shared memory
+    block, so worker processes map the prices instead of unpickling a copy.
+    """
+
+    def __init__(self, data):
+        self.layout = {}
+        total = 0
+        for symbol, bars in data.items():
+            self.layout[symbol] = (total, total + len(bars))
+            total += len(bars)
+        self.total = total
+
+        self.shm = shared_memory.SharedMemory(create=True, size=max(total, 1) * 8 * (len(FIELDS) + 1))
+        block = self._view(self.shm, total)
+        for symbol, bars in data.items():
+            start, end = self.layout[symbol]
+            block[0, start:end].view(np.int64)[:] = pd.DatetimeIndex(bars.index).as_unit("ns").asi8
+            for row, field in enumerate(FIELDS, start=1):
+                block[row, start:end] = bars[field].values
+
+    @property
+    def spec(self):
+        """Picklable handle passed to the workers"""
+        return self.shm.name, self.total, self.layout
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+    @staticmethod
+    def _view(shm, total):
+        # Row 0 holds int64 nanosecond timestamps, the rest float64 prices
+        return np.ndarray((len(FIELDS) + 1, total), dtype=np.float64, buffer=shm.buf)
+
+    @staticmethod
+    def attach(spec):
+        """Maps the block in a worker. Returns (shm, {symbol: DataFrame})"""
+        name, total, layout = spec
+        shm = shared_memory.SharedMemory(name=name)
+        block = SharedPriceData._view(shm, total)
+
+        frames = {}
+        for symbol, (start, end) in layout.items():
+            index = pd.to_datetime(block[0, start:end].view(np.int64), utc=True)
+            # A 2-D view becomes a single DataFrame block without copying prices
+            frames[symbol] = pd.DataFrame(block[1:, start:end].T, index=index, columns=FIELDS, copy=False)
+        return shm, frames
+
+
+def _init_worker(spec, initial_capital):
+    shm, frames = SharedPriceData.attach(spec)
+    _worker["shm"] = shm  # keep the mapping alive
+    _worker["frames"] = frames
+    _worker["caches"] = {symbol: CachedIndicators() for symbol in frames}
+    _worker["initial_capital"] = initial_capital
+
+
+def _run_param_sets(param_sets):
+    """Backtests each parameter set against the worker's shared prices"""
+    results = []
+    for params in param_sets:
+        backtester = Backtester(_worker["initial_capital"], params=params)
+
+        series = {}
+        for symbol, frame in _worker["frames"].items():
+            backtester.strategy.indicators = _worker["caches"][symbol]
+            series.update(backtester.prepare({symbol: frame}))
+
+        stats = backtester.simulate(series)["stats"]
+        results.append({**params, **stats})
+    return results
+
+
+class ParameterSweep:
+    """
+    Grid or random search over STRATEGY_PARAMS, fanned out across a process pool.
+    Prices live in shared memory and indicator columns are cached per worker,
+    with parameter sets that share indicator periods sent to the same worker.
+    """
+
+    def __init__(self, data, initial_capital=100_000.0, workers=None):
+        self.data = data
+        self.initial_capital = initial_capital
+        self.workers = workers or os.cpu_count()
+
+    @staticmethod
+    def grid(param_grid):
+        """All combinations of {param: [values]}"""
+        names = list(param_grid)
+        return [dict(zip(names, values)) for values in itertools.product(*param_grid.values())]
+
+    @staticmethod
+    def random(param_space, n_iter, seed=None):
+        """
+        n_iter random draws from {param: [choices] or (low, high)}.
+        Integer (low, high) bounds draw integers, otherwise floats.
+        """
+        rng = random.Random(seed)
+        param_sets = []
+        for _ in range(n_iter):
+            params = {}
+            for name, space in param_space.items():
+                if isinstance(space, tuple):
+                    low, high = space
+                    if isinstance(low, int) and isinstance(high, int):
+                        params[name] = rng.randint(low, high)
+                    else:
+                        params[name] = rng.uniform(low, high)
+                else:
+                    params[name] = rng.choice(space)
+            param_sets.append(params)
+        return param_sets
+
+    def run(self, param_sets, metric="sharpe"):
+        """Backtests every parameter set. Returns a DataFrame sorted by 'metric'"""
+        param_sets = [p for p in param_sets if self._is_valid(p)]
+        if not param_sets:
+            return pd.DataFrame()
+
+        # Neighbouring sets share indicator periods, so chunks hit the same cache
+        param_sets.sort(key=lambda p: tuple(p.get(name, 0) for name in INDICATOR_PARAMS))
+        chunk_size = max(1, math.ceil(len(param_sets) / (self.workers * 4)))
+        chunks = [param_sets[i:i + chunk_size] for i in range(0, len(param_sets), chunk_size)]
+
+        shared = SharedPriceData(self.data)
+        try:
+            with ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(shared.spec, self.initial_capital),
+            ) as pool:
+                results = [row for chunk in pool.map(_run_param_sets, chunks) for row in chunk]
+        finally:
+            shared.close()
+
+        return pd.DataFrame(results).sort_values(metric, ascending=False, ignore_index=True)
+
+    @staticmethod
+    def _is_valid(params):
+        unknown = set(params) - set(STRATEGY_PARAMS)
+        if unknown:
+            raise ValueError(f"Unknown strategy params: {', '.join(sorted(unknown))}")
+        if "SMA_SHORT" in params and "SMA_LONG" in params:
+            return params["SMA_SHORT"] < params["SMA_LONG"]
+        return True
+
+
+if __name__ == "__main__":
+    backtester = Backtester()
+    data = backtester.load_data(["SPY", "QQQ"], datetime.utcnow() - timedelta(days=5 * 365))
+
+    sweep = ParameterSweep(data)
+    results = sweep.run(sweep.grid({
+        "SMA_SHORT": [10, 20, 30],
+        "SMA_LONG": [50, 100, 200],
+        "RSI_PERIOD": [7, 14, 21],
+        "STOP_LOSS_ATR_MULTIPLIER": [1.5, 2.0, 3.0],
+    }))
+    print(results.head(10).to_string())
@@ -1,32 +1,67 @@
+import queue
+import threading
 import time
-from data.collectors.alpaca_collector import AlpacaCollector
-from strategy.low_risk_swing import LowRiskSwingStrategy
-from trading.order_executor import OrderExecutor
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from bots.scheduler import MarketScheduler
+from data.storage.bar_aggregator import BarAggregator, lookback_days
+from data.storage.write_behind import write_behind
+from monitoring.metrics import metrics
 from notifications.discord_logger import discord_logger 
 from config.settings import settings
 
 class TradingBot:
-    def __init__(self):
-        self.collector = AlpacaCollector()
-        self.strategy = LowRiskSwingStrategy()
-        self.executor = OrderExecutor()
-        self.symbols = settings.SYMBOLS 
+    def __init__(self, collector=None, strategy=None, executor=None, symbols=None, recorder=None):
+        # Any component can be swapped out (e.g. for offline runs and benchmarks).
+        # Defaults are imported here, so stand-ins never load alpaca-py or the DB layer.
+        if collector is None:
+            from data.collectors.alpaca_collector import AlpacaCollector
+            collector = AlpacaCollector()
+        if strategy is None:
+            from strategy.low_risk_swing import LowRiskSwingStrategy
+            strategy = LowRiskSwingStrategy()
+        if executor is None:
+            from trading.order_executor import OrderExecutor
+            executor = OrderExecutor()
+
+        self.collector = collector
+        self.strategy = strategy
+        self.executor = executor
+        self.symbols = symbols or settings.SYMBOLS 
+        # Every evaluated signal is stored through the write-behind queue
+        self.recorder = recorder or (write_behind if settings.RECORD_SIGNALS else None)
+
+        # Higher strategy timeframes are built from the minute bars, not fetched
+        self.timeframe = getattr(self.strategy, "timeframe", "1Min")
+        self.aggregator = BarAggregator([self.timeframe]) if self.timeframe != "1Min" else None
+        self._seeded = set()
+        # Pre-filter on the streaming indicator state (batched/pipelined cycles),
+        # for universes large enough to pay off (SCREEN_MIN_SYMBOLS)
+        params = getattr(self.strategy, "params", None)
+        self.screener = None
+        if (
+            settings.SCREEN_SIGNALS and settings.INCREMENTAL_INDICATORS and params is not None
+            and len(self.symbols) >= settings.SCREEN_MIN_SYMBOLS
+        ):
+            from strategy.screener import Screener
+            self.screener = Screener(params)
+        self.stream = None
+        self.pending_signals = []  # (symbol, signal, price, atr, signal_time) awaiting execution
+        self._last_bar_time = None
     
     def start(self):
+        """
+        Poll mode: one cycle per MarketScheduler slot. Closed markets are
+        slept through using the cached calendar, without polling the clock.
+        """
         discord_logger.log_system("🚀 Bot Started")
+        self.load_state()
+        scheduler = MarketScheduler(self.collector)
         while True:
             try:
-                # FIX 1: Use the new SDK Clock (via the collector's client)
-                # The 'api' attribute does not exist in alpaca-py
-                clock = self.collector.trading_client.get_clock()
-                
-                if clock.is_open:
-                    self.run_cycle()
-                else:
-                    # 'next_open' is a datetime object in the new SDK
-                    print(f"Market Closed. Opens at {clock.next_open}")
-                
-                time.sleep(settings.STRATEGY_EVAL_INTERVAL * 60)
+                scheduler.wait()
+                self.run_cycle()
             
             except KeyboardInterrupt:
                 discord_logger.log_system("🛑 Bot Stopped")
@@ -35,44 +70,371 @@ class TradingBot:
                 discord_logger.log_error(f"Critical Bot Error: {e}")
                 time.sleep(60)
     
+    def load_state(self):
+        """Loads open trades and today's entry count once, so cycles never wait on the DB for them"""
+        try:
+            self.executor.load()
+        except Exception as e:
+            # Retried on first use
+            discord_logger.log_error(f"Error loading trade state: {e}")
+
+    def run_simulation(self, market, interval=None):
+        """
+        The polling loop against a SimulatedMarket: instead of sleeping,
+        the market clock is advanced by the evaluation interval, so a full
+        trading day replays as fast as the cycles run. Returns the cycle count.
+        """
+        interval = interval or settings.STRATEGY_EVAL_INTERVAL
+        discord_logger.log_system("🚀 Bot Started (simulation)")
+        self.load_state()
+        cycles = 0
+        while True:
+            if self.collector.get_clock().is_open:
+                self.run_cycle()
+                cycles += 1
+            if not market.advance(minutes=interval):
+                break
+        discord_logger.log_system("🛑 Simulation finished")
+        return cycles
+
+    def start_streaming(self, source=None):
+        """
+        Evaluates each symbol as soon as its new minute bar arrives over the
+        websocket, instead of polling REST every STRATEGY_EVAL_INTERVAL minutes.
+        'source' can replace the live feed (e.g. a ReplayBarSource).
+        """
+        from data.collectors.alpaca_stream import AlpacaStreamCollector
+
+        discord_logger.log_system("🚀 Bot Started (streaming)")
+        self.load_state()
+        self.stream = AlpacaStreamCollector(self.symbols, on_bar=self.on_bar, source=source)
+
+        # Warm up the windows (and indicators) once from REST history
+        try:
+            self.stream.seed(self.collector.fetch_bars_batch(self.symbols, limit=100))
+        except Exception as e:
+            discord_logger.log_error(f"Error seeding stream history: {e}")
+
+        try:
+            self.stream.start()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            discord_logger.flush_cycle()
+            discord_logger.log_system("🛑 Bot Stopped")
+
+    def on_bar(self, symbol, bars):
+        """Stream callback: runs analysis and execution for one new bar (BarRingBuffer)"""
+        # A new minute starts a new "cycle" for the Discord debug embeds
+        bar_time = bars.last_time
+        if self._last_bar_time is not None and bar_time > self._last_bar_time:
+            discord_logger.flush_cycle()
+            self.executor.account.invalidate()
+        self._last_bar_time = bar_time
+
+        price = float(bars.last('close'))
+        self.enforce_stops({symbol: price})
+
+        try:
+            self.process_symbol(symbol, bars, current_price=price)
+        except Exception as e:
+            discord_logger.log_error(f"Error processing {symbol}: {str(e)}")
+        self.execute_pending()
+
     def run_cycle(self):
+        started = time.perf_counter()
         discord_logger.log_stage("Cycle Start", "Beginning analysis...")
 
-        for symbol in self.symbols:
+        # Account/positions are reloaded (lazily) once per cycle
+        self.executor.account.invalidate()
+
+        if settings.PIPELINED_CYCLE:
+            self.run_pipelined_cycle()
+        elif settings.BATCH_FETCH:
+            self.run_batched_cycle()
+        else:
+            prices = {}
+            for symbol in self.symbols:
+                try:
+                    # STAGE 1: Data
+                    # Note: alpaca-py returns a Multi-Index DataFrame (Symbol, Timestamp)
+                    data = self.collector.fetch_latest_bars(symbol, limit=100)
+                    
+                    if data.empty:
+                        discord_logger.log_stage("Skipping", "No data found.", symbol)
+                        continue
+                    
+                    # We must drop the 'symbol' index level so the strategy just sees price columns
+                    # If we don't do this, the strategy will fail to find 'close', 'open', etc.
+                    single_symbol_data = data.loc[symbol] if symbol in data.index else data
+                    prices[symbol] = float(single_symbol_data['close'].iloc[-1])
+
+                    self.process_symbol(symbol, single_symbol_data)
+                    
+                except Exception as e:
+                    discord_logger.log_error(f"Error processing {symbol}: {str(e)}")
+
+            self.enforce_stops(prices)
+
+        # STAGE 3: Execution (all of this cycle's orders, concurrently)
+        self.execute_pending()
+        
+        # One embed per symbol with all of its stages from this cycle
+        discord_logger.flush_cycle()
+        discord_logger.log_stage("Cycle End", f"Sleeping for {settings.STRATEGY_EVAL_INTERVAL} mins... 💤")
+        self.record_cycle(time.perf_counter() - started)
+
+    def record_cycle(self, elapsed):
+        """Cycle timing; a cycle longer than the evaluation interval is an overrun"""
+        metrics.observe("cycle_seconds", elapsed)
+        metrics.set("last_cycle_seconds", elapsed)
+        metrics.set("discord_queue_depth", discord_logger.queue.qsize())
+
+        if elapsed > settings.STRATEGY_EVAL_INTERVAL * 60:
+            metrics.inc("cycle_overruns_total")
+            discord_logger.log_error(
+                f"Cycle overrun: took {elapsed:.1f}s (interval is {settings.STRATEGY_EVAL_INTERVAL * 60}s)"
+            )
+
+    def run_batched_cycle(self):
+        """
+        Fetches every symbol's bars in one (chunked) request instead of
+        one round trip per symbol, then analyzes each symbol in turn.
+        """
+        # STAGE 1: Data (one request per chunk of symbols)
+        try:
+            bars_by_symbol = self.collector.fetch_bars_batch(self.symbols, limit=100)
+        except Exception as e:
+            discord_logger.log_error(f"Error fetching bars: {str(e)}")
+            return
+
+        self.analyze_bars(bars_by_symbol, self.symbols)
+
+    def analyze_bars(self, bars_by_symbol, symbols):
+        """STAGE 2 for already-fetched bars: stop checks, then one signal per symbol"""
+        # Stops first, against the freshest close of every symbol
+        self.enforce_stops({
+            symbol: float(data['close'].iloc[-1])
+            for symbol, data in bars_by_symbol.items() if not data.empty
+        })
+
+        if self.aggregator:
+            self.seed_timeframes([s for s in symbols if s not in self._seeded])
+
+        if settings.VECTORIZED_SIGNALS:
+            self.run_vectorized_analysis(bars_by_symbol, symbols)
+            return
+        if self.screener is not None:
+            symbols = self.screen(bars_by_symbol, symbols)
+
+        for symbol in symbols:
             try:
-                # STAGE 1: Data
-                # Note: alpaca-py returns a Multi-Index DataFrame (Symbol, Timestamp)
-                data = self.collector.fetch_latest_bars(symbol, limit=100)
-                
-                if data.empty:
+                data = bars_by_symbol.get(symbol)
+                if data is None or data.empty:
                     discord_logger.log_stage("Skipping", "No data found.", symbol)
                     continue
-                
-                # FIX 2: Handle Multi-Index
-                # We must drop the 'symbol' index level so the strategy just sees price columns
-                # If we don't do this, the strategy will fail to find 'close', 'open', etc.
-                single_symbol_data = data.loc[symbol] if symbol in data.index else data
-                
-                # STAGE 2: Analysis
-                signal, score, reason, atr, debug_data = self.strategy.generate_signal(single_symbol_data)
-                
-                # Log detailed numbers
-                discord_logger.log_stage(
-                    "Analysis", 
-                    f"Score: {score}/10", 
-                    symbol, 
-                    details=debug_data
-                )
 
-                # STAGE 3: Decision & Execution
-                if signal != 'HOLD':
-                    # FIX 3: Use log_stage for decision (consistent with new logger)
-                    discord_logger.log_stage("Decision", f"🚨 SIGNAL: {signal}\nReason: {reason}", symbol)
-                    
-                    current_price = self.collector.get_current_price(symbol)
-                    self.executor.execute_signal(symbol, signal, current_price, atr)
-                
+                # The last bar's close doubles as the execution price,
+                # which saves a second round trip per signal
+                self.process_symbol(symbol, data, current_price=float(data['close'].iloc[-1]))
+
             except Exception as e:
                 discord_logger.log_error(f"Error processing {symbol}: {str(e)}")
+
+    def screen(self, bars_by_symbol, symbols):
+        """
+        Drops the symbols that cannot produce a BUY/SELL on their latest bar
+        (see Screener) before any per-symbol evaluation or logging. Symbols
+        without data are kept, so they are still reported as skipped.
+        """
+        bars = {}
+        for symbol in symbols:
+            data = bars_by_symbol.get(symbol)
+            if data is not None and not data.empty:
+                bars[symbol] = self.strategy_bars(symbol, data)
+
+        with metrics.timer("stage_seconds", stage="screen"):
+            survivors = set(self.screener.survivors(bars))
+        metrics.inc("symbols_screened_out_total", len(bars) - len(survivors))
+        return [symbol for symbol in symbols if symbol in survivors or symbol not in bars]
+
+    def run_pipelined_cycle(self):
+        """
+        Overlaps the three stages across chunks of symbols: chunk i+1 is
+        fetched while chunk i is analyzed and chunk i-1's orders go out.
+        Bounded queues between the stages cap how many chunks are in flight.
+        Every stage is FIFO, so symbols are analyzed, logged and executed in
+        the same order as in a serial cycle.
+        """
+        size = settings.PIPELINE_CHUNK_SIZE
+        chunks = [self.symbols[i:i + size] for i in range(0, len(self.symbols), size)]
+        fetched = queue.Queue(maxsize=settings.PIPELINE_DEPTH)
+        orders = queue.Queue(maxsize=settings.PIPELINE_DEPTH)
+
+        fetcher = threading.Thread(target=self._fetch_stage, args=(chunks, fetched), name="pipeline-fetch", daemon=True)
+        executor = threading.Thread(target=self._execute_stage, args=(orders,), name="pipeline-execute", daemon=True)
+        fetcher.start()
+        executor.start()
+
+        # STAGE 2: Analysis, on this thread, one chunk at a time
+        try:
+            while True:
+                item = fetched.get()
+                if item is None:
+                    break
+                chunk, bars_by_symbol = item
+                self.analyze_bars(bars_by_symbol, chunk)
+
+                signals, self.pending_signals = self.pending_signals, []
+                orders.put(signals)
+        finally:
+            orders.put(None)
+            # Unblock the fetcher if analysis stopped early
+            while fetcher.is_alive():
+                try:
+                    fetched.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            executor.join()
+
+    def _fetch_stage(self, chunks, fetched):
+        """STAGE 1: up to FETCH_WORKERS chunk requests in flight, queued in chunk order"""
+        with ThreadPoolExecutor(max_workers=settings.FETCH_WORKERS, thread_name_prefix="fetch") as pool:
+            in_flight = deque()
+            for chunk in chunks:
+                in_flight.append((chunk, pool.submit(self.collector.fetch_bars_batch, chunk, limit=100)))
+                if len(in_flight) >= settings.FETCH_WORKERS:
+                    self._queue_fetched(*in_flight.popleft(), fetched)
+            while in_flight:
+                self._queue_fetched(*in_flight.popleft(), fetched)
+        fetched.put(None)
+
+    @staticmethod
+    def _queue_fetched(chunk, future, fetched):
+        try:
+            fetched.put((chunk, future.result()))
+        except Exception as e:
+            # Only this chunk's symbols are skipped
+            discord_logger.log_error(f"Error fetching bars for {', '.join(chunk)}: {str(e)}")
+
+    def _execute_stage(self, orders):
+        """STAGE 3: submits each chunk's signals as they come off the queue"""
+        while True:
+            signals = orders.get()
+            if signals is None:
+                break
+            try:
+                self.executor.execute_signals(signals)
+            except Exception as e:
+                discord_logger.log_error(f"Error executing orders: {str(e)}")
+
+    def enforce_stops(self, prices):
+        """Closes any open position whose stop is hit by 'prices' ({symbol: price})"""
+        try:
+            for action in self.executor.check_risk_management(prices):
+                discord_logger.log_system(f"🛑 {action}")
+        except Exception as e:
+            discord_logger.log_error(f"Error checking stops: {str(e)}")
+
+    def strategy_bars(self, symbol, minute_bars):
+        """What the strategy evaluates: the minute bars, or its closed timeframe bars built from them"""
+        if self.aggregator is None:
+            return minute_bars
+        if symbol not in self._seeded:
+            self.seed_timeframes([symbol])
+        self.aggregator.extend(symbol, minute_bars)
+        window = self.aggregator.window(symbol, self.timeframe, closed_only=True)
+        return window if window is not None else []
+
+    def seed_timeframes(self, symbols):
+        """Fills the timeframe windows from one minute-history request (served by the bar cache when possible)"""
+        if not symbols:
+            return
+        from alpaca.data.timeframe import TimeFrame
+
+        self._seeded.update(symbols)
+        try:
+            now = self.collector.get_clock().timestamp
+            start = now - timedelta(days=lookback_days(self.timeframe, self.aggregator.capacity))
+            history = self.collector.fetch_historical_bars(symbols, start, now, timeframe=TimeFrame.Minute)
+        except Exception as e:
+            discord_logger.log_error(f"Error loading {self.timeframe} history: {str(e)}")
+            return
+
+        for symbol, bars in history.items():
+            self.aggregator.extend(symbol, bars)
+
+    def run_vectorized_analysis(self, bars_by_symbol, symbols=None):
+        """Scores the whole universe in one vectorized pass, then acts per symbol"""
+        if self.aggregator:
+            bars_by_symbol = {s: self.strategy_bars(s, df) for s, df in bars_by_symbol.items()}
+            bars_by_symbol = {s: bars.frame() for s, bars in bars_by_symbol.items() if len(bars)}
+
+        available = []
+        for symbol in symbols or self.symbols:
+            data = bars_by_symbol.get(symbol)
+            if data is None or data.empty:
+                discord_logger.log_stage("Skipping", "No data found.", symbol)
+            else:
+                available.append(symbol)
+
+        if not available:
+            return
+
+        # STAGE 2: Analysis (all symbols at once)
+        results = self.strategy.generate_signals_batch(bars_by_symbol, symbols=available)
+
+        for symbol, row in results.iterrows():
+            try:
+                self.act_on_signal(
+                    symbol, row['signal'], row['score'], row['reason'], row['atr'],
+                    self.strategy.debug_data(row), current_price=float(row['close'])
+                )
+            except Exception as e:
+                discord_logger.log_error(f"Error processing {symbol}: {str(e)}")
+
+    def process_symbol(self, symbol, data, current_price=None):
+        """Runs analysis and execution for one symbol's (minute) bars"""
+        data = self.strategy_bars(symbol, data)
+        if len(data) == 0:
+            discord_logger.log_stage("Skipping", f"No {self.timeframe} bars yet.", symbol)
+            return
+
+        # STAGE 2: Analysis
+        # A short sample window per symbol keeps the per-symbol series cheap on large universes
+        with metrics.timer("symbol_seconds", window=settings.METRICS_SYMBOL_WINDOW, symbol=symbol):
+            signal, score, reason, atr, debug_data = self.strategy.generate_signal(data, symbol=symbol)
+        if self.screener is not None:
+            self.screener.remember(symbol, self.strategy.streams.get(symbol), signal)
         
-        discord_logger.log_stage("Cycle End", f"Sleeping for {settings.STRATEGY_EVAL_INTERVAL} mins... 💤")
\ No newline at end of file
+        self.act_on_signal(symbol, signal, score, reason, atr, debug_data, current_price)
+
+    def act_on_signal(self, symbol, signal, score, reason, atr, debug_data, current_price=None):
+        """Logs the analysis and executes any non-HOLD signal"""
+        # Log detailed numbers
+        discord_logger.log_stage(
+            "Analysis", 
+            f"Score: {score}/10", 
+            symbol, 
+            details=debug_data
+        )
+        # The recorded row's timestamp is its key when it is flagged as executed
+        signal_time = datetime.utcnow()
+        if self.recorder:
+            self.recorder.record_signal(symbol, signal, debug_data, timestamp=signal_time)
+
+        # STAGE 3: Decision (orders go out together in execute_pending)
+        if signal != 'HOLD':
+            discord_logger.log_stage("Decision", f"🚨 SIGNAL: {signal}\nReason: {reason}", symbol)
+            
+            if current_price is None:
+                current_price = self.collector.get_current_price(symbol)
+            self.pending_signals.append((symbol, signal, current_price, atr, signal_time))
+
+    def execute_pending(self):
+        """Submits every signal gathered since the last call as one concurrent batch"""
+        signals, self.pending_signals = self.pending_signals, []
+        try:
+            self.executor.execute_signals(signals)
+        except Exception as e:
+            discord_logger.log_error(f"Error executing orders: {str(e)}")
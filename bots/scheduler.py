@@ -0,0 +1,119 @@
+import math
+import time
+from datetime import datetime, timedelta
+from data.storage.bar_aggregator import MARKET_TZ
+from monitoring.metrics import metrics
+from notifications.discord_logger import discord_logger
+from config.settings import settings
+
+
+class MarketScheduler:
+    """
+    Decides when poll-mode cycles run. Market sessions come from a cached
+    copy of the exchange calendar (refreshed once a day), so nights,
+    weekends and holidays are slept through without any API calls.
+
+    Within a session, cycles start on the STRATEGY_EVAL_INTERVAL grid of
+    bar closes (9:33, 9:36, ... for 3 minutes) plus CYCLE_SETTLE_SECONDS
+    for the bars to be published, instead of one interval after the
+    previous cycle ended. After a cycle overruns its slot, the next slot
+    still runs (at once) if it is at most CYCLE_MAX_LATE_SECONDS past;
+    slots further behind are skipped. How late each cycle starts is
+    reported as drift.
+    """
+
+    def __init__(self, collector, interval=None, settle=None, max_late=None, clock=None, sleep=None):
+        self.collector = collector
+        self.interval = (interval or settings.STRATEGY_EVAL_INTERVAL) * 60
+        self.settle = settings.CYCLE_SETTLE_SECONDS if settle is None else settle
+        self.max_late = settings.CYCLE_MAX_LATE_SECONDS if max_late is None else max_late
+        # Epoch seconds / sleep function (replaceable for offline runs)
+        self.clock = clock or time.time
+        self.sleep = sleep or time.sleep
+
+        self.sessions = []      # [(open, close)] in epoch seconds
+        self._fetched = None    # New York date of the last calendar request
+        self.last_slot = None   # start time of the last cycle
+        self._last_open = None  # its session's open
+        self._announced = None  # session open last reported as "Market Closed"
+        self.skipped = 0
+
+    def wait(self):
+        """Sleeps until the next cycle slot, then returns it (epoch seconds)"""
+        while True:
+            now = self.clock()
+            slot, session_open = self.next_slot(now)
+            if slot is None:
+                # Nothing in the calendar or the clock: look again in an interval
+                self.sleep(self.interval)
+                continue
+            if slot <= now:
+                break
+
+            if now < session_open and self._announced != session_open:
+                self._announced = session_open
+                print(f"Market Closed. Opens at {datetime.fromtimestamp(session_open, MARKET_TZ)}")
+            # Woken at least hourly: the calendar is refreshed daily, and the
+            # wall clock can jump (suspend, NTP) during a long sleep
+            self.sleep(min(slot - now, 3600))
+
+        self._record(slot, session_open, now)
+        return slot
+
+    def _record(self, slot, session_open, now):
+        if self.last_slot is not None and session_open == self._last_open:
+            skipped = round((slot - self.last_slot) / self.interval) - 1
+            if skipped > 0:
+                self.skipped += skipped
+                metrics.inc("cycle_slots_skipped_total", skipped)
+                discord_logger.log_error(f"Previous cycle overran: skipped {skipped} cycle(s)")
+
+        drift = now - slot
+        metrics.observe("cycle_start_drift_seconds", drift)
+        metrics.set("last_cycle_start_drift_seconds", drift)
+        self.last_slot = slot
+        self._last_open = session_open
+
+    def next_slot(self, now):
+        """(slot, session open) of the first cycle not yet run and not too late, or (None, None)"""
+        earliest = now - self.max_late
+        if self.last_slot is not None:
+            earliest = max(earliest, self.last_slot + 1)
+
+        for session_open, session_close in self.sessions_ahead(now):
+            # The session's first bar has to close before the first cycle
+            first = (session_open // self.interval + 1) * self.interval
+            boundary = max(first, math.ceil((earliest - self.settle) / self.interval) * self.interval)
+            slot = boundary + self.settle
+            if slot < session_close:
+                return slot, session_open
+        return None, None
+
+    def sessions_ahead(self, now):
+        """Cached sessions that have not closed yet"""
+        today = datetime.fromtimestamp(now, MARKET_TZ).date()
+        if self._fetched != today or not any(close > now for _, close in self.sessions):
+            self.refresh(today, now)
+        return [(o, c) for o, c in self.sessions if c > now]
+
+    def refresh(self, today, now):
+        """
+        Reloads CALENDAR_DAYS of sessions (early closes included). If the
+        calendar is unavailable, the cached sessions are kept, and once
+        those run out the market clock gives the current or next session.
+        """
+        sessions = self.sessions
+        try:
+            calendar = self.collector.get_calendar(today, today + timedelta(days=settings.CALENDAR_DAYS))
+            sessions = [(o.timestamp(), c.timestamp()) for o, c in calendar]
+        except Exception as e:
+            discord_logger.log_error(f"Market calendar refresh failed: {e}")
+
+        if not any(close > now for _, close in sessions):
+            clock = self.collector.get_clock()
+            session_open = clock.timestamp if clock.is_open else clock.next_open
+            sessions = [(session_open.timestamp(), clock.next_close.timestamp())]
+
+        self.sessions = sorted(sessions)
+        self._fetched = today
+        metrics.inc("calendar_refreshes_total")
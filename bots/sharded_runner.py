@@ -0,0 +1,298 @@
+import bisect
+import hashlib
+import multiprocessing
+import threading
+import time
+from multiprocessing.connection import wait
+from types import SimpleNamespace
+from bots.runner import TradingBot
+from data.storage.write_behind import WriteBehindWriter, write_behind
+from monitoring.metrics import metrics
+from notifications.discord_logger import discord_logger
+from config.settings import settings
+
+
+def _hash(key):
+    # hashlib, not hash(): placement must agree across processes and machines
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """
+    Consistent hashing of symbols onto named shards. Each shard owns
+    'replicas' points on the ring and a symbol belongs to the first point
+    at or after its hash, so adding or removing a shard only moves about
+    1/N of the symbols. Shard names are opaque: "shard-0" today, a
+    "host:worker" name once shards live on several nodes.
+    """
+
+    def __init__(self, shards=(), replicas=64):
+        self.replicas = replicas
+        self._keys = []    # sorted point hashes
+        self._shards = []  # shard owning each point
+        for shard in shards:
+            self.add(shard)
+
+    def add(self, shard):
+        for i in range(self.replicas):
+            key = _hash(f"{shard}#{i}")
+            at = bisect.bisect(self._keys, key)
+            self._keys.insert(at, key)
+            self._shards.insert(at, shard)
+
+    def remove(self, shard):
+        points = [(k, s) for k, s in zip(self._keys, self._shards) if s != shard]
+        self._keys = [k for k, _ in points]
+        self._shards = [s for _, s in points]
+
+    def shard_for(self, symbol):
+        if not self._keys:
+            raise ValueError("HashRing has no shards")
+        return self._shards[bisect.bisect_left(self._keys, _hash(symbol)) % len(self._keys)]
+
+    def assign(self, symbols):
+        """{shard: [symbols]}, each list in the order given"""
+        shards = {}
+        for symbol in symbols:
+            shards.setdefault(self.shard_for(symbol), []).append(symbol)
+        return shards
+
+
+class ShardExecutor:
+    """
+    Executor stand-in inside a worker: signals and the prices for stop
+    checks are handed back to the coordinator instead of being traded.
+    """
+
+    account = SimpleNamespace(invalidate=lambda: None)
+
+    def __init__(self):
+        self.signals = []
+        self.prices = {}
+
+    def load(self):
+        pass  # trades are the coordinator's
+
+    def check_risk_management(self, current_prices):
+        self.prices.update(current_prices)
+        return []
+
+    def execute_signals(self, signals):
+        self.signals.extend(signals)
+
+    def take(self):
+        """This cycle's (signals, prices), emptying both"""
+        taken = (self.signals, self.prices)
+        self.signals, self.prices = [], {}
+        return taken
+
+
+class ExecutedRelay:
+    """
+    Recorder for the coordinator's OrderExecutor. Trades are recorded by
+    'recorder' as usual, but the executed flag of a signal is handed back
+    to the shard that recorded it (with its next command), so it goes
+    through the same journal as the signal row, after it.
+    """
+
+    def __init__(self, ring, recorder=None):
+        self.ring = ring
+        self.recorder = recorder or write_behind
+        self.executed = {}  # shard -> [(symbol, signal_type, timestamp)]
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        return getattr(self.recorder, name)
+
+    def mark_executed(self, symbol, signal_type, timestamp=None):
+        with self._lock:
+            self.executed.setdefault(self.ring.shard_for(symbol), []).append((symbol, signal_type, timestamp))
+
+    def take(self, shard):
+        """The flags waiting for 'shard', emptying its list"""
+        with self._lock:
+            return self.executed.pop(shard, [])
+
+
+def shard_worker(name, symbols, conn, collector_factory=None):
+    """
+    Worker process: owns a TradingBot for its symbols (bar windows,
+    indicator state), runs one cycle per command received on 'conn' and
+    replies with (cycle, signals, prices, seconds, error). A command is
+    (cycle, executed): the signals executed since the last one are flagged
+    first. Stops on a None cycle.
+    'collector_factory' (picklable, no arguments) replaces AlpacaCollector.
+    """
+    executor = ShardExecutor()
+    collector = collector_factory() if collector_factory else None
+    # Signals are recorded here, through a journal of the shard's own
+    recorder = WriteBehindWriter(f"{settings.JOURNAL_PATH}.{name}") if settings.RECORD_SIGNALS else None
+    bot = TradingBot(collector=collector, executor=executor, symbols=symbols, recorder=recorder)
+
+    while True:
+        try:
+            cycle, executed = conn.recv()
+        except EOFError:
+            break  # coordinator is gone
+        if recorder:
+            for symbol, signal_type, timestamp in executed:
+                recorder.mark_executed(symbol, signal_type, timestamp)
+        if cycle is None:
+            if recorder:
+                recorder.flush()
+            break
+
+        started = time.perf_counter()
+        error = None
+        try:
+            if settings.PIPELINED_CYCLE:
+                bot.run_pipelined_cycle()
+            else:
+                bot.run_batched_cycle()
+            bot.execute_pending()
+        except Exception as e:
+            error = str(e)
+        discord_logger.flush_cycle()
+
+        signals, prices = executor.take()
+        conn.send((cycle, signals, prices, time.perf_counter() - started, error))
+
+
+class ShardedRunner(TradingBot):
+    """
+    Coordinator for a universe split across SHARD_WORKERS processes, so
+    indicator math runs on every core instead of one. Symbols are placed
+    by consistent hashing, and each worker keeps its symbols' data and
+    strategy state between cycles.
+
+    Every cycle the workers fetch and analyze in parallel, then send back
+    their signals and latest prices. Only this process trades: stops,
+    MAX_TRADES_PER_DAY and exposure limits are enforced once, across the
+    whole portfolio, by its OrderExecutor.
+    Workers only exchange picklable tuples over a pipe each, so moving
+    shards to other machines only needs a different transport.
+    """
+
+    def __init__(self, workers=None, collector=None, strategy=None, executor=None, symbols=None, collector_factory=None):
+        self.ring = HashRing([f"shard-{i}" for i in range(workers or settings.SHARD_WORKERS)])
+        # Signals are recorded by the shards: executed flags go back to them
+        self.relay = ExecutedRelay(self.ring)
+        if executor is None:
+            from trading.order_executor import OrderExecutor
+            executor = OrderExecutor(recorder=self.relay)
+        super().__init__(collector=collector, strategy=strategy, executor=executor, symbols=symbols)
+        self.shards = self.ring.assign(self.symbols)
+        self.collector_factory = collector_factory
+
+        # 'spawn': never fork a process that already runs threads (Discord, HTTP pools)
+        self._context = multiprocessing.get_context("spawn")
+        self.workers = {}  # shard -> (process, connection)
+        self._cycle = 0
+
+    def start_workers(self):
+        """Starts a process per shard (and restarts any that died)"""
+        for name, symbols in self.shards.items():
+            process, _ = self.workers.get(name, (None, None))
+            if process is not None and process.is_alive():
+                continue
+            if process is not None:
+                discord_logger.log_error(f"Shard {name} exited (code {process.exitcode}), restarting")
+
+            conn, worker_conn = self._context.Pipe()
+            process = self._context.Process(
+                target=shard_worker, name=name, daemon=True,
+                args=(name, symbols, worker_conn, self.collector_factory),
+            )
+            process.start()
+            worker_conn.close()  # so a dead worker reads as EOF here
+            self.workers[name] = (process, conn)
+
+    def stop(self):
+        for name, (process, conn) in self.workers.items():
+            try:
+                conn.send((None, self.relay.take(name)))
+            except OSError:
+                pass
+        for process, _ in self.workers.values():
+            process.join(timeout=10)
+            if process.is_alive():
+                process.terminate()
+        self.workers = {}
+
+    def start(self):
+        self.start_workers()
+        try:
+            super().start()
+        finally:
+            self.stop()
+
+    def run_cycle(self):
+        started = time.perf_counter()
+        discord_logger.log_stage("Cycle Start", f"Analyzing across {len(self.shards)} shards...")
+
+        # Account/positions are reloaded (lazily) once per cycle
+        self.executor.account.invalidate()
+
+        signals, prices = self.gather()
+
+        # Stops first, then every shard's signals as one batch
+        self.enforce_stops(prices)
+        self.pending_signals.extend(signals)
+        self.execute_pending()
+
+        discord_logger.flush_cycle()
+        discord_logger.log_stage("Cycle End", f"Sleeping for {settings.STRATEGY_EVAL_INTERVAL} mins... 💤")
+        self.record_cycle(time.perf_counter() - started)
+
+    def gather(self):
+        """
+        Runs one cycle on every shard and merges the replies: signals in
+        universe order (as a single-process cycle would produce them) and
+        one {symbol: price} dict. Shards that fail or miss the cycle
+        deadline are logged and skipped for this cycle.
+        """
+        self.start_workers()
+        self._cycle += 1
+        waiting = {}
+        for name, (_, conn) in self.workers.items():
+            try:
+                conn.send((self._cycle, self.relay.take(name)))
+                waiting[conn] = name
+            except OSError:
+                discord_logger.log_error(f"Shard {name} is not reachable")
+
+        replies = {}
+        deadline = time.monotonic() + settings.STRATEGY_EVAL_INTERVAL * 60
+        while waiting:
+            ready = wait(list(waiting), timeout=max(deadline - time.monotonic(), 0))
+            if not ready:
+                discord_logger.log_error(f"No reply this cycle from {', '.join(sorted(waiting.values()))}")
+                break
+
+            for conn in ready:
+                name = waiting[conn]
+                try:
+                    cycle, signals, prices, elapsed, error = conn.recv()
+                except (EOFError, OSError):
+                    # Died mid-cycle; start_workers replaces it next cycle
+                    discord_logger.log_error(f"Shard {name} exited during the cycle")
+                    del waiting[conn]
+                    continue
+                if cycle != self._cycle:
+                    continue  # late reply to a cycle we already gave up on
+
+                del waiting[conn]
+                if error:
+                    discord_logger.log_error(f"Shard {name} failed: {error}")
+                metrics.observe("shard_cycle_seconds", elapsed, shard=name)
+                replies[name] = (signals, prices)
+
+        order = {symbol: i for i, symbol in enumerate(self.symbols)}
+        signals = sorted(
+            (signal for shard_signals, _ in replies.values() for signal in shard_signals),
+            key=lambda signal: order.get(signal[0], len(order)),
+        )
+        prices = {}
+        for _, shard_prices in replies.values():
+            prices.update(shard_prices)
+        return signals, prices
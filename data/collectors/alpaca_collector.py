@@ -1,30 +1,72 @@
-from datetime import datetime, timedelta
-from alpaca.data.historical import StockHistoricalDataClient
-from alpaca.data.requests import StockBarsRequest
-from alpaca.data.timeframe import TimeFrame
-from alpaca.trading.client import TradingClient
+import threading
+from datetime import datetime, timedelta, timezone
+import pandas as pd
 from config.settings import settings
+from data.storage.bar_aggregator import MARKET_TZ, MINUTES_PER_SESSION
+from data.storage.bar_store import BarStore, to_utc
+from data.storage.ring_buffer import BarRingBuffer
+from monitoring.metrics import metrics
+from trading.alpaca_client import get_trading_client, share_session, throttle
+
+# alpaca-py's data package takes most of a second to import, so its
+# modules are imported inside the methods that request bars.
 
 class AlpacaCollector:
     def __init__(self):
-        # 1. Data Client: Handles fetching candles/bars
-        self.data_client = StockHistoricalDataClient(
-            settings.ALPACA_API_KEY,
-            settings.ALPACA_SECRET_KEY
-        )
+        # 1. Data Client: Handles fetching candles/bars (created on first use)
+        self._data_client = None
         
-        # 2. Trading Client: Handles Account info and Clock
-        self.trading_client = TradingClient(
-            settings.ALPACA_API_KEY,
-            settings.ALPACA_SECRET_KEY,
-            paper=settings.ALPACA_PAPER
-        )
+        # 2. Trading Client: Handles Account info and Clock (shared with AlpacaClient)
+        self.trading_client = get_trading_client()
+
+        # 3. Local bar cache: only the missing tail is requested from Alpaca
+        self.bar_store = BarStore(settings.BAR_CACHE_DIR) if settings.BAR_CACHE_ENABLED else None
+
+        # 4. Latest bars held per symbol (DELTA_FETCH): each fetch only asks for newer bars
+        self.windows = {}     # symbol -> BarRingBuffer
+        self.requested = {}   # symbol -> time of its last request (nothing is missing before it)
+        self.exhausted = set()  # short windows already filled from the full FETCH_MAX_SESSIONS lookback
+        self._sessions = []   # recent market sessions, for lookbacks
+        self._calendar_date = None
+        self._calendar_lock = threading.Lock()
+
+    @property
+    def data_client(self):
+        if self._data_client is None:
+            from alpaca.data.historical import StockHistoricalDataClient
+
+            self._data_client = StockHistoricalDataClient(
+                settings.ALPACA_API_KEY,
+                settings.ALPACA_SECRET_KEY
+            )
+            # Both clients use the trading client's pooled HTTP session
+            share_session(self._data_client, self.trading_client)
+        return self._data_client
+
+    @data_client.setter
+    def data_client(self, client):
+        self._data_client = client
     
+    @metrics.timed("stage_seconds", stage="fetch")
     def fetch_latest_bars(self, symbols, limit=100):
         """
         Fetches the latest N bars for a list of symbols.
         Uses a sliding window (Now - N minutes) to ensure data is fresh.
+        With DELTA_FETCH, only bars newer than the held windows are requested,
+        and the rows are VIEWS of those windows: they are overwritten by the
+        symbol's next fetch, so copy them to keep them longer.
         """
+        if settings.DELTA_FETCH:
+            if isinstance(symbols, str):
+                symbols = [symbols]
+            frames = self._latest_bars(symbols, limit, chunk_size=len(symbols) or 1)
+            if not frames:
+                return pd.DataFrame()
+            return pd.concat(frames, names=["symbol", "timestamp"])
+
+        from alpaca.data.requests import StockBarsRequest
+        from alpaca.data.timeframe import TimeFrame
+
         # Calculate 'start' time to force fresh data (Sliding Window logic)
         # We ask for 2x the limit in minutes to account for gaps/holidays
         time_ago = datetime.utcnow() - timedelta(minutes=limit*2)
@@ -38,8 +80,245 @@ class AlpacaCollector:
         )
         
         # Returns a Multi-Index DataFrame
+        metrics.inc("api_calls_total", api="data", endpoint="bars")
         return self.data_client.get_stock_bars(request_params).df
+
+    @metrics.timed("stage_seconds", stage="fetch")
+    def fetch_bars_batch(self, symbols, limit=100, chunk_size=None):
+        """
+        Fetches the latest N bars for many symbols in as few requests as possible.
+        Returns a dict of {symbol: DataFrame} with the 'symbol' level dropped.
+        With the bar cache enabled, only bars since the last cached one are requested.
+        With DELTA_FETCH, only bars newer than the held windows are requested,
+        and the frames are VIEWS of those windows: they are overwritten by the
+        symbol's next fetch, so copy them to keep them across cycles (e.g.
+        while another thread fetches the same symbol).
+        """
+        from alpaca.data.timeframe import TimeFrame
+
+        chunk_size = chunk_size or settings.FETCH_CHUNK_SIZE
+        if settings.DELTA_FETCH:
+            return self._latest_bars(symbols, limit, chunk_size)
+
+        time_ago = to_utc(datetime.utcnow() - timedelta(minutes=limit*2))
+
+        if self.bar_store is None:
+            frames = self._request_bars(symbols, TimeFrame.Minute, time_ago, chunk_size=chunk_size)
+            return {symbol: bars.tail(limit) for symbol, bars in frames.items()}
+
+        # Group symbols by where their missing tail starts. The last cached bar
+        # is requested again so late updates to it are picked up.
+        groups = {}
+        for symbol in symbols:
+            last = self.bar_store.last_timestamp(symbol, TimeFrame.Minute)
+            start = max(time_ago, last) if last is not None else time_ago
+            groups.setdefault(start, []).append(symbol)
+
+        for start, group in groups.items():
+            frames = self._request_bars(group, TimeFrame.Minute, start, chunk_size=chunk_size)
+            for symbol in group:
+                self.bar_store.write(symbol, TimeFrame.Minute, frames.get(symbol))
+                # A cache older than the window leaves a hole before this tail:
+                # the store is only complete from 'start' on, so a later
+                # fetch_historical_bars backfills the hole instead of reading past it
+                covered = self.bar_store.covered_from(symbol, TimeFrame.Minute)
+                if start == time_ago and (covered is None or covered < start):
+                    self.bar_store.set_covered_from(symbol, TimeFrame.Minute, start)
+
+        frames = {}
+        for symbol in symbols:
+            bars = self.bar_store.read(symbol, TimeFrame.Minute, start=time_ago)
+            if not bars.empty:
+                frames[symbol] = bars.tail(limit)
+        return frames
     
+    def _latest_bars(self, symbols, limit, chunk_size):
+        """
+        The last 'limit' minute bars per symbol from the held windows, after
+        bringing them up to date. Windows with enough bars only request what
+        is new: one request per chunk, starting at the newest bar held (so a
+        late revision of it is picked up). Missing or short windows are
+        filled from 'limit' minutes of trading sessions back, widened (per
+        the market calendar) until full or FETCH_MAX_SESSIONS is reached.
+        NOTE: returned frames are views of the windows, only valid until the
+        symbol's next fetch.
+        """
+        from alpaca.data.timeframe import TimeFrame
+
+        now = datetime.now(timezone.utc)
+        full, short = [], []
+        for symbol in symbols:
+            window = self.windows.get(symbol)
+            if window is not None and window.capacity >= limit and (len(window) >= limit or symbol in self.exhausted):
+                full.append(symbol)
+            else:
+                short.append(symbol)
+
+        # 1. Delta: bars since each window's newest one (or DELTA_LATE_MINUTES
+        # before its last request, for quiet symbols)
+        if full:
+            start = min(self._delta_start(symbol) for symbol in full)
+            frames = self._request_bars(full, TimeFrame.Minute, start, chunk_size=chunk_size)
+            for symbol, bars in frames.items():
+                self.windows[symbol].merge(bars)
+                if self.bar_store is not None:
+                    self.bar_store.write(symbol, TimeFrame.Minute, bars)
+            metrics.inc("bars_received_total", sum(len(bars) for bars in frames.values()))
+
+        # 2. Fill short windows, doubling the lookback while they stay short
+        # (with some slack: the current minute's bar is not out yet, and quiet minutes have none)
+        minutes = limit + limit // 4
+        while short:
+            capped = minutes >= settings.FETCH_MAX_SESSIONS * MINUTES_PER_SESSION
+            start = self.session_start(min(minutes, settings.FETCH_MAX_SESSIONS * MINUTES_PER_SESSION), now)
+            if self.bar_store is not None:
+                frames = self.fetch_historical_bars(short, start, timeframe=TimeFrame.Minute)
+            else:
+                frames = self._request_bars(short, TimeFrame.Minute, start, chunk_size=chunk_size)
+            metrics.inc("bars_received_total", sum(len(bars) for bars in frames.values()))
+
+            still_short = []
+            for symbol in short:
+                window = BarRingBuffer(max(limit, getattr(self.windows.get(symbol), "capacity", 0)))
+                if symbol in frames:
+                    window.extend(frames[symbol])
+                self.windows[symbol] = window
+                if len(window) >= limit:
+                    self.exhausted.discard(symbol)
+                elif capped:
+                    self.exhausted.add(symbol)  # no more history to find; grows by deltas from now on
+                else:
+                    still_short.append(symbol)
+            short = still_short
+            minutes *= 2
+
+        frames = {}
+        for symbol in symbols:
+            self.requested[symbol] = now
+            if len(self.windows[symbol]):
+                frames[symbol] = self.windows[symbol].frame(limit)
+        return frames
+
+    def _delta_start(self, symbol):
+        # From the newest bar held, so bars published late (after an earlier
+        # request covered their minute) are still picked up. A quiet symbol's
+        # newest bar can be hours old: its lookback is capped at
+        # DELTA_LATE_MINUTES before the last request, so it does not widen
+        # the request for the whole chunk.
+        since = self.requested[symbol] - timedelta(minutes=settings.DELTA_LATE_MINUTES)
+        last = self.windows[symbol].last_time
+        return max(pd.Timestamp(last, tz="UTC"), since) if last is not None else since
+
+    def session_start(self, minutes, now=None):
+        """
+        The time 'minutes' of market sessions before 'now' (nights, weekends
+        and holidays do not count), per the cached market calendar. Falls
+        back to 2x the minutes of wall time if the calendar is unavailable.
+        """
+        now = now or datetime.now(timezone.utc)
+        sessions = [(o, c) for o, c in self.recent_sessions(now) if o < now]
+        if not sessions:
+            return now - timedelta(minutes=minutes * 2)
+
+        remaining = timedelta(minutes=minutes)
+        for session_open, session_close in reversed(sessions):
+            end = min(session_close, now)
+            if end - session_open >= remaining:
+                return end - remaining
+            remaining -= end - session_open
+        return sessions[0][0]  # the whole cached calendar
+
+    def recent_sessions(self, now):
+        """Sessions of the last FETCH_MAX_SESSIONS or so trading days, up to today (calendar fetched once a day)"""
+        today = now.astimezone(MARKET_TZ).date()
+        with self._calendar_lock:
+            if self._calendar_date != today:
+                days = settings.FETCH_MAX_SESSIONS * 7 // 5 + 4
+                try:
+                    self._sessions = self.get_calendar(today - timedelta(days=days), today)
+                    self._calendar_date = today
+                except Exception as e:
+                    print(f"Error fetching market calendar: {e}")
+            return self._sessions
+
+    def fetch_historical_bars(self, symbols, start, end=None, timeframe=None):
+        """
+        Fetches every bar between start and end for one or more symbols
+        ('timeframe' defaults to TimeFrame.Day).
+        Returns a dict of {symbol: DataFrame} with the 'symbol' level dropped.
+        With the bar cache enabled, only ranges not already on disk are requested.
+        """
+        if timeframe is None:
+            from alpaca.data.timeframe import TimeFrame
+            timeframe = TimeFrame.Day
+
+        if self.bar_store is None:
+            return self._request_bars(symbols, timeframe, start, end)
+
+        start = to_utc(start)
+        end = to_utc(end) if end is not None else None
+
+        # Work out the missing head/tail ranges per symbol, grouped by range
+        ranges = {}
+        for symbol in symbols:
+            covered = self.bar_store.covered_from(symbol, timeframe)
+            last = self.bar_store.last_timestamp(symbol, timeframe)
+
+            if covered is None or last is None:
+                ranges.setdefault((start, end), []).append(symbol)
+                continue
+            if start < covered:
+                ranges.setdefault((start, covered), []).append(symbol)
+            if end is None or end > last:
+                ranges.setdefault((last, end), []).append(symbol)
+
+        for (range_start, range_end), group in ranges.items():
+            frames = self._request_bars(group, timeframe, range_start, range_end)
+            for symbol in group:
+                self.bar_store.write(symbol, timeframe, frames.get(symbol))
+
+                covered = self.bar_store.covered_from(symbol, timeframe)
+                if covered is None or range_start < covered:
+                    self.bar_store.set_covered_from(symbol, timeframe, range_start)
+
+        frames = {}
+        for symbol in symbols:
+            bars = self.bar_store.read(symbol, timeframe, start, end)
+            if not bars.empty:
+                frames[symbol] = bars
+        return frames
+
+    def _request_bars(self, symbols, timeframe, start, end=None, chunk_size=None):
+        """
+        One bars request per chunk of symbols.
+        Returns a dict of {symbol: DataFrame} with the 'symbol' level dropped.
+        """
+        from alpaca.data.requests import StockBarsRequest
+
+        symbols = list(symbols)
+        chunk_size = chunk_size or len(symbols) or 1
+        frames = {}
+
+        for i in range(0, len(symbols), chunk_size):
+            # NOTE: 'limit' on a multi-symbol request caps the TOTAL number of
+            # bars across all symbols, so requests are bounded by time only.
+            request_params = StockBarsRequest(
+                symbol_or_symbols=symbols[i:i + chunk_size],
+                timeframe=timeframe,
+                start=start,
+                end=end
+            )
+            metrics.inc("api_calls_total", api="data", endpoint="bars")
+            df = self.data_client.get_stock_bars(request_params).df
+            if df.empty:
+                continue
+
+            # Split the Multi-Index frame once by its 'symbol' level
+            for symbol, bars in df.groupby(level='symbol', sort=False):
+                frames[symbol] = bars.droplevel('symbol')
+
+        return frames
+
     def get_current_price(self, symbol):
         """
         Gets the very latest close price for a single symbol.
@@ -59,4 +338,17 @@ class AlpacaCollector:
 
     def get_clock(self):
         """Helper to get market clock (Open/Closed status)"""
-        return self.trading_client.get_clock()
\ No newline at end of file
+        throttle("clock")
+        return self.trading_client.get_clock()
+
+    def get_calendar(self, start, end):
+        """
+        Market sessions from 'start' to 'end' (dates) as [(open, close)]
+        timezone-aware datetimes, early closes included.
+        """
+        from alpaca.trading.requests import GetCalendarRequest
+
+        throttle("calendar")
+        days = self.trading_client.get_calendar(GetCalendarRequest(start=start, end=end))
+        # alpaca-py returns naive New York times
+        return [(day.open.replace(tzinfo=MARKET_TZ), day.close.replace(tzinfo=MARKET_TZ)) for day in days]
@@ -0,0 +1,143 @@
+import asyncio
+import queue
+import threading
+import time
+from types import SimpleNamespace
+import numpy as np
+from alpaca.data.enums import DataFeed
+from alpaca.data.live import StockDataStream
+from config.settings import settings
+from data.storage.ring_buffer import BarRingBuffer, to_ns
+from monitoring.metrics import metrics
+
+BAR_COLUMNS = ["open", "high", "low", "close", "volume", "trade_count", "vwap"]
+
+
+class ReplayBarSource:
+    """
+    Local stand-in for StockDataStream: replays recorded bars in time order
+    through the same subscribe_bars()/run()/stop() surface.
+    'bars' is a Multi-Index (symbol, timestamp) DataFrame.
+    'speed' replays at N x real time; None replays as fast as possible.
+    """
+
+    def __init__(self, bars, speed=None):
+        self.bars = bars
+        self.speed = speed
+        self.handler = None
+        self.symbols = set()
+        self._stopped = False
+
+    def subscribe_bars(self, handler, *symbols):
+        self.handler = handler
+        self.symbols.update(symbols)
+
+    def run(self):
+        asyncio.run(self._replay())
+
+    def stop(self):
+        self._stopped = True
+
+    async def _replay(self):
+        bars = self.bars
+        if self.symbols and "*" not in self.symbols:
+            bars = bars[bars.index.get_level_values(0).isin(self.symbols)]
+
+        symbols = bars.index.get_level_values(0)
+        timestamps = bars.index.get_level_values(1)
+        columns = {c: bars[c].values for c in BAR_COLUMNS if c in bars}
+
+        previous = None
+        for i in np.argsort(timestamps.asi8, kind="stable"):
+            if self._stopped:
+                break
+            timestamp = timestamps[i]
+            if self.speed and previous is not None:
+                await asyncio.sleep(max((timestamp - previous).total_seconds() / self.speed, 0))
+            previous = timestamp
+
+            bar = SimpleNamespace(symbol=symbols[i], timestamp=timestamp, **{
+                c: columns[c][i] if c in columns else None for c in BAR_COLUMNS
+            })
+            await self.handler(bar)
+
+
+class AlpacaStreamCollector:
+    """
+    Pushes live minute bars from alpaca-py's stock data stream into a
+    per-symbol BarRingBuffer and calls on_bar(symbol, buffer) for each bar,
+    in arrival order. The websocket handler only appends the bar and queues
+    a copy of the window: on_bar runs on a separate thread, so slow analysis
+    or order calls never hold up bar intake or the stream's keep-alive.
+    Any object with subscribe_bars()/run()/stop() (e.g. ReplayBarSource)
+    can be passed as 'source' in place of the live feed.
+    """
+
+    def __init__(self, symbols, on_bar=None, source=None, window=100):
+        self.symbols = list(symbols)
+        self.on_bar = on_bar
+        self.window_size = window
+        self.buffers = {symbol: BarRingBuffer(window) for symbol in self.symbols}
+        self.source = source or StockDataStream(
+            settings.ALPACA_API_KEY,
+            settings.ALPACA_SECRET_KEY,
+            feed=DataFeed(settings.ALPACA_DATA_FEED)
+        )
+        self.last_latency = None  # seconds from bar receipt to on_bar returning
+        self.ready = queue.Queue()  # (symbol, window copy, receipt time) awaiting on_bar
+        self._worker = None
+
+    def seed(self, frames):
+        """Pre-fills the windows from REST history, e.g. fetch_bars_batch() output"""
+        for symbol, bars in frames.items():
+            if symbol in self.buffers:
+                self.buffers[symbol] = BarRingBuffer(self.window_size)
+                self.buffers[symbol].extend(bars)
+
+    def start(self):
+        """Subscribes to every symbol and blocks while bars are streamed (and until the queued ones are handled)"""
+        self._worker = threading.Thread(target=self._run_handler, name="bar-handler", daemon=True)
+        self._worker.start()
+        self.source.subscribe_bars(self._handle_bar, *self.symbols)
+        try:
+            self.source.run()
+        finally:
+            self.ready.put(None)
+            self._worker.join()
+
+    def stop(self):
+        self.source.stop()
+
+    def window(self, symbol):
+        """The symbol's rolling window as a DataFrame indexed by timestamp"""
+        return self.buffers[symbol].frame()
+
+    async def _handle_bar(self, bar):
+        received = time.perf_counter()
+        buffer = self.buffers.get(bar.symbol)
+        if buffer is None:
+            return
+
+        timestamp = to_ns(bar.timestamp)
+        if buffer.size and timestamp <= buffer.last_time:
+            return  # duplicate or out-of-order bar
+
+        buffer.append(timestamp, bar.open, bar.high, bar.low, bar.close, int(round(bar.volume or 0)))
+        if self.on_bar:
+            # A copy: the next bar may be appended while this one is analyzed
+            self.ready.put((bar.symbol, buffer.copy(), received))
+
+    def _run_handler(self):
+        """Calls on_bar for every queued bar, until None is queued"""
+        while True:
+            item = self.ready.get()
+            if item is None:
+                break
+            symbol, bars, received = item
+            try:
+                self.on_bar(symbol, bars)
+            except Exception as e:
+                print(f"Error handling bar for {symbol}: {e}")
+            self.last_latency = time.perf_counter() - received
+            metrics.observe("bar_latency_seconds", self.last_latency)
+            metrics.set("bar_queue_depth", self.ready.qsize())
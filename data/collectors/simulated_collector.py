@@ -0,0 +1,152 @@
+from types import SimpleNamespace
+import numpy as np
+import pandas as pd
+from data.storage.bar_aggregator import MARKET_TZ
+from data.storage.bar_store import to_utc
+
+MINUTE_NS = 60 * 10**9
+
+
+class SimulatedMarket:
+    """
+    Recorded bars plus a virtual clock. Everything that asks for "now"
+    (SimulatedCollector, SimulatedBroker) sees only bars up to market.now,
+    and advance() moves time forward as fast as the caller likes.
+    'bars' is a dict of {symbol: DataFrame} or a Multi-Index (symbol, timestamp) frame.
+    'warmup' bars of history are already visible at the start.
+    """
+
+    def __init__(self, bars, warmup=100):
+        if isinstance(bars, pd.DataFrame):
+            bars = {symbol: df.droplevel(0) for symbol, df in bars.groupby(level=0, sort=False)}
+
+        self.frames = {}
+        self.times = {}  # symbol -> int64 ns timestamps, for searchsorted
+        for symbol, df in bars.items():
+            if df is None or df.empty:
+                continue
+            index = pd.DatetimeIndex(df.index)
+            index = index.tz_convert("UTC") if index.tz is not None else index.tz_localize("UTC")
+            df = df.set_axis(index).sort_index()
+            self.frames[symbol] = df
+            self.times[symbol] = df.index.as_unit("ns").asi8
+
+        self.symbols = list(self.frames)
+        self.timeline = np.unique(np.concatenate(list(self.times.values()))) if self.times else np.empty(0, np.int64)
+        self._pos = min(max(warmup, 1), len(self.timeline)) - 1
+        self.listeners = []  # called with (previous_ns, now_ns) after every advance
+
+    @property
+    def now_ns(self):
+        return int(self.timeline[self._pos])
+
+    @property
+    def now(self):
+        return pd.Timestamp(self.now_ns, tz="UTC")
+
+    @property
+    def finished(self):
+        return self._pos >= len(self.timeline) - 1
+
+    def advance(self, minutes=1):
+        """
+        Moves the clock forward by 'minutes' (to the last bar at or before
+        that time). Gaps such as nights jump straight to the next bar.
+        Returns False once the recording is exhausted.
+        """
+        if self.finished:
+            return False
+
+        previous = self.now_ns
+        target = np.searchsorted(self.timeline, previous + minutes * MINUTE_NS, side="right") - 1
+        self._pos = max(int(target), self._pos + 1)
+
+        for listener in self.listeners:
+            listener(previous, self.now_ns)
+        return True
+
+    def window(self, symbol, limit=None, start=None, end=None):
+        """A symbol's bars visible at 'now' (optionally clipped to [start, end], last 'limit' rows)"""
+        times = self.times.get(symbol)
+        if times is None:
+            return pd.DataFrame()
+
+        stop = np.searchsorted(times, self.now_ns, side="right")
+        if end is not None:
+            stop = min(stop, np.searchsorted(times, to_utc(end).value, side="right"))
+        first = np.searchsorted(times, to_utc(start).value, side="left") if start is not None else 0
+        if limit is not None:
+            first = max(first, stop - limit)
+        return self.frames[symbol].iloc[first:stop]
+
+    def bars_between(self, symbol, after_ns, until_ns):
+        """Bars with after_ns < time <= until_ns"""
+        times = self.times.get(symbol)
+        if times is None:
+            return self.frames.get(symbol, pd.DataFrame()).iloc[0:0]
+        lo = np.searchsorted(times, after_ns, side="right")
+        hi = np.searchsorted(times, until_ns, side="right")
+        return self.frames[symbol].iloc[lo:hi]
+
+    def price(self, symbol):
+        """Latest visible close, or None if the symbol has no bars yet"""
+        times = self.times.get(symbol)
+        if times is None:
+            return None
+        i = np.searchsorted(times, self.now_ns, side="right") - 1
+        return float(self.frames[symbol]["close"].values[i]) if i >= 0 else None
+
+    def clock(self):
+        """Same fields as alpaca-py's Clock"""
+        next_time = self.timeline[self._pos + 1] if not self.finished else self.timeline[-1]
+        return SimpleNamespace(
+            timestamp=self.now,
+            is_open=not self.finished,
+            next_open=pd.Timestamp(int(next_time), tz="UTC"),
+            next_close=pd.Timestamp(int(self.timeline[-1]), tz="UTC"),
+        )
+
+
+class SimulatedCollector:
+    """AlpacaCollector's surface, served from a SimulatedMarket (no network)"""
+
+    def __init__(self, market):
+        self.market = market
+
+    def fetch_latest_bars(self, symbols, limit=100):
+        """Multi-Index (symbol, timestamp) frame, like the Alpaca response"""
+        if isinstance(symbols, str):
+            symbols = [symbols]
+        frames = self.fetch_bars_batch(symbols, limit)
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, names=["symbol", "timestamp"])
+
+    def fetch_bars_batch(self, symbols, limit=100, chunk_size=None):
+        frames = {}
+        for symbol in symbols:
+            bars = self.market.window(symbol, limit)
+            if not bars.empty:
+                frames[symbol] = bars
+        return frames
+
+    def fetch_historical_bars(self, symbols, start, end=None, timeframe=None):
+        frames = {}
+        for symbol in symbols:
+            bars = self.market.window(symbol, start=start, end=end)
+            if not bars.empty:
+                frames[symbol] = bars
+        return frames
+
+    def get_current_price(self, symbol):
+        return self.market.price(symbol) or 0.0
+
+    def get_clock(self):
+        return self.market.clock()
+
+    def get_calendar(self, start, end):
+        """Sessions as recorded: each New York day from its first bar to one minute after its last"""
+        times = pd.Series(pd.to_datetime(self.market.timeline, utc=True))
+        days = times.groupby(times.dt.tz_convert(MARKET_TZ).dt.date).agg(["min", "max"])
+        days = days[(days.index >= start) & (days.index <= end)]
+        return [(first, last + pd.Timedelta(minutes=1)) for first, last in zip(days["min"], days["max"])]
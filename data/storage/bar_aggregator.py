@@ -0,0 +1,202 @@
+import re
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+import numpy as np
+import pandas as pd
+from data.storage.ring_buffer import BarRingBuffer, to_ns
+
+MINUTE_NS = 60 * 10**9
+MINUTES_PER_SESSION = 390
+MARKET_TZ = ZoneInfo("America/New_York")
+
+
+def timeframe_minutes(timeframe):
+    """
+    Minutes per bar for '5Min', '15Min', '1Hour', '1Day' (or an alpaca-py
+    TimeFrame, whose str() has the same form). Daily bars return None:
+    they follow the New York calendar day, not a fixed number of minutes.
+    """
+    match = re.fullmatch(r"(\d+)(Min|Hour|Day)", str(timeframe))
+    if match is None:
+        raise ValueError(f"Unsupported timeframe: {timeframe}")
+    amount, unit = int(match.group(1)), match.group(2)
+    if unit == "Day":
+        if amount != 1:
+            raise ValueError("Only 1Day is supported for daily bars")
+        return None
+    return amount * (60 if unit == "Hour" else 1)
+
+
+def lookback_days(timeframe, bars):
+    """Calendar days of minute history needed to build 'bars' bars of 'timeframe'"""
+    minutes = timeframe_minutes(timeframe)
+    sessions = bars if minutes is None else -(-bars * minutes // MINUTES_PER_SESSION)
+    return sessions * 7 // 5 + 4
+
+
+def bucket_bounds(ts_ns, minutes):
+    """[start, end) in ns of the bar that contains ts_ns"""
+    if minutes is not None:
+        start = ts_ns - ts_ns % (minutes * MINUTE_NS)
+        return start, start + minutes * MINUTE_NS
+
+    day = datetime.fromtimestamp(ts_ns / 1e9, MARKET_TZ).date()
+    start = datetime(day.year, day.month, day.day, tzinfo=MARKET_TZ)
+    end = datetime.combine(day + timedelta(days=1), datetime.min.time(), tzinfo=MARKET_TZ)
+    return int(start.timestamp()) * 10**9, int(end.timestamp()) * 10**9
+
+
+def bucket_starts(times_ns, minutes):
+    """Vectorized bucket_bounds(...)[0] for an int64 ns array"""
+    if minutes is not None:
+        return times_ns - times_ns % (minutes * MINUTE_NS)
+    days = pd.to_datetime(times_ns, utc=True).tz_convert(MARKET_TZ).normalize()
+    return days.tz_convert("UTC").as_unit("ns").asi8
+
+
+def resample(bars, timeframe):
+    """
+    Minute bars (DataFrame with OHLC[V] columns, sorted) -> bars of 'timeframe'
+    indexed by bar start (UTC), in one vectorized pass.
+    """
+    if bars.empty:
+        return bars
+    times = pd.DatetimeIndex(bars.index)
+    times = times.tz_convert("UTC") if times.tz is not None else times.tz_localize("UTC")
+    starts = bucket_starts(times.as_unit("ns").asi8, timeframe_minutes(timeframe))
+
+    first = np.concatenate([[0], np.flatnonzero(np.diff(starts)) + 1])
+    last = np.append(first[1:] - 1, len(starts) - 1)
+    volume = bars["volume"].values if "volume" in bars else np.zeros(len(bars))
+
+    index = pd.to_datetime(starts[first], utc=True)
+    index.name = "timestamp"
+    return pd.DataFrame({
+        "open": bars["open"].values[first],
+        "high": np.maximum.reduceat(bars["high"].values, first),
+        "low": np.minimum.reduceat(bars["low"].values, first),
+        "close": bars["close"].values[last],
+        "volume": np.add.reduceat(volume, first),
+    }, index=index)
+
+
+class BarAggregator:
+    """
+    Builds higher-timeframe bars (5Min, 15Min, 1Hour, 1Day, ...) from one
+    minute feed. Each (symbol, timeframe) window is a BarRingBuffer whose
+    newest row is the still-open bar: a new minute either updates that row
+    in place or starts the next bar, so an update is O(1) per timeframe.
+    A second buffer per window holds only completed bars, which is what
+    strategies should evaluate.
+    """
+
+    def __init__(self, timeframes, capacity=100):
+        self.timeframes = {str(tf): timeframe_minutes(tf) for tf in timeframes}
+        self.capacity = capacity
+        self.buffers = {}    # (symbol, timeframe) -> BarRingBuffer, open bar last
+        self.closed = {}     # (symbol, timeframe) -> BarRingBuffer of completed bars
+        self._open = {}      # (symbol, timeframe) -> [start, end, completed] of the open bar
+        self.last_time = {}  # symbol -> ns of the newest minute seen
+
+    def update(self, symbol, timestamp, open, high, low, close, volume=0):
+        """Adds one minute bar. Minutes at or before the last one seen are ignored."""
+        if not isinstance(timestamp, (int, np.integer)):
+            timestamp = to_ns(timestamp)
+        timestamp = int(timestamp)
+        if timestamp <= self.last_time.get(symbol, -1):
+            return False
+        self.last_time[symbol] = timestamp
+
+        for timeframe, minutes in self.timeframes.items():
+            key = (symbol, timeframe)
+            bar = self._open.get(key)
+            if bar is not None and bar[0] <= timestamp < bar[1]:
+                self.buffers[key].update_last(high, low, close, volume)
+            else:
+                if bar is not None and not bar[2]:
+                    self._complete(key)  # a gap skipped the bar's last minute
+                bar = self._open[key] = [*bucket_bounds(timestamp, minutes), False]
+                if key not in self.buffers:
+                    self.buffers[key] = BarRingBuffer(self.capacity)
+                    self.closed[key] = BarRingBuffer(self.capacity)
+                self.buffers[key].append(bar[0], open, high, low, close, volume)
+
+            # The bar's last minute is in: it is final
+            if timestamp + MINUTE_NS >= bar[1]:
+                self._complete(key)
+                bar[2] = True
+        return True
+
+    def _complete(self, key):
+        buffer = self.buffers[key]
+        self.closed[key].append(
+            buffer.last_time, buffer.last("open"), buffer.last("high"),
+            buffer.last("low"), buffer.last("close"), int(buffer.last("volume"))
+        )
+
+    def extend(self, symbol, bars):
+        """
+        Feeds every minute newer than the last one seen, from a DataFrame or a
+        BarRingBuffer. A symbol's first (seed) history is resampled in one pass.
+        """
+        last = self.last_time.get(symbol, -1)
+
+        if isinstance(bars, BarRingBuffer):
+            if not len(bars) or bars.last_time <= last:
+                return
+            times = bars.times()
+            columns = {field: bars[field] for field in ("open", "high", "low", "close", "volume")}
+        else:
+            if bars is None or bars.empty or to_ns(bars.index[-1]) <= last:
+                return
+            if symbol not in self.last_time and len(bars) > 1:
+                self._seed(symbol, bars)
+                return
+            # Only the new tail needs converting
+            bars = bars.iloc[bars.index.searchsorted(pd.Timestamp(last, tz="UTC"), side="right"):]
+            index = pd.DatetimeIndex(bars.index)
+            index = index.tz_convert("UTC") if index.tz is not None else index.tz_localize("UTC")
+            times = index.as_unit("ns").asi8
+            columns = {field: bars[field].values for field in ("open", "high", "low", "close")}
+            columns["volume"] = bars["volume"].values if "volume" in bars else np.zeros(len(bars))
+
+        start = np.searchsorted(times, last, side="right")
+        for i in range(start, len(times)):
+            self.update(
+                symbol, int(times[i]), columns["open"][i], columns["high"][i],
+                columns["low"][i], columns["close"][i], int(round(columns["volume"][i]))
+            )
+
+    def _seed(self, symbol, bars):
+        last = to_ns(bars.index[-1])
+        for timeframe, minutes in self.timeframes.items():
+            key = (symbol, timeframe)
+            resampled = resample(bars, timeframe)
+            bar = self._open[key] = [*bucket_bounds(last, minutes), False]
+            bar[2] = last + MINUTE_NS >= bar[1]
+
+            self.buffers[key] = BarRingBuffer(self.capacity)
+            self.buffers[key].extend(resampled)
+            self.closed[key] = BarRingBuffer(self.capacity)
+            self.closed[key].extend(resampled if bar[2] else resampled.iloc[:-1])
+        self.last_time[symbol] = last
+
+    def window(self, symbol, timeframe, closed_only=False):
+        """
+        The symbol's BarRingBuffer for 'timeframe', or None. Its newest row is
+        the open bar, unless closed_only asks for completed bars only.
+        """
+        key = (symbol, str(timeframe))
+        return (self.closed if closed_only else self.buffers).get(key)
+
+    def is_closed(self, symbol, timeframe):
+        """True when the newest bar's interval has fully elapsed"""
+        bar = self._open.get((symbol, str(timeframe)))
+        return bar is not None and bar[2]
+
+    def frame(self, symbol, timeframe, closed_only=False):
+        """The timeframe's bars as a DataFrame (zero-copy view, valid until the next update)"""
+        buffer = self.window(symbol, timeframe, closed_only)
+        if buffer is None or not len(buffer):
+            return pd.DataFrame()
+        return buffer.frame()
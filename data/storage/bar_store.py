@@ -0,0 +1,152 @@
+import json
+import os
+import numpy as np
+import pandas as pd
+
+# Columns kept for every bar (row 0 of each file holds the int64 timestamps)
+BAR_FIELDS = ("open", "high", "low", "close", "volume", "trade_count", "vwap")
+
+
+def to_utc(value):
+    """Any datetime-like -> tz-aware UTC Timestamp (naive values are taken as UTC)"""
+    ts = pd.Timestamp(value)
+    return ts.tz_localize("UTC") if ts.tzinfo is None else ts.tz_convert("UTC")
+
+
+class BarStore:
+    """
+    On-disk columnar bar cache, partitioned as {root}/{timeframe}/{symbol}/{date}.npy
+
+    Each partition is a (1 + len(BAR_FIELDS), n) float64 array: row 0 holds
+    nanosecond UTC timestamps (viewed as int64), the other rows one field each.
+    Files are memory-mapped on read, so slicing a partition is zero-copy.
+    Intraday timeframes are partitioned per day, daily and longer per year.
+    """
+
+    def __init__(self, root):
+        self.root = root
+
+    def write(self, symbol, timeframe, bars):
+        """Merges bars into the store (newer rows win on duplicate timestamps)"""
+        if bars is None or bars.empty:
+            return
+
+        times = pd.DatetimeIndex(bars.index).tz_convert("UTC")
+        keys = self._partition_keys(timeframe, times)
+        block = np.full((1 + len(BAR_FIELDS), len(bars)), np.nan)
+        block[0].view(np.int64)[:] = times.as_unit("ns").asi8
+        for row, field in enumerate(BAR_FIELDS, start=1):
+            if field in bars:
+                block[row] = bars[field].values
+
+        folder = self._folder(symbol, timeframe)
+        os.makedirs(folder, exist_ok=True)
+
+        for key in np.unique(keys):
+            path = os.path.join(folder, f"{key}.npy")
+            old = np.load(path) if os.path.exists(path) else block[:, :0]
+            self._atomic_save(path, self._merge(old, block[:, keys == key]))
+
+    def read(self, symbol, timeframe, start=None, end=None):
+        """
+        Returns the cached bars in [start, end] as a DataFrame indexed by timestamp.
+        A range inside one partition is a zero-copy view of the memory-mapped file.
+        """
+        block = self.read_block(symbol, timeframe, start, end)
+        index = pd.to_datetime(block[0].view(np.int64), utc=True)
+        index.name = "timestamp"
+        return pd.DataFrame(block[1:].T, index=index, columns=BAR_FIELDS, copy=False)
+
+    def read_block(self, symbol, timeframe, start=None, end=None):
+        """Like read(), but returns the raw (1 + fields, n) array"""
+        start_ns = self._to_ns(start)
+        end_ns = self._to_ns(end)
+
+        parts = []
+        for path in self._partitions(symbol, timeframe, start, end):
+            block = np.load(path, mmap_mode="r")
+            times = block[0].view(np.int64)
+            lo = 0 if start_ns is None else np.searchsorted(times, start_ns, side="left")
+            hi = len(times) if end_ns is None else np.searchsorted(times, end_ns, side="right")
+            if hi > lo:
+                parts.append(block[:, lo:hi])
+
+        if not parts:
+            return np.empty((1 + len(BAR_FIELDS), 0))
+        if len(parts) == 1:
+            return parts[0]
+        return np.concatenate(parts, axis=1)
+
+    def last_timestamp(self, symbol, timeframe):
+        """Timestamp of the newest cached bar, or None"""
+        partitions = self._partitions(symbol, timeframe)
+        if not partitions:
+            return None
+        block = np.load(partitions[-1], mmap_mode="r")
+        if block.shape[1] == 0:
+            return None
+        return pd.Timestamp(int(block[0, -1:].view(np.int64)[0]), tz="UTC")
+
+    def covered_from(self, symbol, timeframe):
+        """Earliest start that has been fully fetched into the store, or None"""
+        path = os.path.join(self._folder(symbol, timeframe), "_meta.json")
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return pd.Timestamp(json.load(f)["covered_from"])
+
+    def set_covered_from(self, symbol, timeframe, start):
+        folder = self._folder(symbol, timeframe)
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, "_meta.json")
+        with open(path + ".tmp", "w") as f:
+            json.dump({"covered_from": to_utc(start).isoformat()}, f)
+        os.replace(path + ".tmp", path)
+
+    # ---------------------------------------------------------------- helpers
+
+    def _folder(self, symbol, timeframe):
+        return os.path.join(self.root, str(timeframe), symbol)
+
+    def _partitions(self, symbol, timeframe, start=None, end=None):
+        """Sorted partition paths overlapping [start, end]"""
+        folder = self._folder(symbol, timeframe)
+        if not os.path.isdir(folder):
+            return []
+
+        keys = sorted(name[:-4] for name in os.listdir(folder) if name.endswith(".npy"))
+        if start is not None:
+            first = self._partition_keys(timeframe, pd.DatetimeIndex([to_utc(start)]))[0]
+            keys = [k for k in keys if k >= first]
+        if end is not None:
+            last = self._partition_keys(timeframe, pd.DatetimeIndex([to_utc(end)]))[0]
+            keys = [k for k in keys if k <= last]
+        return [os.path.join(folder, f"{key}.npy") for key in keys]
+
+    @staticmethod
+    def _partition_keys(timeframe, times):
+        """Per-row partition key: YYYY-MM-DD for intraday bars, YYYY otherwise"""
+        if str(timeframe).endswith(("Min", "Hour")):
+            return np.asarray(times.strftime("%Y-%m-%d"))
+        return np.asarray(times.strftime("%Y"))
+
+    @staticmethod
+    def _merge(old, new):
+        combined = np.concatenate([old, new], axis=1)
+        times = combined[0].view(np.int64)
+        # Keep the LAST occurrence of each timestamp (the new rows), sorted by time
+        order = np.argsort(times, kind="stable")
+        times = times[order]
+        keep = np.append(times[1:] != times[:-1], True)
+        return combined[:, order[keep]]
+
+    @staticmethod
+    def _atomic_save(path, block):
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            np.save(f, np.ascontiguousarray(block))
+        os.replace(tmp, path)
+
+    @staticmethod
+    def _to_ns(value):
+        return None if value is None else to_utc(value).value
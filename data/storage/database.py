@@ -1,10 +1,47 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
 from config.settings import settings
-from .models import Base
 
-engine = create_engine(settings.DATABASE_URL)
-SessionLocal = sessionmaker(bind=engine)
+# Created on first use, so importing this module (or anything that imports
+# it) costs nothing until the DB is actually needed
+_engine = None
+_session_factory = None
+
+
+def get_engine():
+    """The process-wide SQLAlchemy engine for settings.DATABASE_URL"""
+    global _engine
+    if _engine is None:
+        from sqlalchemy import create_engine
+        _engine = create_engine(settings.DATABASE_URL)
+    return _engine
+
+
+def SessionLocal():
+    """A new ORM session bound to the shared engine"""
+    global _session_factory
+    if _session_factory is None:
+        from sqlalchemy.orm import sessionmaker
+        _session_factory = sessionmaker(bind=get_engine())
+    return _session_factory()
+
+
+def __getattr__(name):
+    # Backwards compatible 'from data.storage.database import engine'
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 def init_db():
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+    from sqlalchemy import text
+    from .models import Base
+
+    engine = get_engine()
+    Base.metadata.create_all(bind=engine)
+
+    # create_all() skips tables that already exist, so make sure older
+    # databases also get the (symbol, timestamp) uniqueness used by ingestion
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE UNIQUE INDEX IF NOT EXISTS ix_price_data_symbol_timestamp "
+            "ON price_data (symbol, timestamp)"
+        ))
@@ -0,0 +1,117 @@
+import io
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from config.settings import settings
+from .database import get_engine
+from .models import PriceData
+
+PRICE_COLUMNS = ["symbol", "timestamp", "open", "high", "low", "close", "volume"]
+
+
+def ingest_bars(bars, engine=None, chunk_size=5_000):
+    """
+    Bulk-inserts bars into price_data, skipping rows that already exist.
+    'bars' is a Multi-Index (symbol, timestamp) DataFrame or a dict of {symbol: DataFrame}.
+    Postgres uses COPY into a staging table + INSERT ... ON CONFLICT DO NOTHING,
+    SQLite (local runs) a batched INSERT ... ON CONFLICT DO NOTHING.
+    Returns the number of new rows.
+    """
+    engine = engine or get_engine()
+    rows = _to_rows(bars)
+    if rows.empty:
+        return 0
+
+    if engine.dialect.name == "postgresql":
+        return _copy_postgres(rows, engine)
+    if engine.dialect.name == "sqlite":
+        return _insert_sqlite(rows, engine, chunk_size)
+    raise ValueError(f"Bulk ingestion is not supported for {engine.dialect.name}")
+
+
+def ingest_bar_store(symbols, timeframe, start, end=None, engine=None):
+    """Persists bars from the local bar cache (see BarStore) into price_data"""
+    from .bar_store import BarStore
+
+    store = BarStore(settings.BAR_CACHE_DIR)
+    frames = {symbol: store.read(symbol, timeframe, start, end) for symbol in symbols}
+    return ingest_bars(frames, engine)
+
+
+def _to_rows(bars):
+    """Flattens bars into the price_data column layout"""
+    if isinstance(bars, dict):
+        frames = {s: df for s, df in bars.items() if df is not None and not df.empty}
+        if not frames:
+            return pd.DataFrame(columns=PRICE_COLUMNS)
+        bars = pd.concat(frames, names=["symbol", "timestamp"])
+
+    rows = bars.reset_index()
+    rows.columns = ["symbol", "timestamp"] + list(rows.columns[2:])
+
+    # price_data stores naive UTC timestamps and integer volume
+    timestamps = pd.DatetimeIndex(rows["timestamp"])
+    if timestamps.tz is not None:
+        timestamps = timestamps.tz_convert("UTC").tz_localize(None)
+    rows["timestamp"] = timestamps
+    rows["volume"] = np.rint(rows["volume"].fillna(0)).astype(np.int64)
+    return rows[PRICE_COLUMNS]
+
+
+def _copy_postgres(rows, engine):
+    buffer = io.StringIO()
+    rows.to_csv(buffer, index=False, header=False, date_format="%Y-%m-%d %H:%M:%S.%f")
+    buffer.seek(0)
+
+    columns = ", ".join(PRICE_COLUMNS)
+    copy_sql = f"COPY _price_data_stage ({columns}) FROM STDIN WITH (FORMAT csv)"
+
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        cursor.execute(
+            "CREATE TEMP TABLE _price_data_stage ("
+            "symbol varchar, timestamp timestamp, open float8, high float8, "
+            "low float8, close float8, volume bigint) ON COMMIT DROP"
+        )
+
+        # psycopg2 and psycopg 3 expose COPY differently
+        if hasattr(cursor, "copy_expert"):
+            cursor.copy_expert(copy_sql, buffer)
+        else:
+            with cursor.copy(copy_sql) as copy:
+                copy.write(buffer.getvalue())
+
+        cursor.execute(
+            f"INSERT INTO price_data ({columns}) SELECT {columns} FROM _price_data_stage "
+            "ON CONFLICT (symbol, timestamp) DO NOTHING"
+        )
+        inserted = cursor.rowcount
+        raw.commit()
+        return inserted
+    except Exception:
+        raw.rollback()
+        raise
+    finally:
+        raw.close()
+
+
+def _insert_sqlite(rows, engine, chunk_size):
+    # One prepared INSERT ... ON CONFLICT DO NOTHING, executed over row batches
+    stmt = sqlite_insert(PriceData).on_conflict_do_nothing(index_elements=["symbol", "timestamp"])
+    records = rows.to_dict("records")
+    inserted = 0
+    with engine.begin() as conn:
+        for i in range(0, len(records), chunk_size):
+            inserted += conn.execute(stmt, records[i:i + chunk_size]).rowcount
+    return inserted
+
+
+if __name__ == "__main__":
+    from alpaca.data.timeframe import TimeFrame
+    from .database import init_db
+
+    init_db()
+    count = ingest_bar_store(settings.SYMBOLS, TimeFrame.Minute, datetime.utcnow() - timedelta(days=30))
+    print(f"Ingested {count} new bars.")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, Numeric
+from sqlalchemy import Column, Integer, BigInteger, String, Float, DateTime, Boolean, Numeric, Index
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
 
@@ -6,15 +6,19 @@ Base = declarative_base()
 
 class PriceData(Base):
     __tablename__ = 'price_data'
+    __table_args__ = (
+        # One row per bar: makes re-ingesting overlapping windows idempotent
+        Index('ix_price_data_symbol_timestamp', 'symbol', 'timestamp', unique=True),
+    )
     
     id = Column(Integer, primary_key=True)
-    symbol = Column(String, index=True)
-    timestamp = Column(DateTime, index=True)
+    symbol = Column(String, nullable=False)
+    timestamp = Column(DateTime, index=True, nullable=False)
     open = Column(Float)
     high = Column(Float)
     low = Column(Float)
     close = Column(Float)
-    volume = Column(Integer)
+    volume = Column(BigInteger)
 
 class Trade(Base):
     __tablename__ = 'trades'
@@ -40,4 +44,12 @@ class Signal(Base):
     signal_type = Column(String)  # 'BUY', 'SELL', 'HOLD'
     timestamp = Column(DateTime, default=datetime.utcnow)
     indicators = Column(String)  # JSON string of indicator values
-    executed = Column(Boolean, default=False)
\ No newline at end of file
+    executed = Column(Boolean, default=False)
+
+
+class JournalCheckpoint(Base):
+    __tablename__ = 'journal_checkpoints'
+
+    # Last write-behind journal entry committed, per journal (see write_behind.py)
+    journal = Column(String, primary_key=True)
+    seq = Column(BigInteger, nullable=False)
@@ -0,0 +1,144 @@
+import numpy as np
+import pandas as pd
+
+# Row order of the float64 price block
+PRICE_FIELDS = ("open", "high", "low", "close")
+
+
+def to_ns(timestamp):
+    """Any datetime-like -> int ns since epoch (naive values are taken as UTC)"""
+    ts = pd.Timestamp(timestamp)
+    ts = ts.tz_localize("UTC") if ts.tzinfo is None else ts
+    return ts.value
+
+
+def index_ns(index):
+    """int64 ns timestamps of a DataFrame index (naive values are taken as UTC), without a copy when possible"""
+    if isinstance(index, pd.DatetimeIndex):
+        return index.asi8 if index.unit == "ns" else index.as_unit("ns").asi8
+    return pd.DatetimeIndex(index).as_unit("ns").asi8
+
+
+class BarRingBuffer:
+    """
+    Fixed-capacity OHLCV window for one symbol, backed by preallocated arrays.
+
+    Every bar is written twice (at slot i and i + capacity), so the latest N
+    bars are always one contiguous slice: append is O(1) and window views
+    never copy. Prices are float64, timestamps (ns UTC) and volume int64.
+    """
+
+    def __init__(self, capacity=100):
+        self.capacity = capacity
+        self.prices = np.full((len(PRICE_FIELDS), 2 * capacity), np.nan)
+        self.volume = np.zeros(2 * capacity, dtype=np.int64)
+        self.timestamps = np.zeros(2 * capacity, dtype=np.int64)
+        self.size = 0
+        self._pos = 0  # next slot to write, in [0, capacity)
+
+    def __len__(self):
+        return self.size
+
+    def append(self, timestamp, open, high, low, close, volume=0):
+        """Adds one bar. 'timestamp' is ns since epoch or anything pd.Timestamp accepts."""
+        if not isinstance(timestamp, (int, np.integer)):
+            timestamp = to_ns(timestamp)
+
+        for slot in (self._pos, self._pos + self.capacity):
+            self.prices[0, slot] = open
+            self.prices[1, slot] = high
+            self.prices[2, slot] = low
+            self.prices[3, slot] = close
+            self.volume[slot] = volume
+            self.timestamps[slot] = timestamp
+
+        self._pos = (self._pos + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def update_last(self, high, low, close, volume=0):
+        """Merges a later print into the newest bar in place (running high/low, last close, summed volume)"""
+        last = (self._pos - 1) % self.capacity
+        for slot in (last, last + self.capacity):
+            self.prices[1, slot] = max(self.prices[1, slot], high)
+            self.prices[2, slot] = min(self.prices[2, slot], low)
+            self.prices[3, slot] = close
+            self.volume[slot] += volume
+
+    def extend(self, bars):
+        """Appends every row of a DataFrame with OHLCV columns (e.g. to seed from REST)"""
+        bars = bars.tail(self.capacity)
+        times = pd.DatetimeIndex(bars.index)
+        times = times.tz_convert("UTC") if times.tz is not None else times
+        ns = times.as_unit("ns").asi8
+        volume = bars["volume"].values if "volume" in bars else np.zeros(len(bars))
+        for i in range(len(bars)):
+            self.append(
+                int(ns[i]), bars["open"].values[i], bars["high"].values[i],
+                bars["low"].values[i], bars["close"].values[i], int(round(volume[i]))
+            )
+
+    def merge(self, bars):
+        """
+        Adds a DataFrame of bars that may overlap the window's end (e.g. a
+        request starting at the newest bar): older rows are ignored, a row
+        with the newest bar's timestamp replaces it (late revisions), and
+        later rows are appended.
+        """
+        if self.size and len(bars):
+            times = pd.DatetimeIndex(bars.index)
+            times = times.tz_convert("UTC") if times.tz is not None else times
+            ns = times.as_unit("ns").asi8
+            first = int(np.searchsorted(ns, self.last_time, side="left"))
+            if first < len(ns) and ns[first] == self.last_time:
+                # Rewind one slot, so the revised bar is written over the old one
+                self._pos = (self._pos - 1) % self.capacity
+                self.size -= 1
+            bars = bars.iloc[first:]
+        self.extend(bars)
+
+    def copy(self):
+        """An independent copy (e.g. to hand the window to another thread)"""
+        other = BarRingBuffer.__new__(BarRingBuffer)
+        other.capacity, other.size, other._pos = self.capacity, self.size, self._pos
+        other.prices, other.volume, other.timestamps = self.prices.copy(), self.volume.copy(), self.timestamps.copy()
+        return other
+
+    def _span(self, n=None):
+        n = self.size if n is None else min(n, self.size)
+        end = self._pos + self.capacity
+        return end - n, end
+
+    def __getitem__(self, field):
+        """Zero-copy view of one field over the whole window, oldest first"""
+        start, end = self._span()
+        if field == "volume":
+            return self.volume[start:end]
+        if field == "timestamp":
+            return self.timestamps[start:end]
+        return self.prices[PRICE_FIELDS.index(field), start:end]
+
+    def times(self, n=None):
+        """ns timestamps of the last n bars (view)"""
+        start, end = self._span(n)
+        return self.timestamps[start:end]
+
+    def last(self, field="close"):
+        """Value of 'field' on the latest bar"""
+        return self[field][-1]
+
+    @property
+    def last_time(self):
+        return int(self.timestamps[self._pos + self.capacity - 1]) if self.size else None
+
+    def frame(self, n=None):
+        """
+        The last n bars as a DataFrame. The price columns are a view of the
+        buffer (no copy); only the small timestamp index is allocated.
+        Like every view here, it is only valid until the next append.
+        """
+        start, end = self._span(n)
+        index = pd.to_datetime(self.timestamps[start:end], utc=True)
+        index.name = "timestamp"
+        df = pd.DataFrame(self.prices[:, start:end].T, index=index, columns=PRICE_FIELDS, copy=False)
+        df["volume"] = self.volume[start:end]
+        return df
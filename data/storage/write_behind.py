@@ -0,0 +1,300 @@
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from config.settings import settings
+from data.storage.database import SessionLocal
+from monitoring.metrics import metrics
+from notifications.discord_logger import discord_logger
+
+# Event fields restored to datetimes when a journal is replayed
+TIME_FIELDS = ("entry_time", "exit_time", "timestamp")
+
+
+class WriteBehindWriter:
+    """
+    Write-behind persistence for Trade and Signal records.
+    Events are appended to a local JSON-lines journal and put on an
+    in-memory queue, and a background thread commits whatever has queued
+    up (for at most WRITE_BEHIND_INTERVAL seconds) in one transaction.
+    The caller never waits on the database.
+
+    Every event has a sequence number, and each transaction also stores the
+    last one it applied (JournalCheckpoint). After a crash the journal is
+    replayed on first use, skipping what the DB already has, so every
+    event is applied exactly once. The journal is truncated whenever the
+    DB has caught up. With WRITE_BEHIND off, events are committed inline.
+
+    DB outages are retried until they pass. An event the DB rejects for its
+    data (IntegrityError/DataError) WRITE_BEHIND_MAX_RETRIES times is moved
+    to a dead-letter file (journal path + ".dead") and skipped.
+    """
+
+    def __init__(self, path=None, enabled=None):
+        self.path = path or settings.JOURNAL_PATH
+        self.dead_letter_path = self.path + ".dead"
+        self.name = os.path.basename(self.path)
+        self.enabled = settings.WRITE_BEHIND if enabled is None else enabled
+        self.queue = queue.Queue()
+        self.seq = 0        # last event journaled
+        self.committed = 0  # last event in the DB
+        self.failed = 0
+        self.dead = 0       # events moved to the dead-letter file
+
+        self._file = None
+        self._lock = threading.Lock()
+        self._worker = None
+
+    # -------------------------------------------------------------- events
+
+    def open_trade(self, symbol, side, quantity, entry_price, stop_loss, entry_time=None):
+        self._record(
+            "open_trade", symbol=symbol, side=side, quantity=float(quantity), entry_price=float(entry_price),
+            stop_loss=float(stop_loss), entry_time=entry_time or datetime.utcnow(), status='open',
+        )
+
+    def close_trade(self, symbol, status, exit_price, exit_time=None):
+        """Closes the symbol's open trade(s)"""
+        self._record(
+            "close_trade", symbol=symbol, status=status, exit_price=float(exit_price),
+            exit_time=exit_time or datetime.utcnow(),
+        )
+
+    def record_signal(self, symbol, signal_type, indicators=None, timestamp=None):
+        self._record(
+            "signal", symbol=symbol, signal_type=signal_type, timestamp=timestamp or datetime.utcnow(),
+            indicators=json.dumps(indicators, default=str) if indicators is not None else None, executed=False,
+        )
+
+    def mark_executed(self, symbol, signal_type, timestamp=None):
+        """
+        Flags the signal recorded with this 'timestamp' (the key record_signal
+        was given) as executed; without one, the symbol's latest of this type
+        """
+        self._record("signal_executed", symbol=symbol, signal_type=signal_type, timestamp=timestamp)
+
+    def _record(self, op, **fields):
+        event = {"op": op, **fields}
+        if not self.enabled:
+            self._commit([event])
+            return
+
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._start()
+            self.seq += 1
+            event["seq"] = self.seq
+            # Journaled before it is queued: a crash after this line loses nothing
+            self._file.write(json.dumps(event, default=datetime.isoformat) + "\n")
+            self._file.flush()
+            self.queue.put(event)
+
+    def flush(self, timeout=5.0):
+        """Waits (up to 'timeout' seconds) until every queued event is in the DB"""
+        deadline = time.monotonic() + timeout
+        while self.queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def sync(self, timeout=30.0):
+        """
+        Like flush, but first starts the flusher if nothing was recorded yet,
+        so entries a previous run left in the journal are in the DB too.
+        Call before reading Trade/Signal rows back.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._start()
+        self.flush(timeout)
+
+    # ---------------------------------------------------------------- worker
+
+    def _start(self):
+        """Reopens the journal, queues entries left by a previous run, starts the flusher"""
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            for event in self._read_journal():
+                self.seq = max(self.seq, event["seq"])
+                if event["op"] != "checkpoint":
+                    self.queue.put(event)
+            # Numbering continues after the DB's checkpoint even if the journal was lost
+            try:
+                self.committed = self._load_checkpoint()
+                self.seq = max(self.seq, self.committed)
+            except Exception as e:
+                print(f"Write-behind: could not read checkpoint: {e}")
+            self._file = open(self.path, "a", encoding="utf-8")
+
+        self._worker = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._worker.start()
+
+    def _read_journal(self):
+        if not os.path.exists(self.path):
+            return []
+        events = []
+        with open(self.path, encoding="utf-8") as journal:
+            for line in journal:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    break  # torn last line from a crash mid-write
+                for field in TIME_FIELDS:
+                    if event.get(field):
+                        event[field] = datetime.fromisoformat(event[field])
+                events.append(event)
+        return events
+
+    def _run(self):
+        self.committed = self._retry(self._load_checkpoint)
+        while True:
+            # Gather up to WRITE_BEHIND_INTERVAL seconds of events into one transaction
+            batch = [self.queue.get()]
+            deadline = time.monotonic() + settings.WRITE_BEHIND_INTERVAL
+            while len(batch) < settings.WRITE_BEHIND_BATCH:
+                try:
+                    batch.append(self.queue.get(timeout=max(deadline - time.monotonic(), 0)))
+                except queue.Empty:
+                    break
+            os.fsync(self._file.fileno())
+
+            # Replayed entries the DB already has are skipped
+            pending = [event for event in batch if event["seq"] > self.committed]
+            if pending:
+                dead = self.dead
+                try:
+                    self._retry(lambda: self._commit(pending, checkpoint=pending[-1]["seq"]))
+                except Exception:
+                    # Rejected data: find the bad event(s) one event per transaction
+                    for event in pending:
+                        self._commit_or_dead_letter(event)
+                self.committed = pending[-1]["seq"]
+                metrics.inc("db_events_written_total", len(pending) - (self.dead - dead))
+
+            with self._lock:
+                if self.seq == self.committed:
+                    self._truncate()
+            for _ in batch:
+                self.queue.task_done()
+            metrics.set("write_behind_queue_depth", self.queue.qsize())
+
+    def _retry(self, fn):
+        """
+        Runs fn until it succeeds; nothing is lost meanwhile, it is all in the journal.
+        Errors caused by the data itself are raised after WRITE_BEHIND_MAX_RETRIES attempts.
+        """
+        delay = 1
+        rejected = 0
+        while True:
+            try:
+                return fn()
+            except Exception as e:
+                self.failed += 1
+                if _rejected(e):
+                    rejected += 1
+                    if rejected >= settings.WRITE_BEHIND_MAX_RETRIES:
+                        raise
+                print(f"Write-behind error (retrying in {delay}s): {e}")
+                time.sleep(delay)
+                delay = min(delay * 2, 60)
+
+    def _commit_or_dead_letter(self, event):
+        """Commits one event; one the DB keeps rejecting is dead-lettered and checkpointed past"""
+        try:
+            self._retry(lambda: self._commit([event], checkpoint=event["seq"]))
+        except Exception as error:
+            self._dead_letter(event, error)
+            self._retry(lambda: self._commit([], checkpoint=event["seq"]))
+
+    def _dead_letter(self, event, error):
+        with open(self.dead_letter_path, "a", encoding="utf-8") as dead:
+            dead.write(json.dumps({**event, "error": str(error)}, default=datetime.isoformat) + "\n")
+            dead.flush()
+            os.fsync(dead.fileno())
+        self.dead += 1
+        metrics.inc("db_events_dead_lettered_total")
+        discord_logger.log_error(
+            f"Write-behind: {event['op']} #{event['seq']} ({event.get('symbol')}) rejected by the DB, "
+            f"moved to {self.dead_letter_path}: {error}"
+        )
+
+    def _truncate(self):
+        """Swaps in an empty journal that only keeps the sequence number (atomically)"""
+        temp = self.path + ".tmp"
+        with open(temp, "w", encoding="utf-8") as journal:
+            journal.write(json.dumps({"op": "checkpoint", "seq": self.seq}) + "\n")
+            journal.flush()
+            os.fsync(journal.fileno())
+        self._file.close()
+        os.replace(temp, self.path)
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def _load_checkpoint(self):
+        from data.storage.models import JournalCheckpoint
+
+        db = SessionLocal()
+        try:
+            checkpoint = db.get(JournalCheckpoint, self.name)
+            return checkpoint.seq if checkpoint else 0
+        finally:
+            db.close()
+
+    def _commit(self, events, checkpoint=None):
+        """Applies 'events' in order in one transaction (plus the checkpoint, if given)"""
+        from data.storage.models import JournalCheckpoint, Signal, Trade
+
+        db = SessionLocal()
+        try:
+            signals = []
+            for event in events:
+                op = event["op"]
+                fields = {k: v for k, v in event.items() if k not in ("op", "seq")}
+                if op == "signal":
+                    signals.append(fields)
+                    continue
+
+                # Keep event order: pending signal rows go in before anything that may touch them
+                if signals:
+                    db.execute(Signal.__table__.insert(), signals)
+                    signals = []
+                if op == "open_trade":
+                    db.add(Trade(**fields))
+                elif op == "close_trade":
+                    db.query(Trade).filter(Trade.symbol == fields["symbol"], Trade.status == 'open').update({
+                        "status": fields["status"], "exit_price": fields["exit_price"], "exit_time": fields["exit_time"]
+                    }, synchronize_session=False)
+                elif op == "signal_executed":
+                    query = db.query(Signal).filter(
+                        Signal.symbol == fields["symbol"], Signal.signal_type == fields["signal_type"]
+                    )
+                    if fields.get("timestamp") is not None:
+                        query = query.filter(Signal.timestamp == fields["timestamp"])
+                    signal = query.order_by(Signal.id.desc()).first()
+                    if signal:
+                        signal.executed = True
+            if signals:
+                db.execute(Signal.__table__.insert(), signals)
+
+            if checkpoint is not None:
+                db.merge(JournalCheckpoint(journal=self.name, seq=checkpoint))
+            with metrics.timer("stage_seconds", stage="db_commit"):
+                db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+
+def _rejected(error):
+    """True for errors the same events will hit on every retry (bad data, not a DB outage)"""
+    from sqlalchemy.exc import DataError, IntegrityError
+
+    return isinstance(error, (DataError, IntegrityError))
+
+
+write_behind = WriteBehindWriter()
+atexit.register(write_behind.flush)
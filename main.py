@@ -1,6 +1,18 @@
 from data.storage.database import init_db
+from data.storage.write_behind import write_behind
 from bots.runner import TradingBot
+from bots.sharded_runner import ShardedRunner
+from config.settings import settings
+from monitoring.metrics import start_metrics_server
 
 if __name__ == "__main__":
     init_db()  # Creates Postgres tables
-    TradingBot().start()
\ No newline at end of file
+    write_behind.sync()  # Commits anything a previous run left in the journal
+    if settings.METRICS_ENABLED:
+        start_metrics_server()
+    if settings.MARKET_DATA_MODE == "stream":
+        TradingBot().start_streaming()
+    elif settings.SHARD_WORKERS > 1:
+        ShardedRunner().start()
+    else:
+        TradingBot().start()
\ No newline at end of file
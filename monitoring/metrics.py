@@ -0,0 +1,180 @@
+import threading
+import time
+from collections import deque
+from functools import wraps
+import numpy as np
+from config.settings import settings
+
+QUANTILES = (0.5, 0.99)
+PREFIX = "tradingbot_"
+
+
+class _NullTimer:
+    """What timer() hands out while metrics are disabled: does nothing"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    def __init__(self, metrics, name, labels, window=None):
+        self.metrics = metrics
+        self.name = name
+        self.labels = labels
+        self.window = window
+        self.elapsed = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
+        self.metrics.observe(self.name, self.elapsed, window=self.window, **self.labels)
+        return False
+
+
+class Metrics:
+    """
+    In-process counters, gauges and latency summaries, rendered in the
+    Prometheus text format. Summaries keep the last 'window' observations
+    per series for p50/p99, plus an all-time sum and count. A series with
+    many label values (e.g. one per symbol) can pass a smaller window.
+    While disabled every call returns after a single attribute check.
+    """
+
+    def __init__(self, enabled=False, window=2048):
+        self.enabled = enabled
+        self.window = window
+        self.counters = {}   # (name, labels) -> value
+        self.gauges = {}     # (name, labels) -> value
+        self.summaries = {}  # (name, labels) -> [recent samples, sum, count]
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items()))
+
+    def inc(self, name, value=1, **labels):
+        if not self.enabled:
+            return
+        key = self._key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        if not self.enabled:
+            return
+        key = self._key(name, labels)
+        with self._lock:
+            self.gauges[key] = value
+
+    def observe(self, name, value, window=None, **labels):
+        if not self.enabled:
+            return
+        key = self._key(name, labels)
+        with self._lock:
+            summary = self.summaries.get(key)
+            if summary is None:
+                summary = self.summaries[key] = [deque(maxlen=window or self.window), 0.0, 0]
+            summary[0].append(value)
+            summary[1] += value
+            summary[2] += 1
+
+    def timer(self, name, window=None, **labels):
+        """Context manager that records its block's duration in seconds"""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, name, labels, window)
+
+    def timed(self, name, **labels):
+        """Decorator form of timer()"""
+        def decorator(fn):
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                with _Timer(self, name, labels):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def quantiles(self, name, **labels):
+        """{quantile: seconds} over the recent window, or {} if nothing was observed"""
+        key = self._key(name, labels)
+        with self._lock:
+            summary = self.summaries.get(key)
+            samples = list(summary[0]) if summary else []
+        if not samples:
+            return {}
+        values = np.quantile(samples, QUANTILES)
+        return dict(zip(QUANTILES, values))
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.gauges.clear()
+            self.summaries.clear()
+
+    def render(self):
+        """All series in the Prometheus text exposition format"""
+        with self._lock:
+            counters = dict(self.counters)
+            gauges = dict(self.gauges)
+            summaries = {k: (list(v[0]), v[1], v[2]) for k, v in self.summaries.items()}
+
+        lines = []
+        for kind, series in (("counter", counters), ("gauge", gauges)):
+            for name in sorted({k[0] for k in series}):
+                lines.append(f"# TYPE {PREFIX}{name} {kind}")
+                for (n, labels), value in sorted(series.items()):
+                    if n == name:
+                        lines.append(f"{PREFIX}{name}{_labels(labels)} {value}")
+
+        for name in sorted({k[0] for k in summaries}):
+            lines.append(f"# TYPE {PREFIX}{name} summary")
+            for (n, labels), (samples, total, count) in sorted(summaries.items()):
+                if n != name:
+                    continue
+                for q, value in zip(QUANTILES, np.quantile(samples, QUANTILES)):
+                    lines.append(f"{PREFIX}{name}{_labels(labels + (('quantile', str(q)),))} {value:.6f}")
+                lines.append(f"{PREFIX}{name}_sum{_labels(labels)} {total:.6f}")
+                lines.append(f"{PREFIX}{name}_count{_labels(labels)} {count}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    pairs = []
+    for key, value in labels:
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"')
+        pairs.append(f'{key}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def start_metrics_server(port=None):
+    """Serves GET /metrics (FastAPI + uvicorn) from a daemon thread"""
+    import uvicorn
+    from fastapi import FastAPI, Response
+
+    app = FastAPI()
+
+    @app.get("/metrics")
+    def read_metrics():
+        return Response(metrics.render(), media_type="text/plain; version=0.0.4")
+
+    config = uvicorn.Config(app, host="0.0.0.0", port=port or settings.METRICS_PORT, log_level="warning")
+    server = uvicorn.Server(config)
+    threading.Thread(target=server.run, name="metrics-server", daemon=True).start()
+    return server
+
+
+metrics = Metrics(enabled=settings.METRICS_ENABLED)
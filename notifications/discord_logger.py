@@ -1,38 +1,73 @@
+import atexit
+import queue
+import threading
+import time
 import requests
 from datetime import datetime
 from config.settings import settings
 
+# Discord webhook limits
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_EMBED_DESCRIPTION = 4096
+MAX_MESSAGE_CHARS = 6000
+MAX_RETRIES = 3
+
 
 class DiscordLogger:
+    """
+    Non-blocking Discord webhook logger.
+    Messages go onto a bounded queue and are delivered by a background thread,
+    up to 10 embeds per webhook call, honouring Discord's rate-limit headers.
+    Per-symbol debug stages are coalesced into one embed per symbol per cycle
+    (see flush_cycle). When the queue is full new messages are dropped rather
+    than ever blocking the trading loop.
+    """
+
+    def __init__(self, max_queue=None):
+        self.queue = queue.Queue(maxsize=max_queue or settings.DISCORD_QUEUE_SIZE)
+        self.session = requests.Session()
+        self.sent = 0
+        self.dropped = 0
+        self.failed = 0
+
+        self._pending_stages = {}  # symbol -> [(stage, description)]
+        self._lock = threading.Lock()
+        self._worker = None
+        self._blocked_until = {}   # webhook -> monotonic time it may be used again
+        self._carry = None         # item taken off the queue for a different webhook
+
     def _send(self, webhook_url, title, description, color):
         if not webhook_url:
             return
         embed = {
-            "embeds": [
-                {
-                    "title": title,
-                    "description": description,
-                    "color": color,
-                    "timestamp": datetime.utcnow().isoformat(),
-                }
-            ]
+            "title": title,
+            "description": description[:MAX_EMBED_DESCRIPTION],
+            "color": color,
+            "timestamp": datetime.utcnow().isoformat(),
         }
+        self._ensure_worker()
         try:
-            requests.post(webhook_url, json=embed)
-        except Exception as e:
-            print(f"Discord Error: {e}")
+            self.queue.put_nowait((webhook_url, embed))
+        except queue.Full:
+            self.dropped += 1
+
+    @property
+    def stats(self):
+        """Queue depth and delivery counters"""
+        return {
+            "queue_depth": self.queue.qsize(),
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
 
     def log_stage(self, stage, message, symbol=None, details=None):
         """
         Sends detailed steps. If 'details' dict is provided,
         it formats them as a code block.
+        Stages for a symbol are held until flush_cycle() and sent as one embed.
         """
-        # 1. Prepare the Title
-        title_text = f"⚙️ {stage}"
-        if symbol:
-            title_text += f" [{symbol}]"
-
-        # 2. Prepare the Description
+        # 1. Prepare the Description
         description_text = message
 
         # If we have data, add the code block to the description
@@ -42,14 +77,38 @@ class DiscordLogger:
                 description_text += f"{key:<12}: {value}\n"
             description_text += "```"
 
+        # 2. Per-symbol stages are coalesced until the end of the cycle
+        if symbol:
+            if settings.DISCORD_WEBHOOK_DEBUG:
+                with self._lock:
+                    self._pending_stages.setdefault(symbol, []).append((stage, description_text))
+            return
+
         # 3. Send with all 4 required arguments
         # Args: (URL, Title, Description, Color)
         self._send(
-            settings.DISCORD_WEBHOOK_DEBUG, title_text, description_text, 9807270
+            settings.DISCORD_WEBHOOK_DEBUG, f"⚙️ {stage}", description_text, 9807270
         )
 
+    def flush_cycle(self):
+        """Queues one embed per symbol holding all of its stages from this cycle"""
+        with self._lock:
+            pending, self._pending_stages = self._pending_stages, {}
+
+        for symbol, stages in pending.items():
+            description = "\n\n".join(f"**{stage}**\n{text}" for stage, text in stages)
+            self._send(settings.DISCORD_WEBHOOK_DEBUG, f"⚙️ [{symbol}]", description, 9807270)
+
+    def flush(self, timeout=5.0):
+        """Waits (up to 'timeout' seconds) for queued messages to be delivered"""
+        self.flush_cycle()
+        deadline = time.monotonic() + timeout
+        while self.queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.05)
+
     def log_trade(self, action, symbol, qty, price):
-        msg = f"**{action.upper()}**\nSymbol: {symbol}\nQty: {qty}\nPrice: ${price:.2f}"
+        price_text = f"${price:.2f}" if isinstance(price, (int, float)) else str(price)
+        msg = f"**{action.upper()}**\nSymbol: {symbol}\nQty: {qty}\nPrice: {price_text}"
         color = 3066993 if action.lower() == "buy" else 15158332
         self._send(settings.DISCORD_WEBHOOK_TRADES, "Trade Executed", msg, color)
 
@@ -65,5 +124,84 @@ class DiscordLogger:
     def log_system(self, msg):
         self._send(settings.DISCORD_WEBHOOK_ALERTS, "ℹ️ System Status", msg, 3447003)
 
+    # ---------------------------------------------------------------- worker
+
+    def _ensure_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            with self._lock:
+                if self._worker is None or not self._worker.is_alive():
+                    self._worker = threading.Thread(target=self._run, name="discord-logger", daemon=True)
+                    self._worker.start()
+
+    def _run(self):
+        while True:
+            webhook_url, embeds = self._next_batch()
+            try:
+                self._post(webhook_url, embeds)
+            except Exception as e:
+                self.failed += len(embeds)
+                print(f"Discord Error: {e}")
+            finally:
+                for _ in embeds:
+                    self.queue.task_done()
+
+    def _next_batch(self):
+        """Blocks for the next message, then adds queued embeds for the same webhook"""
+        webhook_url, embed = self._carry or self.queue.get()
+        self._carry = None
+        embeds = [embed]
+        size = self._embed_size(embed)
+
+        while len(embeds) < MAX_EMBEDS_PER_MESSAGE:
+            try:
+                item = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if item[0] != webhook_url or size + self._embed_size(item[1]) > MAX_MESSAGE_CHARS:
+                self._carry = item
+                break
+            embeds.append(item[1])
+            size += self._embed_size(item[1])
+
+        return webhook_url, embeds
+
+    def _post(self, webhook_url, embeds):
+        for _ in range(MAX_RETRIES + 1):
+            wait = self._blocked_until.get(webhook_url, 0) - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+
+            response = self.session.post(
+                webhook_url, json={"embeds": embeds}, timeout=settings.DISCORD_TIMEOUT
+            )
+
+            # Bucket exhausted: hold further sends to this webhook until it resets
+            if response.headers.get("X-RateLimit-Remaining") == "0":
+                reset_after = float(response.headers.get("X-RateLimit-Reset-After", 1))
+                self._blocked_until[webhook_url] = time.monotonic() + reset_after
+
+            if response.status_code == 429:
+                retry_after = self._retry_after(response)
+                self._blocked_until[webhook_url] = time.monotonic() + retry_after
+                continue
+
+            response.raise_for_status()
+            self.sent += len(embeds)
+            return
+
+        self.failed += len(embeds)
+
+    @staticmethod
+    def _retry_after(response):
+        try:
+            return float(response.json().get("retry_after", 1))
+        except ValueError:
+            return float(response.headers.get("Retry-After", 1))
+
+    @staticmethod
+    def _embed_size(embed):
+        return len(embed["title"]) + len(embed["description"])
+
 
 discord_logger = DiscordLogger()
+atexit.register(discord_logger.flush)
@@ -1,21 +1,46 @@
 import pandas as pd
 import numpy as np
+from strategy import kernels
+from config.settings import settings
+
+
+def _column(data, field):
+    """data[field] as a Series. Array-backed sources (e.g. BarRingBuffer) are wrapped without copying."""
+    column = data[field]
+    return column if isinstance(column, pd.Series) else pd.Series(column, copy=False)
+
+
+def _values(data, field):
+    """data[field] as a float64 array (no copy when it already is one)"""
+    column = data[field]
+    return np.asarray(column.values if isinstance(column, pd.Series) else column, dtype=np.float64)
+
+
+def get_indicators(backend=None):
+    """Indicators for 'backend' (default INDICATOR_BACKEND): 'numpy' kernels or the 'pandas' reference"""
+    backend = backend or settings.INDICATOR_BACKEND
+    if backend == "numpy":
+        return KernelIndicators()
+    if backend == "pandas":
+        return Indicators()
+    raise ValueError(f"Unknown indicator backend: {backend}")
+
 
 class Indicators:
     @staticmethod
     def sma(data, period):
         """Simple Moving Average"""
-        return data['close'].rolling(window=period).mean()
+        return _column(data, 'close').rolling(window=period).mean()
     
     @staticmethod
     def ema(data, period):
         """Exponential Moving Average"""
-        return data['close'].ewm(span=period, adjust=False).mean()
+        return _column(data, 'close').ewm(span=period, adjust=False).mean()
     
     @staticmethod
     def rsi(data, period=14):
         """Relative Strength Index"""
-        delta = data['close'].diff()
+        delta = _column(data, 'close').diff()
         gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
         loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
         rs = gain / loss
@@ -24,9 +49,9 @@ class Indicators:
     @staticmethod
     def atr(data, period=14):
         """Average True Range"""
-        high_low = data['high'] - data['low']
-        high_close = np.abs(data['high'] - data['close'].shift())
-        low_close = np.abs(data['low'] - data['close'].shift())
+        high_low = _column(data, 'high') - _column(data, 'low')
+        high_close = np.abs(_column(data, 'high') - _column(data, 'close').shift())
+        low_close = np.abs(_column(data, 'low') - _column(data, 'close').shift())
         
         ranges = pd.concat([high_low, high_close, low_close], axis=1)
         true_range = np.max(ranges, axis=1)
@@ -35,8 +60,161 @@ class Indicators:
     @staticmethod
     def macd(data, fast=12, slow=26, signal=9):
         """MACD Indicator"""
-        ema_fast = data['close'].ewm(span=fast).mean()
-        ema_slow = data['close'].ewm(span=slow).mean()
+        ema_fast = _column(data, 'close').ewm(span=fast).mean()
+        ema_slow = _column(data, 'close').ewm(span=slow).mean()
         macd_line = ema_fast - ema_slow
         signal_line = macd_line.ewm(span=signal).mean()
-        return macd_line, signal_line
\ No newline at end of file
+        return macd_line, signal_line
+
+    def compute(self, data, sma_short, sma_long, rsi_period):
+        """Every indicator the strategy uses, as {column: values}"""
+        macd_line, signal_line = self.macd(data)
+        return {
+            "sma_short": self.sma(data, sma_short),
+            "sma_long": self.sma(data, sma_long),
+            "rsi": self.rsi(data, rsi_period),
+            "atr": self.atr(data),
+            "macd": macd_line,
+            "macd_signal": signal_line,
+        }
+
+
+class KernelIndicators(Indicators):
+    """
+    Indicators computed by the NumPy kernels in strategy/kernels.py
+    (JIT-compiled when numba is installed) on the raw float arrays.
+    compute() runs all of them in one fused pass. Indicators stays the
+    reference implementation.
+    """
+
+    @staticmethod
+    def _series(values, data):
+        index = data.index if isinstance(data, pd.DataFrame) else None
+        return pd.Series(values, index=index, copy=False)
+
+    @staticmethod
+    def sma(data, period):
+        return KernelIndicators._series(kernels.rolling_mean(_values(data, 'close'), period), data)
+
+    @staticmethod
+    def ema(data, period):
+        # adjust=False: a plain recursive EWM, left to pandas
+        return Indicators.ema(data, period)
+
+    @staticmethod
+    def rsi(data, period=14):
+        return KernelIndicators._series(kernels.rsi(_values(data, 'close'), period), data)
+
+    @staticmethod
+    def atr(data, period=14):
+        true_range = kernels.true_range(_values(data, 'high'), _values(data, 'low'), _values(data, 'close'))
+        return KernelIndicators._series(kernels.rolling_mean(true_range, period), data)
+
+    @staticmethod
+    def macd(data, fast=12, slow=26, signal=9):
+        macd_line, signal_line = kernels.macd(_values(data, 'close'), fast, slow, signal)
+        return KernelIndicators._series(macd_line, data), KernelIndicators._series(signal_line, data)
+
+    def compute(self, data, sma_short, sma_long, rsi_period):
+        out = kernels.fused(
+            _values(data, 'high'), _values(data, 'low'), _values(data, 'close'), sma_short, sma_long, rsi_period
+        )
+        return dict(zip(kernels.FUSED_COLUMNS, out))
+
+
+class PanelIndicators:
+    """
+    Same indicators as Indicators, computed for many symbols at once.
+    Every input is a 2-D float array shaped (symbols, time), right-aligned,
+    with NaN padding in front of symbols that have fewer bars.
+    """
+
+    @staticmethod
+    def sma(close, period):
+        """
+        Simple Moving Average along the time axis, from cumulative sums like
+        kernels.rolling_mean (O(N) whatever the period). NaN while the window
+        holds a NaN, as in pandas.
+        """
+        out = np.full(close.shape, np.nan)
+        if close.shape[1] >= period:
+            missing = np.isnan(close)
+            sums = np.where(missing, 0.0, close)
+            np.cumsum(sums, axis=1, out=sums)
+
+            means = out[:, period - 1:]
+            means[:, 0] = sums[:, period - 1]
+            np.subtract(sums[:, period:], sums[:, :-period], out=means[:, 1:])
+            means /= period
+
+            if missing.any():
+                gaps = np.cumsum(missing, axis=1, dtype=np.int32)
+                windows = gaps[:, period - 1:].copy()
+                windows[:, 1:] -= gaps[:, :-period]
+                means[windows > 0] = np.nan
+        return out
+
+    @staticmethod
+    def ewm_mean(values, span):
+        """pandas ewm(span=span).mean() (adjust=True) along the time axis"""
+        decay = 1 - 2.0 / (span + 1)
+        out = np.empty(values.shape)
+        weighted = np.full(values.shape[0], np.nan)
+        old_wt = np.ones(values.shape[0])
+
+        # Loop over time, vectorized over symbols
+        for t in range(values.shape[1]):
+            cur = values[:, t]
+            observed = ~np.isnan(cur)
+            started = ~np.isnan(weighted)
+
+            step = started & observed
+            old_wt = np.where(started, old_wt * decay, old_wt)
+            blended = (old_wt * weighted + cur) / (old_wt + 1.0)
+            weighted = np.where(step & (weighted != cur), blended, weighted)
+            old_wt = np.where(step, old_wt + 1.0, old_wt)
+
+            first = ~started & observed
+            weighted = np.where(first, cur, weighted)
+            old_wt = np.where(first, 1.0, old_wt)
+
+            out[:, t] = weighted
+        return out
+
+    @staticmethod
+    def rsi(close, period=14):
+        """Relative Strength Index"""
+        delta = np.full(close.shape, np.nan)
+        delta[:, 1:] = np.diff(close, axis=1)
+
+        # Match pandas: a missing delta counts as 0, padding stays missing
+        gain = np.where(delta > 0, delta, 0.0)
+        loss = np.where(delta < 0, -delta, 0.0)
+        gain[np.isnan(close)] = np.nan
+        loss[np.isnan(close)] = np.nan
+
+        avg_gain = PanelIndicators.sma(gain, period)
+        avg_loss = PanelIndicators.sma(loss, period)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rs = avg_gain / avg_loss
+            return 100 - (100 / (1 + rs))
+
+    @staticmethod
+    def atr(high, low, close, period=14):
+        """Average True Range"""
+        prev_close = np.full(close.shape, np.nan)
+        prev_close[:, 1:] = close[:, :-1]
+
+        # fmax skips NaN like DataFrame.max(axis=1) does
+        true_range = np.fmax(
+            high - low,
+            np.fmax(np.abs(high - prev_close), np.abs(low - prev_close))
+        )
+        return PanelIndicators.sma(true_range, period)
+
+    @staticmethod
+    def macd(close, fast=12, slow=26, signal=9):
+        """MACD Indicator"""
+        macd_line = PanelIndicators.ewm_mean(close, fast) - PanelIndicators.ewm_mean(close, slow)
+        signal_line = PanelIndicators.ewm_mean(macd_line, signal)
+        return macd_line, signal_line
@@ -0,0 +1,204 @@
+"""
+NumPy kernels for the strategy's indicators, on raw float64 arrays.
+
+fused() computes SMA short/long, RSI, ATR and MACD/signal into one
+preallocated (6, n) array. With numba installed it is a single JIT-compiled
+pass over the bars; without it, each indicator is a vectorized NumPy
+expression sharing the same intermediates. Results match the pandas
+implementations in strategy/indicators.py (the reference) to rounding.
+Inputs are expected to be finite; NaN handling is not pandas-exact.
+"""
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # optional: the NumPy versions are used instead
+    njit = None
+
+# Rows of fused()'s output
+FUSED_COLUMNS = ("sma_short", "sma_long", "rsi", "atr", "macd", "macd_signal")
+
+# Largest decay**-k allowed inside one ewm_mean block (bounds the rounding error)
+_EWM_BLOCK_RANGE = 1e6
+
+
+def rolling_mean(values, period, out=None):
+    """pandas rolling(period).mean(): NaN until a full window"""
+    n = len(values)
+    if out is None:
+        out = np.empty(n)
+    out[:min(period - 1, n)] = np.nan
+    if n >= period:
+        sums = np.cumsum(values)
+        out[period - 1] = sums[period - 1]
+        out[period:] = sums[period:] - sums[:-period]
+        out[period - 1:] /= period
+    return out
+
+
+def ewm_mean(values, span, out=None):
+    """
+    pandas ewm(span=span).mean() (adjust=True): a weighted mean whose
+    weights decay by (1 - 2 / (span + 1)) per bar. The weighted sums are
+    scaled cumulative sums over fixed-size blocks (short enough that the
+    scaling never loses precision), all blocks at once; each block then
+    adds the decayed sums of the blocks before it.
+    """
+    n = len(values)
+    if out is None:
+        out = np.empty(n)
+    decay = 1 - 2.0 / (span + 1)
+    if decay <= 0 or n == 0:
+        out[:] = values
+        return out
+
+    block = min(max(int(np.log(_EWM_BLOCK_RANGE) / -np.log(decay)), 1), n)
+    blocks = -(-n // block)
+    padded = np.zeros(blocks * block)
+    padded[:n] = values
+    powers = decay ** np.arange(block + 1)  # decay**k
+
+    sums = np.cumsum(padded.reshape(blocks, block) / powers[:block], axis=1)
+    sums *= powers[:block]
+
+    # Weighted sum at each block's end including all earlier blocks. Those
+    # fade by decay**block per block, so a few terms reach full precision.
+    ends = sums[:, -1]
+    carry = ends.copy()
+    fade = 1.0
+    for lag in range(1, blocks):
+        fade *= powers[block]
+        if fade < 1e-17:
+            break
+        carry[lag:] += fade * ends[:-lag]
+    sums[1:] += carry[:-1, None] * powers[1:]
+
+    # Divided by the sum of the weights, 1 + decay + ... + decay**t
+    np.divide(sums.ravel()[:n], (1 - decay ** np.arange(1, n + 1)) / (1 - decay), out=out)
+    return out
+
+
+def true_range(high, low, close, out=None):
+    """max(high - low, |high - prev close|, |low - prev close|); high - low on the first bar"""
+    if out is None:
+        out = np.empty(len(close))
+    np.subtract(high, low, out=out)
+    if len(close) > 1:
+        prev_close = close[:-1]
+        np.maximum(out[1:], np.abs(high[1:] - prev_close), out=out[1:])
+        np.maximum(out[1:], np.abs(low[1:] - prev_close), out=out[1:])
+    return out
+
+
+def rsi(close, period, out=None):
+    """Relative Strength Index over simple-average gains and losses"""
+    n = len(close)
+    if out is None:
+        out = np.empty(n)
+    delta = np.zeros(n)
+    np.subtract(close[1:], close[:-1], out=delta[1:])
+    avg_gain = rolling_mean(np.maximum(delta, 0.0), period)
+    avg_loss = rolling_mean(np.maximum(-delta, 0.0), period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        np.divide(avg_gain, avg_loss, out=out)
+    # 100 - 100 / (1 + rs)
+    out += 1.0
+    np.divide(100.0, out, out=out)
+    np.subtract(100.0, out, out=out)
+    return out
+
+
+def macd(close, fast=12, slow=26, signal=9, out_macd=None, out_signal=None):
+    out_macd = ewm_mean(close, fast, out_macd)
+    out_macd -= ewm_mean(close, slow)
+    return out_macd, ewm_mean(out_macd, signal, out_signal)
+
+
+def _fused_numpy(high, low, close, sma_short, sma_long, rsi_period, atr_period, fast, slow, signal, out):
+    rolling_mean(close, sma_short, out[0])
+    rolling_mean(close, sma_long, out[1])
+    rsi(close, rsi_period, out[2])
+    rolling_mean(true_range(high, low, close), atr_period, out[3])
+    macd(close, fast, slow, signal, out[4], out[5])
+    return out
+
+
+def _fused_loop(high, low, close, sma_short, sma_long, rsi_period, atr_period, fast, slow, signal, out):
+    """All six indicators in one pass over the bars (compiled by numba)"""
+    n = len(close)
+    gains = np.zeros(n)
+    losses = np.zeros(n)
+    ranges = np.zeros(n)
+    d_fast = 1 - 2.0 / (fast + 1)
+    d_slow = 1 - 2.0 / (slow + 1)
+    d_signal = 1 - 2.0 / (signal + 1)
+
+    sum_short = sum_long = sum_gain = sum_loss = sum_range = 0.0
+    num_fast = num_slow = num_signal = 0.0
+    den_fast = den_slow = den_signal = 0.0
+
+    for t in range(n):
+        c = close[t]
+
+        # SMAs
+        sum_short += c
+        sum_long += c
+        if t >= sma_short:
+            sum_short -= close[t - sma_short]
+        if t >= sma_long:
+            sum_long -= close[t - sma_long]
+        out[0, t] = sum_short / sma_short if t >= sma_short - 1 else np.nan
+        out[1, t] = sum_long / sma_long if t >= sma_long - 1 else np.nan
+
+        # RSI
+        if t > 0:
+            delta = c - close[t - 1]
+            gains[t] = delta if delta > 0 else 0.0
+            losses[t] = -delta if delta < 0 else 0.0
+        sum_gain += gains[t]
+        sum_loss += losses[t]
+        if t >= rsi_period:
+            sum_gain -= gains[t - rsi_period]
+            sum_loss -= losses[t - rsi_period]
+        if t >= rsi_period - 1:
+            out[2, t] = 100.0 - 100.0 / (1.0 + (sum_gain / rsi_period) / (sum_loss / rsi_period))
+        else:
+            out[2, t] = np.nan
+
+        # ATR
+        ranges[t] = high[t] - low[t]
+        if t > 0:
+            ranges[t] = max(ranges[t], abs(high[t] - close[t - 1]), abs(low[t] - close[t - 1]))
+        sum_range += ranges[t]
+        if t >= atr_period:
+            sum_range -= ranges[t - atr_period]
+        out[3, t] = sum_range / atr_period if t >= atr_period - 1 else np.nan
+
+        # MACD: adjusted EWMs as running weighted sums
+        num_fast = c + d_fast * num_fast
+        den_fast = 1.0 + d_fast * den_fast
+        num_slow = c + d_slow * num_slow
+        den_slow = 1.0 + d_slow * den_slow
+        line = num_fast / den_fast - num_slow / den_slow
+        num_signal = line + d_signal * num_signal
+        den_signal = 1.0 + d_signal * den_signal
+        out[4, t] = line
+        out[5, t] = num_signal / den_signal
+    return out
+
+
+if njit is not None:
+    # error_model='numpy': x / 0 gives inf/NaN like NumPy instead of raising
+    _fused_loop = njit(cache=True, nogil=True, error_model='numpy')(_fused_loop)
+
+
+def fused(high, low, close, sma_short, sma_long, rsi_period, atr_period=14, fast=12, slow=26, signal=9, out=None):
+    """
+    Every strategy indicator for one series, as rows of a (6, n) array
+    (see FUSED_COLUMNS). 'out' may be passed in to reuse its memory.
+    """
+    high, low, close = (np.ascontiguousarray(a, dtype=np.float64) for a in (high, low, close))
+    if out is None:
+        out = np.empty((len(FUSED_COLUMNS), len(close)))
+    kernel = _fused_loop if njit is not None else _fused_numpy
+    return kernel(high, low, close, sma_short, sma_long, rsi_period, atr_period, fast, slow, signal, out)
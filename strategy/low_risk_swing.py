@@ -1,31 +1,104 @@
+import numpy as np
 import pandas as pd
-from strategy.indicators import Indicators
+from strategy.indicators import PanelIndicators, get_indicators
+from strategy.streaming_indicators import StreamingIndicators
+from data.storage.bar_aggregator import timeframe_minutes
+from data.storage.ring_buffer import BarRingBuffer, index_ns
 from config.settings import settings
+from monitoring.metrics import metrics
+
+
+# Settings that can be overridden per strategy instance (e.g. by the optimizer)
+STRATEGY_PARAMS = (
+    "SMA_SHORT",
+    "SMA_LONG",
+    "RSI_PERIOD",
+    "RSI_OVERSOLD",
+    "RSI_OVERBOUGHT",
+    "STOP_LOSS_ATR_MULTIPLIER",
+)
 
 
 class LowRiskSwingStrategy:
-    def __init__(self):
-        self.indicators = Indicators()
+    def __init__(self, params=None, indicators=None, timeframe=None):
+        """
+        params: optional dict overriding any of STRATEGY_PARAMS, so parameter sets
+        can be injected without mutating the global settings.
+        timeframe: bar size the strategy evaluates ('1Min', '5Min', '15Min',
+        '1Hour', '1Day'; default STRATEGY_TIMEFRAME). The runner builds it from
+        the minute feed with a BarAggregator.
+        """
+        self.timeframe = str(timeframe or settings.STRATEGY_TIMEFRAME)
+        timeframe_minutes(self.timeframe)  # raises ValueError if unsupported
+
+        self.params = {name: getattr(settings, name) for name in STRATEGY_PARAMS}
+        if params:
+            unknown = set(params) - set(STRATEGY_PARAMS)
+            if unknown:
+                raise ValueError(f"Unknown strategy params: {', '.join(sorted(unknown))}")
+            self.params.update(params)
 
+        self.indicators = indicators or get_indicators()
+        self.streams = {}  # symbol -> StreamingIndicators
+
+    @metrics.timed("stage_seconds", stage="indicators")
     def calculate_indicators(self, data):
         """Calculate all required indicators"""
-        df = data.copy()
+        columns = self.indicators.compute(
+            data, self.params["SMA_SHORT"], self.params["SMA_LONG"], self.params["RSI_PERIOD"]
+        )
+        # One new frame instead of a copy plus one insert per column
+        return pd.DataFrame(
+            {**{name: data[name].values for name in data.columns},
+             **{name: np.asarray(values) for name, values in columns.items()}},
+            index=data.index
+        )
 
-        df["sma_short"] = self.indicators.sma(df, settings.SMA_SHORT)
-        df["sma_long"] = self.indicators.sma(df, settings.SMA_LONG)
-        df["rsi"] = self.indicators.rsi(df, settings.RSI_PERIOD)
-        df["atr"] = self.indicators.atr(df)
-        df["macd"], df["macd_signal"] = self.indicators.macd(df)
+    def update_stream(self, symbol, data):
+        """
+        Feeds only the new bars in 'data' (a DataFrame or BarRingBuffer) into
+        the symbol's streaming indicators.
+        Returns the StreamingIndicators holding the latest/prev values.
+        """
+        if isinstance(data, BarRingBuffer):
+            times, high, low, close = data.times(), data['high'], data['low'], data['close']
+        else:
+            times = index_ns(data.index)
+            high, low, close = data['high'].values, data['low'].values, data['close'].values
 
-        return df
+        stream = self.streams.get(symbol)
 
-    def generate_signal(self, data):
+        # (Re)seed from the whole window on first sight, when bars were missed
+        # or when the last bar fed was revised since
+        if (
+            stream is None or stream.last_time is None or times[0] > stream.last_time
+            or stream.revised(times, high, low, close)
+        ):
+            stream = StreamingIndicators(
+                self.params["SMA_SHORT"], self.params["SMA_LONG"], self.params["RSI_PERIOD"]
+            )
+            self.streams[symbol] = stream
+
+        stream.update_arrays(times, high, low, close)
+        return stream
+
+    @metrics.timed("stage_seconds", stage="signal")
+    def generate_signal(self, data, symbol=None):
         """
         Returns: (signal, score, reason, atr, debug_data)
+        'data' is a DataFrame of bars or a BarRingBuffer. If 'symbol' is given, indicators are updated incrementally per new bar
+        instead of being recomputed over the whole window.
         """
-        df = self.calculate_indicators(data)
-        latest = df.iloc[-1]
-        prev = df.iloc[-2]
+        if symbol is not None and settings.INCREMENTAL_INDICATORS:
+            stream = self.update_stream(symbol, data)
+            latest = stream.latest
+            prev = stream.prev
+        else:
+            if isinstance(data, BarRingBuffer):
+                data = data.frame()
+            df = self.calculate_indicators(data)
+            latest = df.iloc[-1]
+            prev = df.iloc[-2]
         
         signal = 'HOLD'
         score = 0
@@ -46,10 +119,10 @@ class LowRiskSwingStrategy:
             reasons.append("Bearish SMA crossover")
 
         # RSI
-        if latest["rsi"] < settings.RSI_OVERSOLD:
+        if latest["rsi"] < self.params["RSI_OVERSOLD"]:
             score += 2
             reasons.append(f"RSI oversold ({latest['rsi']:.1f})")
-        elif latest["rsi"] > settings.RSI_OVERBOUGHT:
+        elif latest["rsi"] > self.params["RSI_OVERBOUGHT"]:
             score -= 2
             reasons.append(f"RSI overbought ({latest['rsi']:.1f})")
 
@@ -73,8 +146,15 @@ class LowRiskSwingStrategy:
         elif score <= -4:
             signal = "SELL"
 
-        # NEW: Capture the exact values for the logs
-        debug_data = {
+        # The exact values behind the decision, for the logs
+        debug_data = self.debug_data(latest)
+
+        return signal, score, "; ".join(reasons), latest['atr'], debug_data
+
+    @staticmethod
+    def debug_data(latest):
+        """Formats the latest indicator values for the logs"""
+        return {
             "Close Price": f"${latest['close']:.2f}",
             "RSI (14)":    f"{latest['rsi']:.1f}",
             "SMA Short":   f"${latest['sma_short']:.2f}",
@@ -83,7 +163,118 @@ class LowRiskSwingStrategy:
             "ATR":         f"{latest['atr']:.2f}"
         }
 
-        # Return the new debug_data dictionary at the end
-        return signal, score, "; ".join(reasons), latest['atr'], debug_data
+    def calculate_panel_indicators(self, high, low, close):
+        """Calculate all required indicators for a (symbols, time) panel"""
+        macd, macd_signal = PanelIndicators.macd(close)
+        return {
+            "close": close,
+            "sma_short": PanelIndicators.sma(close, self.params["SMA_SHORT"]),
+            "sma_long": PanelIndicators.sma(close, self.params["SMA_LONG"]),
+            "rsi": PanelIndicators.rsi(close, self.params["RSI_PERIOD"]),
+            "atr": PanelIndicators.atr(high, low, close),
+            "macd": macd,
+            "macd_signal": macd_signal,
+        }
+
+    def score_arrays(self, latest, prev):
+        """
+        Vectorized version of the generate_signal scoring rules.
+        'latest' and 'prev' map indicator names to equally shaped arrays.
+        Returns: (score, sma_cross, rsi_zone, macd_cross), the last three in {-1, 0, 1}
+        """
+        # SMA Crossover
+        sma_cross = np.where(
+            (latest["sma_short"] > latest["sma_long"]) & (prev["sma_short"] <= prev["sma_long"]), 1,
+            np.where((latest["sma_short"] < latest["sma_long"]) & (prev["sma_short"] >= prev["sma_long"]), -1, 0)
+        )
+
+        # RSI
+        rsi_zone = np.where(
+            latest["rsi"] < self.params["RSI_OVERSOLD"], 1,
+            np.where(latest["rsi"] > self.params["RSI_OVERBOUGHT"], -1, 0)
+        )
+
+        # MACD
+        macd_cross = np.where(
+            (latest["macd"] > latest["macd_signal"]) & (prev["macd"] <= prev["macd_signal"]), 1,
+            np.where((latest["macd"] < latest["macd_signal"]) & (prev["macd"] >= prev["macd_signal"]), -1, 0)
+        )
+
+        score = 3 * sma_cross + 2 * rsi_zone + 2 * macd_cross
+        return score, sma_cross, rsi_zone, macd_cross
+
+    def generate_signals_batch(self, panel, symbols=None):
+        """
+        Evaluates the whole universe in one vectorized pass.
+        'panel' is either:
+          - a Multi-Index (symbol, timestamp) DataFrame, as returned by alpaca-py
+          - a dict of {symbol: DataFrame}
+          - a dict of {'high', 'low', 'close'} 2-D arrays shaped (symbols, time),
+            with 'symbols' naming the rows
+        Returns: DataFrame indexed by symbol with signal, score, reason, atr
+        and the latest indicator values.
+        """
+        high, low, close, symbols = self._to_panel(panel, symbols)
+        ind = self.calculate_panel_indicators(high, low, close)
+
+        latest = {name: values[:, -1] for name, values in ind.items()}
+        prev = {name: values[:, -2] for name, values in ind.items()}
+        score, sma_cross, rsi_zone, macd_cross = self.score_arrays(latest, prev)
+
+        # Determine signal
+        signal = np.where(score >= 4, "BUY", np.where(score <= -4, "SELL", "HOLD"))
+
+        # Reason strings are only built for symbols where something fired
+        reasons = np.full(len(symbols), "", dtype=object)
+        for i in np.flatnonzero((sma_cross != 0) | (rsi_zone != 0) | (macd_cross != 0)):
+            parts = []
+            if sma_cross[i]:
+                parts.append("Bullish SMA crossover" if sma_cross[i] > 0 else "Bearish SMA crossover")
+            if rsi_zone[i] > 0:
+                parts.append(f"RSI oversold ({latest['rsi'][i]:.1f})")
+            elif rsi_zone[i] < 0:
+                parts.append(f"RSI overbought ({latest['rsi'][i]:.1f})")
+            if macd_cross[i]:
+                parts.append("MACD bullish cross" if macd_cross[i] > 0 else "MACD bearish cross")
+            reasons[i] = "; ".join(parts)
+
+        result = pd.DataFrame(latest, index=pd.Index(symbols, name="symbol"))
+        result.insert(0, "signal", signal)
+        result.insert(1, "score", score)
+        result.insert(2, "reason", reasons)
+        return result
+
+    @staticmethod
+    def _to_panel(panel, symbols=None):
+        """Converts the supported panel layouts to right-aligned (symbols, time) arrays"""
+        fields = ("high", "low", "close")
+
+        if isinstance(panel, pd.DataFrame):
+            codes, uniques = pd.factorize(panel.index.get_level_values(0))
+            # Right-align each symbol's bars so the latest bar is always the last column
+            from_end = panel.groupby(codes, sort=False).cumcount(ascending=False).values
+            length = int(from_end.max()) + 1 if len(from_end) else 0
+            columns = length - 1 - from_end
+
+            arrays = []
+            for field in fields:
+                values = np.full((len(uniques), length), np.nan)
+                values[codes, columns] = panel[field].values
+                arrays.append(values)
+            return arrays[0], arrays[1], arrays[2], list(uniques)
+
+        if all(field in panel for field in fields):
+            if symbols is None:
+                symbols = list(range(len(panel["close"])))
+            arrays = [np.asarray(panel[field], dtype=np.float64) for field in fields]
+            return arrays[0], arrays[1], arrays[2], list(symbols)
 
-        # return signal, score, "; ".join(reasons), latest["atr"]
+        # dict of {symbol: DataFrame}
+        symbols = list(panel.keys()) if symbols is None else list(symbols)
+        length = max((len(panel[s]) for s in symbols), default=0)
+        arrays = [np.full((len(symbols), length), np.nan) for _ in fields]
+        for row, symbol in enumerate(symbols):
+            bars = panel[symbol]
+            for values, field in zip(arrays, fields):
+                values[row, length - len(bars):] = np.asarray(bars[field])
+        return arrays[0], arrays[1], arrays[2], symbols
@@ -0,0 +1,199 @@
+from itertools import islice
+import numpy as np
+from data.storage.ring_buffer import BarRingBuffer, index_ns
+
+# Slack (relative to the price) on every comparison: a symbol this close
+# to a threshold is always evaluated, so rounding never hides a signal
+_EPS = 1e-9
+
+# Per-symbol state kept from the last full evaluation
+FIELDS = (
+    "close",
+    "sma_short", "sma_long",
+    "ema_fast", "ema_fast_weight",  # ExponentialMean value / old_weight
+    "ema_slow", "ema_slow_weight",
+    "signal", "signal_weight",
+    "gain_sum", "loss_sum",         # RSI window sums
+    "fired",                        # 1 if the last evaluation was a BUY/SELL
+)
+_F = {name: i for i, name in enumerate(FIELDS)}
+
+# Oldest values of each window, i.e. the next ones to leave it (cumulative sums)
+OUTGOING = ("sma_short", "sma_long", "gain", "loss")
+
+
+class Screener:
+    """
+    Vectorized pre-filter ahead of LowRiskSwingStrategy.generate_signal.
+
+    A BUY/SELL needs |score| >= 4: at least two of the SMA cross, RSI zone
+    and MACD cross pointing the same way. remember() keeps each symbol's
+    streaming indicator state after a full evaluation. survivors() then
+    rolls that state forward over the bars since, for the whole universe in
+    one NumPy pass: window sums from the values entering and leaving, the
+    EMAs by their recursion. It keeps only the symbols whose latest bar can
+    reach the threshold, or that sit within rounding of a crossing.
+
+    Symbols without state, further behind than the shortest window, whose
+    last evaluated bar was revised, or with indicators still warming up
+    (NaN) always survive.
+    """
+
+    def __init__(self, params):
+        self.sma_short = params["SMA_SHORT"]
+        self.sma_long = params["SMA_LONG"]
+        self.rsi_period = params["RSI_PERIOD"]
+        # RSI < x  <=>  gain_sum < loss_sum * x / (100 - x)
+        self.oversold = params["RSI_OVERSOLD"] / (100 - params["RSI_OVERSOLD"])
+        self.overbought = params["RSI_OVERBOUGHT"] / (100 - params["RSI_OVERBOUGHT"])
+        # Values leaving the windows must still be in them at the last evaluation
+        self.max_bars = min(self.sma_short, self.sma_long, self.rsi_period)
+        self.decays = None  # (fast, slow, signal) EMA decays, from the first stream seen
+
+        self.rows = {}  # symbol -> row of the state arrays
+        self.time = np.zeros(0, dtype=np.int64)  # ns time of the last evaluated bar
+        self.values = np.zeros((0, len(FIELDS)))
+        self.outgoing = np.zeros((0, len(OUTGOING), self.max_bars))
+
+    def remember(self, symbol, stream, signal):
+        """Keeps 'stream' (StreamingIndicators, just evaluated to 'signal') for the next screen"""
+        if stream is None or stream.latest is None:
+            return
+        row = self.rows.get(symbol)
+        if row is None:
+            row = self.rows[symbol] = len(self.rows)
+            if row >= len(self.time):
+                self._grow()
+        if self.decays is None:
+            self.decays = (stream.ema_fast.decay, stream.ema_slow.decay, stream.macd_signal.decay)
+
+        latest = stream.latest
+        values = self.values[row]
+        values[_F["close"]] = latest["close"]
+        values[_F["sma_short"]] = latest["sma_short"]
+        values[_F["sma_long"]] = latest["sma_long"]
+        for name, ema in (("ema_fast", stream.ema_fast), ("ema_slow", stream.ema_slow), ("signal", stream.macd_signal)):
+            values[_F[name]] = ema.value
+            values[_F[name + "_weight"]] = ema.old_weight
+        values[_F["gain_sum"]] = stream.avg_gain.total
+        values[_F["loss_sum"]] = stream.avg_loss.total
+        values[_F["fired"]] = signal != 'HOLD'
+
+        outgoing = self.outgoing[row]
+        outgoing[:] = np.nan  # windows not full yet: never screened
+        for i, window in enumerate((stream.sma_short, stream.sma_long, stream.avg_gain, stream.avg_loss)):
+            if len(window.window) == window.period:
+                outgoing[i] = np.cumsum(np.fromiter(islice(window.window, self.max_bars), float))
+        self.time[row] = stream.last_time
+
+    def _grow(self):
+        size = max(2 * len(self.time), 64)
+        self.time = np.resize(self.time, size)
+        self.values = np.resize(self.values, (size, len(FIELDS)))
+        self.outgoing = np.resize(self.outgoing, (size, len(OUTGOING), self.max_bars))
+
+    def survivors(self, bars_by_symbol):
+        """
+        The symbols of {symbol: bars} (DataFrame or BarRingBuffer, as the
+        strategy evaluates them) whose latest bar may produce a BUY/SELL,
+        in order.
+        """
+        symbols = list(bars_by_symbol)
+        keep = np.zeros(len(symbols), dtype=bool)
+        screened = []  # (position, row, new closes)
+
+        # 1. The closes since each symbol's last evaluation
+        for i, symbol in enumerate(symbols):
+            row = self.rows.get(symbol)
+            bars = bars_by_symbol[symbol]
+            if row is None or len(bars) == 0:
+                keep[i] = True
+                continue
+            if isinstance(bars, BarRingBuffer):
+                times, close = bars.times(), bars['close']
+            else:
+                times, close = index_ns(bars.index), bars['close'].values
+            seen = int(np.searchsorted(times, self.time[row], side="right"))
+            count = len(times) - seen
+            if seen and times[seen - 1] == self.time[row] and close[seen - 1] != self.values[row, _F["close"]]:
+                # The last evaluated bar was revised since: the stream reseeds
+                keep[i] = True
+            elif count == 0:
+                # Nothing new: the evaluation would repeat the last one
+                keep[i] = self.values[row, _F["fired"]] > 0
+            elif count > self.max_bars or count == len(times):
+                keep[i] = True
+            else:
+                screened.append((i, row, close[-count:]))
+
+        # 2. Everyone's latest scores at once
+        if screened:
+            positions = np.array([i for i, _, _ in screened])
+            rows = np.array([row for _, row, _ in screened])
+            new = np.full((len(screened), self.max_bars), np.nan)
+            for j, (_, _, closes) in enumerate(screened):
+                new[j, :len(closes)] = closes
+            keep[positions] = self._might_fire(rows, new)
+
+        return [symbol for symbol, kept in zip(symbols, keep) if kept]
+
+    def _might_fire(self, rows, new):
+        """new: (symbols, max_bars) closes since the last evaluation, NaN-padded"""
+        values = self.values[rows]
+        v = {name: values[:, i] for name, i in _F.items()}
+        count = (~np.isnan(new)).sum(axis=1)
+        latest = count - 1
+        tol = _EPS * np.abs(v["close"])
+        everyone = np.arange(len(rows))
+
+        # SMA cross: each mean moves by (sum of closes in - sum of closes out) / period
+        sums = np.cumsum(np.nan_to_num(new), axis=1)
+        gaps = []  # sma_short - sma_long one bar before the latest, and at the latest
+        for bar in (latest - 1, latest):
+            entered_sum = np.where(bar >= 0, sums[everyone, np.maximum(bar, 0)], 0.0)
+            means = []
+            for name, period, out in (("sma_short", self.sma_short, 0), ("sma_long", self.sma_long, 1)):
+                left = np.where(bar >= 0, self.outgoing[rows, out, np.maximum(bar, 0)], 0.0)
+                means.append(v[name] + (entered_sum - left) / period)
+            gaps.append(means[0] - means[1])
+        sma_buy = (gaps[0] <= tol) & (gaps[1] > -tol)
+        sma_sell = (gaps[0] >= -tol) & (gaps[1] < tol)
+
+        # MACD cross: the ExponentialMean updates, replayed bar by bar
+        d_fast, d_slow, d_signal = self.decays
+        state = {name: v[name].copy() for name in ("ema_fast", "ema_fast_weight", "ema_slow", "ema_slow_weight", "signal", "signal_weight")}
+        previous = v["ema_fast"] - v["ema_slow"] - v["signal"]  # macd - macd_signal
+        last = previous
+        for bar in range(int(latest.max()) + 1):
+            active = bar <= latest
+            x = np.where(active, new[:, bar], 0.0)
+            fast = self._ema_step(state, "ema_fast", d_fast, x, active)
+            slow = self._ema_step(state, "ema_slow", d_slow, x, active)
+            signal = self._ema_step(state, "signal", d_signal, fast - slow, active)
+            previous = np.where(bar == latest - 1, fast - slow - signal, previous)
+            last = np.where(bar == latest, fast - slow - signal, last)
+        macd_buy = (previous <= tol) & (last > -tol)
+        macd_sell = (previous >= -tol) & (last < tol)
+
+        # RSI zone at the latest bar: window sums of gains/losses
+        moves = np.diff(np.column_stack([v["close"], new]), axis=1)
+        gains = v["gain_sum"] - self.outgoing[rows, 2, latest] + np.nansum(np.maximum(moves, 0), axis=1)
+        losses = v["loss_sum"] - self.outgoing[rows, 3, latest] + np.nansum(np.maximum(-moves, 0), axis=1)
+        slack = _EPS * (gains + losses)
+        rsi_buy = gains < self.oversold * losses + slack
+        rsi_sell = gains > self.overbought * losses - slack
+
+        best_buy = 3 * sma_buy + 2 * rsi_buy + 2 * macd_buy
+        best_sell = 3 * sma_sell + 2 * rsi_sell + 2 * macd_sell
+        unknown = np.isnan(values).any(axis=1) | np.isnan(self.outgoing[rows]).any(axis=(1, 2))
+        return (best_buy >= 4) | (best_sell >= 4) | unknown
+
+    @staticmethod
+    def _ema_step(state, name, decay, x, active):
+        """One ExponentialMean.update for every active row (same arithmetic, same results)"""
+        weight = state[name + "_weight"] * decay
+        value = state[name]
+        updated = np.where(value != x, (weight * value + x) / (weight + 1.0), value)
+        state[name] = np.where(active, updated, value)
+        state[name + "_weight"] = np.where(active, weight + 1.0, state[name + "_weight"])
+        return state[name]
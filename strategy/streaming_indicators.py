@@ -0,0 +1,177 @@
+import math
+from collections import deque
+import numpy as np
+import pandas as pd
+
+
+class RollingMean:
+    """
+    O(1) rolling mean over the last N values (matches pandas rolling(N).mean()).
+    Uses the same compensated (Kahan) add/remove steps as pandas, so the
+    running sum neither drifts nor differs from the pandas result.
+    """
+
+    def __init__(self, period):
+        self.period = period
+        self.window = deque()
+        self.total = 0.0
+        self.comp_add = 0.0
+        self.comp_remove = 0.0
+        self.neg_count = 0
+
+    def update(self, value):
+        if len(self.window) == self.period:
+            old = self.window.popleft()
+            y = -old - self.comp_remove
+            t = self.total + y
+            self.comp_remove = t - self.total - y
+            self.total = t
+            if old < 0:
+                self.neg_count -= 1
+
+        self.window.append(value)
+        y = value - self.comp_add
+        t = self.total + y
+        self.comp_add = t - self.total - y
+        self.total = t
+        if value < 0:
+            self.neg_count += 1
+
+        if len(self.window) < self.period:
+            return math.nan
+
+        mean = self.total / self.period
+        # Clamp rounding noise when every value has the same sign
+        if self.neg_count == 0 and mean < 0:
+            mean = 0.0
+        elif self.neg_count == self.period and mean > 0:
+            mean = 0.0
+        return mean
+
+
+class ExponentialMean:
+    """
+    O(1) recursive EMA (matches pandas ewm(span=N).mean(), i.e. adjust=True).
+    Mirrors the pandas weighting update step so results are identical.
+    """
+
+    def __init__(self, span):
+        self.decay = 1 - 2.0 / (span + 1)
+        self.old_weight = 1.0
+        self.value = math.nan
+
+    def update(self, value):
+        if math.isnan(self.value):
+            self.value = value
+            return self.value
+
+        self.old_weight *= self.decay
+        if self.value != value:
+            self.value = (self.old_weight * self.value + value) / (self.old_weight + 1.0)
+        self.old_weight += 1.0
+        return self.value
+
+
+class StreamingIndicators:
+    """
+    Per-symbol streaming version of Indicators.
+    Holds rolling state for SMA/RSI/ATR/MACD and updates it one bar at a time,
+    so each new bar costs O(1) instead of a full rolling pass over the window.
+
+    Fed the same bars, every value equals the pandas result from Indicators.
+    NOTE: MACD is an EMA, so once the stream has seen more history than the
+    fetch window its values will (correctly) differ from a pandas recompute
+    over only the last 100 bars.
+    """
+
+    def __init__(self, sma_short, sma_long, rsi_period=14, atr_period=14,
+                 macd_fast=12, macd_slow=26, macd_signal=9):
+        self.sma_short = RollingMean(sma_short)
+        self.sma_long = RollingMean(sma_long)
+        self.avg_gain = RollingMean(rsi_period)
+        self.avg_loss = RollingMean(rsi_period)
+        self.atr = RollingMean(atr_period)
+        self.ema_fast = ExponentialMean(macd_fast)
+        self.ema_slow = ExponentialMean(macd_slow)
+        self.macd_signal = ExponentialMean(macd_signal)
+
+        self.prev_close = None
+        self.last_time = None  # ns timestamp of the last bar fed
+        self.last_bar = None   # its (high, low, close)
+        self.latest = None
+        self.prev = None
+
+    def update(self, high, low, close, time=None):
+        """Feed one bar. Returns the latest indicator values as a dict."""
+        # RSI: the first bar has no delta, pandas treats it as 0 gain / 0 loss
+        delta = 0.0 if self.prev_close is None else close - self.prev_close
+        avg_gain = self.avg_gain.update(delta if delta > 0 else 0.0)
+        avg_loss = self.avg_loss.update(-delta if delta < 0 else 0.0)
+
+        # ATR: True Range falls back to high-low when there is no previous close
+        true_range = high - low
+        if self.prev_close is not None:
+            true_range = max(true_range, abs(high - self.prev_close), abs(low - self.prev_close))
+
+        # MACD
+        macd = self.ema_fast.update(close) - self.ema_slow.update(close)
+
+        self.prev = self.latest
+        self.latest = {
+            "close": close,
+            "sma_short": self.sma_short.update(close),
+            "sma_long": self.sma_long.update(close),
+            "rsi": self._rsi(avg_gain, avg_loss),
+            "atr": self.atr.update(true_range),
+            "macd": macd,
+            "macd_signal": self.macd_signal.update(macd),
+        }
+        self.prev_close = close
+        self.last_time = time
+        self.last_bar = (high, low, close)
+        return self.latest
+
+    def update_frame(self, data):
+        """
+        Feed only the bars in 'data' newer than the last one seen.
+        Returns the number of bars consumed.
+        """
+        times = pd.DatetimeIndex(data.index).as_unit("ns").asi8
+        return self.update_arrays(times, data['high'].values, data['low'].values, data['close'].values)
+
+    def update_arrays(self, times, high, low, close):
+        """
+        Same as update_frame() for raw arrays (e.g. BarRingBuffer views),
+        with 'times' as int64 ns timestamps in ascending order.
+        """
+        start = 0
+        if self.last_time is not None:
+            start = int(np.searchsorted(times, self.last_time, side="right"))
+
+        for i in range(start, len(times)):
+            self.update(float(high[i]), float(low[i]), float(close[i]), int(times[i]))
+
+        return len(times) - start
+
+    def revised(self, times, high, low, close):
+        """
+        True if these arrays hold the last bar fed with different prices
+        (a late revision). Bars already fed are skipped by update_arrays(),
+        so the caller has to reseed to pick the revision up.
+        """
+        if self.last_time is None:
+            return False
+        i = int(np.searchsorted(times, self.last_time))
+        if i == len(times) or times[i] != self.last_time:
+            return False
+        return (float(high[i]), float(low[i]), float(close[i])) != self.last_bar
+
+    @staticmethod
+    def _rsi(avg_gain, avg_loss):
+        if math.isnan(avg_gain) or math.isnan(avg_loss):
+            return math.nan
+        if avg_loss == 0:
+            # Same as pandas: x/0 -> inf -> RSI 100, 0/0 -> NaN
+            return 100.0 if avg_gain > 0 else math.nan
+        rs = avg_gain / avg_loss
+        return 100 - (100 / (1 + rs))
@@ -0,0 +1,24 @@
+import os
+import sys
+import pytest
+
+# Offline defaults, set before config.settings is imported: a throwaway
+# SQLite database and placeholder keys (no test talks to Alpaca)
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("ALPACA_API_KEY", "test")
+os.environ.setdefault("ALPACA_SECRET_KEY", "test")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """A fresh SQLite database with the bot's tables, as settings.DATABASE_URL"""
+    from config.settings import settings
+    from data.storage import database
+
+    monkeypatch.setattr(settings, "DATABASE_URL", f"sqlite:///{tmp_path / 'test.db'}")
+    monkeypatch.setattr(database, "_engine", None)
+    monkeypatch.setattr(database, "_session_factory", None)
+    database.init_db()
+    yield database
+    database.get_engine().dispose()
@@ -1,6 +1,24 @@
 #!/bin/bash
+# Import-time check: entry points must not load alpaca-py's data client or
+# the DB layer on import (they are loaded when first used)
+python - <<'PY'
+import sys, time
+start = time.perf_counter()
+import main, bots.runner, bots.sharded_runner, bots.backtester, bots.optimizer, tools.benchmark, tools.simulate
+print(f"Entry points imported in {time.perf_counter() - start:.2f}s")
+eager = [m for m in ("alpaca.data", "alpaca.data.live", "sqlalchemy") if m in sys.modules]
+assert not eager, f"Imported at startup: {', '.join(eager)}"
+PY
+python -X importtime -c "import main" 2>&1 | sort -t'|' -k2 -n | tail -5
+
+# Unit and equivalence tests (offline)
+python -m pytest -q tests
+
 # Test strategy
-python -c "from bots.backtester import Backtester; bt = Backtester(); print(bt.run_backtest('SPY', 365))"
+python -c "from bots.backtester import Backtester; bt = Backtester(); bt.run('SPY', days=365)"
+
+# Offline benchmarks (synthetic data); add --baseline benchmark.json to fail on regressions
+python -m tools.benchmark --sizes 10 100 --output benchmark.json
 
 # Test with paper trading first
 # Make sure ALPACA_BASE_URL in .env is set to paper trading endpoint
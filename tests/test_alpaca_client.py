@@ -0,0 +1,20 @@
+from types import SimpleNamespace
+from alpaca.trading.client import TradingClient
+from alpaca.data.historical import StockHistoricalDataClient
+from trading.alpaca_client import mount_pool, share_session
+
+
+def test_data_client_shares_the_trading_session():
+    trading = TradingClient("key", "secret", paper=True)
+    data = StockHistoricalDataClient("key", "secret")
+    mount_pool(trading, 16)
+    share_session(data, trading)
+    assert data._session is trading._session
+    assert trading._session.get_adapter("https://paper-api.alpaca.markets")._pool_maxsize == 16
+
+
+def test_clients_without_a_session_keep_working():
+    client = SimpleNamespace()
+    mount_pool(client, 16)
+    share_session(client, SimpleNamespace())
+    assert not hasattr(client, "_session")
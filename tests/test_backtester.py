@@ -0,0 +1,79 @@
+import numpy as np
+from bots.backtester import Backtester
+from config.settings import settings
+from tools.benchmark import synthetic_bars
+
+
+def reference_trades(backtester, series):
+    """Bar-by-bar replay of every symbol on the union timeline: the behaviour simulate() must reproduce"""
+    multiplier = backtester.strategy.params["STOP_LOSS_ATR_MULTIPLIER"]
+    cash = backtester.initial_capital
+    positions, trades, resume = {}, [], {symbol: 0 for symbol in series}
+    times = np.unique(np.concatenate([s["time"] for s in series.values()]))
+    bar_at = {symbol: dict(zip(s["time"], range(len(s["time"])))) for symbol, s in series.items()}
+
+    def price_at(symbol, time):
+        s = series[symbol]
+        return s["close"][max(np.searchsorted(s["time"], time, side="right") - 1, 0)]
+
+    for time in times:
+        # Exits first: a SELL signal or a close at or below the stop
+        for symbol in sorted(positions):
+            s, i = series[symbol], bar_at[symbol].get(time)
+            trade = positions[symbol]
+            if i is None or i <= trade["entry_index"]:
+                continue
+            if s["signal"][i] == -1 or s["close"][i] <= trade["stop_loss"] or i == len(s["time"]) - 1:
+                del positions[symbol]
+                cash += trade["qty"] * s["close"][i]
+                trades.append((symbol, trade["entry_index"], i, trade["qty"]))
+                resume[symbol] = i + 1
+
+        # Then entries, sized off cash plus open positions marked at this time
+        for symbol in sorted(series):
+            s, i = series[symbol], bar_at[symbol].get(time)
+            if i is None or symbol in positions or i < resume[symbol]:
+                continue
+            atr = s["atr"][i]
+            if s["signal"][i] != 1 or not np.isfinite(atr) or atr <= 0:
+                continue
+            price = s["close"][i]
+            equity = cash + sum(t["qty"] * price_at(sym, time) for sym, t in positions.items())
+            qty = int(equity * settings.MAX_POSITION_SIZE / price)
+            if qty < 1:
+                continue
+            cash -= qty * price
+            positions[symbol] = {"entry_index": i, "qty": qty, "stop_loss": price - atr * multiplier}
+            if i == len(s["time"]) - 1:  # entered on the last bar: closed at once
+                del positions[symbol]
+                cash += qty * price
+                trades.append((symbol, i, i, qty))
+                resume[symbol] = i + 1
+
+    return sorted(trades), cash
+
+
+def test_event_driven_backtest_matches_bar_by_bar_replay(monkeypatch):
+    monkeypatch.setattr(settings, "RSI_OVERSOLD", 40)  # more trades to compare
+    monkeypatch.setattr(settings, "RSI_OVERBOUGHT", 60)
+    # Symbols on different timelines: staggered starts and lengths
+    data = {
+        f"S{i}": synthetic_bars(800 + 97 * i, seed=i, start=f"2024-01-02 14:{30 + 4 * i:02d}")
+        for i in range(6)
+    }
+    backtester = Backtester()
+    series = backtester.prepare(data)
+    result = backtester.simulate(series)
+    expected, final_cash = reference_trades(backtester, series)
+
+    trades = result["trades"]
+    index = {symbol: s["time"] for symbol, s in series.items()}
+    actual = sorted(
+        (row.symbol, int(np.searchsorted(index[row.symbol], row.entry_time.value)),
+         int(np.searchsorted(index[row.symbol], row.exit_time.value)), int(row.qty))
+        for row in trades.itertuples()
+    )
+    assert len(expected) > 20
+    assert actual == expected
+    # Everything is closed by the end of the data: equity is all cash
+    assert np.isclose(result["stats"]["final_equity"], final_cash)
@@ -0,0 +1,45 @@
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from alpaca.data.timeframe import TimeFrame
+from config.settings import settings
+from data.collectors.alpaca_collector import AlpacaCollector
+
+
+def minute_bars(start, end):
+    index = pd.date_range(start, end, freq="1min", tz="UTC", name="timestamp")
+    close = 100 + np.cumsum(np.random.default_rng(0).normal(0, 0.1, len(index)))
+    return pd.DataFrame({"open": close, "high": close + 0.1, "low": close - 0.1, "close": close, "volume": 100.0}, index=index)
+
+
+def offline_collector(monkeypatch, tmp_path, bars):
+    """AlpacaCollector with a bar cache in tmp_path, serving 'bars' for symbol X"""
+    monkeypatch.setattr(settings, "BAR_CACHE_ENABLED", True)
+    monkeypatch.setattr(settings, "BAR_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "DELTA_FETCH", False)
+    collector = AlpacaCollector()
+
+    def request_bars(symbols, timeframe, start, end=None, chunk_size=None):
+        rows = bars[bars.index >= pd.Timestamp(start)]
+        if end is not None:
+            rows = rows[rows.index <= pd.Timestamp(end)]
+        return {"X": rows} if "X" in symbols and len(rows) else {}
+
+    collector._request_bars = request_bars
+    return collector
+
+
+def test_stale_cache_tail_is_backfilled(monkeypatch, tmp_path):
+    now = pd.Timestamp(datetime.utcnow(), tz="UTC").floor("min")
+    seed_start, seed_end = now - pd.Timedelta(days=2, hours=5), now - pd.Timedelta(days=2)
+    bars = minute_bars(seed_start, now)
+    collector = offline_collector(monkeypatch, tmp_path, bars)
+
+    # A cached range that ends well before the latest window...
+    collector.fetch_historical_bars(["X"], seed_start, seed_end, timeframe=TimeFrame.Minute)
+    # ...then only the latest window is fetched, leaving a hole in between
+    collector.fetch_bars_batch(["X"], limit=100)
+
+    history = collector.fetch_historical_bars(["X"], seed_start, timeframe=TimeFrame.Minute)["X"]
+    assert history.index.to_series().diff().max() == pd.Timedelta(minutes=1)
+    assert history.index.equals(bars.index)
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import pytest
+from strategy.indicators import Indicators
+from strategy.low_risk_swing import LowRiskSwingStrategy
+from tools.benchmark import synthetic_bars
+
+# Bars per symbol: ragged, several shorter than SMA_LONG (50)
+LENGTHS = {"AAA": 300, "BBB": 120, "CCC": 51, "DDD": 50, "EEE": 35, "FFF": 3}
+SERIES = {symbol: synthetic_bars(600, seed=i) for i, symbol in enumerate(LENGTHS)}
+
+
+def histories(end):
+    """Each symbol's last LENGTHS[symbol] bars up to bar 'end'"""
+    return {symbol: SERIES[symbol].iloc[end - length:end] for symbol, length in LENGTHS.items()}
+
+
+def compare(strategy, result, panel):
+    fired = 0
+    for symbol, bars in panel.items():
+        signal, score, reason, atr, _ = strategy.generate_signal(bars)
+        row = result.loc[symbol]
+        assert (row["signal"], row["score"], row["reason"]) == (signal, score, reason), symbol
+        np.testing.assert_allclose(row["atr"], atr, rtol=1e-9, err_msg=symbol)
+        fired += signal != "HOLD"
+    return fired
+
+
+@pytest.mark.parametrize("layout", ["dict", "multiindex"])
+def test_batch_matches_generate_signal(layout):
+    strategy = LowRiskSwingStrategy(indicators=Indicators())
+    fired = 0
+    for end in range(440, 540, 2):
+        panel = histories(end)
+        if layout == "dict":
+            batch = panel
+        else:
+            batch = pd.concat(panel, names=["symbol", "timestamp"])
+        result = strategy.generate_signals_batch(batch)
+
+        assert list(result.index) == list(LENGTHS)
+        fired += compare(strategy, result, panel)
+
+    # Make sure the comparison covered BUY/SELL decisions, not only HOLDs
+    assert fired > 0
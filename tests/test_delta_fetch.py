@@ -0,0 +1,28 @@
+import pandas as pd
+from config.settings import settings
+from data.collectors.alpaca_collector import AlpacaCollector
+from tests.test_bar_cache import minute_bars
+
+
+def test_late_bar_of_quiet_symbol_is_fetched(monkeypatch):
+    monkeypatch.setattr(settings, "BAR_CACHE_ENABLED", False)
+    monkeypatch.setattr(settings, "DELTA_FETCH", True)
+    collector = AlpacaCollector()
+    collector.get_calendar = lambda start, end: []  # wall-time lookbacks
+
+    now = pd.Timestamp.now(tz="UTC").floor("min")
+    served = {"X": minute_bars(now - pd.Timedelta(hours=3), now - pd.Timedelta(hours=1))}
+
+    def request_bars(symbols, timeframe, start, end=None, chunk_size=None):
+        return {s: served[s][served[s].index >= pd.Timestamp(start)] for s in symbols if s in served}
+
+    collector._request_bars = request_bars
+    assert len(collector.fetch_bars_batch(["X"], limit=50)["X"]) == 50
+
+    # A bar for a minute the first request already covered, published late
+    late = minute_bars(now - pd.Timedelta(minutes=10), now - pd.Timedelta(minutes=10))
+    served["X"] = pd.concat([served["X"], late])
+
+    bars = collector.fetch_bars_batch(["X"], limit=50)["X"]
+    assert bars.index[-1] == late.index[0]
+    assert len(bars) == 50
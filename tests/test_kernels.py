@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+import pytest
+from strategy.indicators import Indicators, KernelIndicators, PanelIndicators
+from tools.benchmark import synthetic_bars
+
+
+@pytest.mark.parametrize("bars", [2, 30, 390, 20_000])
+def test_kernels_match_pandas(bars):
+    data = synthetic_bars(bars, seed=bars)
+    expected = Indicators().compute(data, 20, 50, 14)
+    actual = KernelIndicators().compute(data, 20, 50, 14)
+
+    assert set(actual) == set(expected)
+    for name, values in expected.items():
+        np.testing.assert_allclose(np.asarray(actual[name]), values.values, rtol=1e-9, atol=1e-9, err_msg=name)
+
+
+def test_single_kernels_match_pandas():
+    data = synthetic_bars(500)
+    for name in ("sma", "rsi", "atr"):
+        period = 14
+        np.testing.assert_allclose(
+            getattr(KernelIndicators, name)(data, period).values, getattr(Indicators, name)(data, period).values,
+            rtol=1e-9, atol=1e-9, err_msg=name,
+        )
+    for actual, expected in zip(KernelIndicators.macd(data), Indicators.macd(data)):
+        np.testing.assert_allclose(actual.values, expected.values, rtol=1e-9, atol=1e-9)
+
+
+@pytest.mark.parametrize("period", [1, 14, 50])
+def test_panel_sma_matches_pandas(period):
+    # Right-aligned rows with NaN padding in front, one row shorter than the period
+    panel = np.full((4, 300), np.nan)
+    for row, length in enumerate((300, 120, 51, 30)):
+        panel[row, 300 - length:] = synthetic_bars(length, seed=row)["close"].values
+
+    expected = pd.DataFrame(panel.T).rolling(period).mean().values.T
+    np.testing.assert_allclose(PanelIndicators.sma(panel, period), expected, rtol=1e-9)
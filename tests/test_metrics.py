@@ -0,0 +1,40 @@
+import threading
+from monitoring.metrics import Metrics
+
+
+def test_reads_while_another_thread_records():
+    metrics = Metrics(enabled=True, window=256)
+    done = threading.Event()
+
+    def record():
+        i = 0
+        while not done.is_set():
+            metrics.observe("cycle_seconds", i * 1e-3)
+            metrics.set("last_cycle_seconds", i * 1e-3, shard=str(i % 50))
+            i += 1
+
+    writer = threading.Thread(target=record)
+    writer.start()
+    try:
+        for _ in range(300):
+            metrics.quantiles("cycle_seconds")
+            metrics.render()
+    finally:
+        done.set()
+        writer.join()
+
+    assert set(metrics.quantiles("cycle_seconds")) == {0.5, 0.99}
+    assert "tradingbot_last_cycle_seconds" in metrics.render()
+
+
+def test_labelled_series_keep_their_own_window():
+    metrics = Metrics(enabled=True, window=256)
+    for i in range(100):
+        metrics.observe("cycle_seconds", float(i))
+        with metrics.timer("symbol_seconds", window=8, symbol="AAPL"):
+            pass
+
+    assert len(metrics.summaries[("cycle_seconds", ())][0]) == 100
+    samples, total, count = metrics.summaries[("symbol_seconds", (("symbol", "AAPL"),))]
+    assert len(samples) == 8 and count == 100
+    assert 'tradingbot_symbol_seconds{symbol="AAPL",quantile="0.99"}' in metrics.render()
@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta, timezone
+from config.settings import settings
+from data.collectors.simulated_collector import SimulatedMarket
+from data.storage.write_behind import WriteBehindWriter
+from tools.benchmark import synthetic_bars
+from trading.order_dispatcher import OrderDispatcher
+from trading.order_executor import OrderExecutor
+from trading.simulated_broker import SimulatedBroker
+
+
+class CountingRecorder(WriteBehindWriter):
+    def __init__(self, path):
+        super().__init__(path, enabled=True)
+        self.syncs = 0
+
+    def sync(self, timeout=30.0):
+        self.syncs += 1
+        super().sync(timeout)
+
+
+def test_orders_never_wait_on_the_db_after_load(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "MAX_TRADES_PER_DAY", 2)
+    market = SimulatedMarket({s: synthetic_bars(200, seed=i) for i, s in enumerate("ABCDE")})
+    now = [datetime(2024, 1, 2, 16, 0, tzinfo=timezone.utc)]
+    recorder = CountingRecorder(str(tmp_path / "journal.jsonl"))
+    executor = OrderExecutor(
+        client=SimulatedBroker(market), dispatcher=OrderDispatcher(max_workers=1), clock=lambda: now[0], recorder=recorder,
+    )
+    executor.load()
+    loaded = recorder.syncs
+
+    executor.execute_signals([(s, "BUY", market.price(s), 0.5) for s in "ABC"])
+    assert executor.trades_today == 2  # the daily limit held back the third entry
+    executor.check_risk_management({s: market.price(s) for s in "ABC"})
+
+    # The next trading day starts from zero entries, without reading the DB
+    now[0] += timedelta(days=1)
+    executor.execute_signals([(s, "BUY", market.price(s), 0.5) for s in "CD"])
+    assert executor.trades_today == 2
+    assert recorder.syncs == loaded
+
+    # The counts kept in memory match what load() reads back from the DB
+    executor.load()
+    assert executor.trades_today == 2
+    assert sorted(executor.risk.symbols) == ["A", "B", "C", "D"]
+
+
+def test_stop_uses_the_configured_atr_multiplier(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "STOP_LOSS_ATR_MULTIPLIER", 3.0)
+    market = SimulatedMarket({"A": synthetic_bars(200)})
+    executor = OrderExecutor(
+        client=SimulatedBroker(market), dispatcher=OrderDispatcher(max_workers=1),
+        recorder=WriteBehindWriter(str(tmp_path / "journal.jsonl"), enabled=True),
+    )
+    executor.load()
+
+    price = market.price("A")
+    executor.execute_signals([("A", "BUY", price, 0.5)])
+    assert list(executor.risk.stops) == [price - 1.5]
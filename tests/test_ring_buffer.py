@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+from data.storage.ring_buffer import BarRingBuffer
+from tools.benchmark import synthetic_bars
+
+
+def test_wraparound_keeps_the_latest_bars_contiguous():
+    bars = synthetic_bars(257)
+    window = BarRingBuffer(100)
+    for chunk in np.array_split(np.arange(len(bars)), 7):
+        window.extend(bars.iloc[chunk])
+
+    latest = bars.tail(100)
+    assert len(window) == 100
+    assert window.last_time == latest.index[-1].value
+    np.testing.assert_array_equal(window.times(), latest.index.as_unit("ns").asi8)
+    for field in ("open", "high", "low", "close"):
+        np.testing.assert_array_equal(window[field], latest[field].values)
+        assert window[field].base is window.prices  # a view, never a copy
+    np.testing.assert_array_equal(window.frame(10)["close"].values, latest["close"].values[-10:])
+
+
+def test_merge_replaces_a_revised_last_bar_and_appends_newer_ones():
+    bars = synthetic_bars(60)
+    window = BarRingBuffer(50)
+    window.extend(bars.iloc[:40])
+
+    # A request from the newest bar held: older rows, the revised newest bar, then new ones
+    update = bars.iloc[35:45].copy()
+    update.loc[bars.index[39], "close"] += 1.0
+    window.merge(update)
+
+    expected = pd.concat([bars.iloc[:39], update.iloc[4:]])
+    assert len(window) == 45
+    np.testing.assert_array_equal(window.times(), expected.index.as_unit("ns").asi8)
+    np.testing.assert_array_equal(window["close"], expected["close"].values)
+
+    window.merge(bars.iloc[:10])  # nothing newer: unchanged
+    assert len(window) == 45 and window.last_time == expected.index[-1].value
+
+
+def test_copy_is_independent():
+    bars = synthetic_bars(30)
+    window = BarRingBuffer(20)
+    window.extend(bars)
+    copy = window.copy()
+    window.extend(synthetic_bars(5, seed=1, start="2024-01-03 14:30"))
+
+    assert copy.last_time == bars.index[-1].value
+    np.testing.assert_array_equal(copy["close"], bars["close"].values[-20:])
+    assert window.last_time != copy.last_time
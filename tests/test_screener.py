@@ -0,0 +1,78 @@
+from types import SimpleNamespace
+import pytest
+from bots.runner import TradingBot
+from config.settings import settings
+from data.collectors.simulated_collector import SimulatedCollector, SimulatedMarket
+from strategy.low_risk_swing import LowRiskSwingStrategy
+from strategy.screener import Screener
+from tools.benchmark import synthetic_bars
+from tools.simulate import load_synthetic
+
+
+class SignalLog:
+    account = SimpleNamespace(invalidate=lambda: None)
+
+    def __init__(self):
+        self.signals = []
+
+    def load(self):
+        pass
+
+    def check_risk_management(self, current_prices):
+        return []
+
+    def execute_signals(self, signals):
+        self.signals.extend(signal[:2] for signal in signals)
+
+
+def simulated_signals(bars, interval, timeframe):
+    market = SimulatedMarket(bars)
+    log = SignalLog()
+    bot = TradingBot(
+        collector=SimulatedCollector(market), strategy=LowRiskSwingStrategy(timeframe=timeframe),
+        executor=log, symbols=list(bars),
+    )
+    evaluated = []
+    process_symbol = bot.process_symbol
+    bot.process_symbol = lambda symbol, *args, **kwargs: evaluated.append(symbol) or process_symbol(symbol, *args, **kwargs)
+    bot.run_simulation(market, interval=interval)
+    return log.signals, len(evaluated)
+
+
+@pytest.mark.parametrize("interval, timeframe", [(1, "1Min"), (3, "1Min"), (5, "5Min")])
+def test_screened_signals_match_unscreened(monkeypatch, interval, timeframe):
+    monkeypatch.setattr(settings, "RECORD_SIGNALS", False)
+    monkeypatch.setattr(settings, "RSI_OVERSOLD", 40)  # more signals to compare
+    monkeypatch.setattr(settings, "RSI_OVERBOUGHT", 60)
+    monkeypatch.setattr(settings, "SCREEN_MIN_SYMBOLS", 0)
+    bars = load_synthetic(12, 450)
+
+    monkeypatch.setattr(settings, "SCREEN_SIGNALS", False)
+    expected, evaluated = simulated_signals(bars, interval, timeframe)
+    monkeypatch.setattr(settings, "SCREEN_SIGNALS", True)
+    screened, screened_evaluated = simulated_signals(bars, interval, timeframe)
+
+    assert expected
+    assert screened == expected
+    assert screened_evaluated < evaluated / 2
+
+
+def test_small_universes_are_not_screened(monkeypatch):
+    monkeypatch.setattr(settings, "SCREEN_SIGNALS", True)
+    monkeypatch.setattr(settings, "SCREEN_MIN_SYMBOLS", 200)
+    market = SimulatedMarket(load_synthetic(5, 200))
+    bot = TradingBot(collector=SimulatedCollector(market), executor=SignalLog(), symbols=market.symbols)
+    assert bot.screener is None
+
+
+def test_revised_last_bar_is_not_screened_out():
+    strategy = LowRiskSwingStrategy()
+    screener = Screener(strategy.params)
+    bars = synthetic_bars(100, seed=7)
+    signal = strategy.generate_signal(bars, symbol="X")[0]
+    screener.remember("X", strategy.streams["X"], signal)
+    assert signal == "HOLD" and screener.survivors({"X": bars}) == []
+
+    revised = bars.copy()
+    revised.iloc[-1, revised.columns.get_loc("close")] += 0.5
+    assert screener.survivors({"X": revised}) == ["X"]
@@ -0,0 +1,26 @@
+import threading
+import time
+import pandas as pd
+from data.collectors.alpaca_stream import AlpacaStreamCollector, ReplayBarSource
+from tools.benchmark import synthetic_bars
+
+
+def test_bars_are_handled_off_the_stream_thread_in_order():
+    symbols = ["A", "B", "C"]
+    bars = pd.concat({s: synthetic_bars(30, seed=i) for i, s in enumerate(symbols)}, names=["symbol", "timestamp"])
+    seen = []
+
+    def on_bar(symbol, window):
+        time.sleep(0.002)  # slow analysis: bars keep arriving meanwhile
+        seen.append((symbol, window.last_time, float(window.last("close")), threading.current_thread().name))
+
+    collector = AlpacaStreamCollector(symbols, on_bar=on_bar, source=ReplayBarSource(bars))
+    collector.start()
+
+    # Every bar, in arrival order, with the window as it was at that bar
+    expected = sorted(
+        ((s, t.value, bars.loc[(s, t), "close"]) for s, t in bars.index),
+        key=lambda row: row[1],
+    )
+    assert [row[:3] for row in seen] == expected
+    assert {row[3] for row in seen} == {"bar-handler"}
@@ -0,0 +1,78 @@
+import numpy as np
+from strategy.indicators import Indicators
+from strategy.low_risk_swing import LowRiskSwingStrategy
+from strategy.streaming_indicators import StreamingIndicators
+from tools.benchmark import synthetic_bars
+
+COLUMNS = ("sma_short", "sma_long", "rsi", "atr", "macd", "macd_signal")
+
+
+def stream_values(stream, data):
+    """Feeds 'data' one bar at a time and collects every indicator per bar"""
+    rows = []
+    for i in range(len(data)):
+        stream.update_frame(data.iloc[:i + 1])
+        rows.append([stream.latest[name] for name in COLUMNS])
+    return dict(zip(COLUMNS, np.array(rows).T))
+
+
+def test_streaming_matches_pandas():
+    data = synthetic_bars(400, seed=3)
+    expected = Indicators().compute(data, 20, 50, 14)
+    actual = stream_values(StreamingIndicators(20, 50, 14), data)
+
+    for name in COLUMNS:
+        np.testing.assert_allclose(actual[name], expected[name].values, rtol=1e-12, atol=1e-12, err_msg=name)
+
+
+def test_update_frame_skips_bars_already_seen():
+    data = synthetic_bars(120, seed=4)
+    stream = StreamingIndicators(20, 50, 14)
+    assert stream.update_frame(data.iloc[:100]) == 100
+    assert stream.update_frame(data.iloc[10:110]) == 10
+    assert stream.update_frame(data.iloc[10:110]) == 0
+
+    expected = Indicators().compute(data.iloc[:110], 20, 50, 14)
+    for name in COLUMNS:
+        np.testing.assert_allclose(stream.latest[name], expected[name].iloc[-1], rtol=1e-12, err_msg=name)
+
+
+def test_update_stream_reseeds_after_a_gap():
+    strategy = LowRiskSwingStrategy()
+    data = synthetic_bars(400, seed=5)
+    strategy.update_stream("AAPL", data.iloc[:100])
+    first = strategy.streams["AAPL"]
+
+    # The next window starts after the last bar seen: bars were missed
+    window = data.iloc[200:300]
+    stream = strategy.update_stream("AAPL", window)
+    assert stream is not first
+
+    p = strategy.params
+    expected = Indicators().compute(window, p["SMA_SHORT"], p["SMA_LONG"], p["RSI_PERIOD"])
+    for name in COLUMNS:
+        np.testing.assert_allclose(stream.latest[name], expected[name].iloc[-1], rtol=1e-12, err_msg=name)
+        np.testing.assert_allclose(stream.prev[name], expected[name].iloc[-2], rtol=1e-12, err_msg=name)
+
+    # An overlapping window continues the same stream
+    assert strategy.update_stream("AAPL", data.iloc[250:301]) is stream
+    assert stream.last_time == data.index[300].value
+
+
+def test_update_stream_reseeds_on_a_revised_last_bar():
+    strategy = LowRiskSwingStrategy()
+    data = synthetic_bars(200, seed=6)
+    first = strategy.update_stream("AAPL", data.iloc[:100])
+    assert strategy.update_stream("AAPL", data.iloc[:100]) is first
+
+    # The collector merges a late correction of the newest bar into the window
+    revised = data.iloc[:100].copy()
+    revised.iloc[-1, revised.columns.get_loc("close")] += 0.5
+    stream = strategy.update_stream("AAPL", revised)
+    assert stream is not first
+
+    p = strategy.params
+    expected = Indicators().compute(revised, p["SMA_SHORT"], p["SMA_LONG"], p["RSI_PERIOD"])
+    for name in COLUMNS:
+        np.testing.assert_allclose(stream.latest[name], expected[name].iloc[-1], rtol=1e-12, err_msg=name)
+    assert stream.latest["close"] == revised["close"].iloc[-1]
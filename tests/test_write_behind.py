@@ -0,0 +1,89 @@
+import json
+from datetime import datetime, timedelta
+from bots.sharded_runner import ExecutedRelay, HashRing
+from data.storage import write_behind
+from data.storage.models import Signal, Trade
+from data.storage.write_behind import WriteBehindWriter
+
+
+def rows(db, model):
+    session = db.SessionLocal()
+    try:
+        return session.query(model).order_by(model.id).all()
+    finally:
+        session.close()
+
+
+def test_journal_replay_after_crash(db, tmp_path):
+    journal = str(tmp_path / "journal.jsonl")
+    crashed = WriteBehindWriter(journal, enabled=True)
+    crashed._run = lambda: None  # the flusher dies before committing anything
+    crashed.open_trade("X", "buy", 10, 100.0, 95.0)
+    for i in range(5):
+        crashed.record_signal("X", "HOLD", {"i": i})
+    crashed.close_trade("X", "closed", 101.0)
+    assert rows(db, Trade) == []
+    with open(journal, encoding="utf-8") as f:
+        entries = f.read()
+
+    # The next run replays the journal...
+    writer = WriteBehindWriter(journal, enabled=True)
+    writer.sync(timeout=10)
+    assert [(t.symbol, t.status) for t in rows(db, Trade)] == [("X", "closed")]
+    assert len(rows(db, Signal)) == 5
+
+    # ...exactly once, even when the run after it finds the journal again
+    with open(journal, "a", encoding="utf-8") as f:
+        f.write(entries)
+    WriteBehindWriter(journal, enabled=True).sync(timeout=10)
+    assert len(rows(db, Trade)) == 1
+    assert len(rows(db, Signal)) == 5
+
+
+def test_executed_flag_marks_the_keyed_signal(db, tmp_path):
+    writer = WriteBehindWriter(str(tmp_path / "journal.jsonl"), enabled=True)
+    first = datetime(2024, 1, 2, 15, 0, 0, 123456)
+    writer.record_signal("X", "BUY", timestamp=first)
+    writer.record_signal("X", "BUY", timestamp=first + timedelta(minutes=3))
+    writer.mark_executed("X", "BUY", first)
+    writer.sync(timeout=10)
+    assert [s.executed for s in rows(db, Signal)] == [True, False]
+
+
+def test_rejected_event_is_dead_lettered(db, tmp_path, monkeypatch):
+    alerts = []
+    monkeypatch.setattr(write_behind.time, "sleep", lambda seconds: None)
+    monkeypatch.setattr(write_behind.discord_logger, "log_error", alerts.append)
+
+    journal = str(tmp_path / "journal.jsonl")
+    writer = WriteBehindWriter(journal, enabled=True)
+    writer._record("open_trade", id=1, symbol="X", side="buy", quantity=1.0, entry_price=10.0, status="open")
+    writer._record("open_trade", id=1, symbol="Y", side="buy", quantity=1.0, entry_price=20.0, status="open")
+    writer.record_signal("Z", "BUY")
+    writer.sync(timeout=10)
+
+    # The duplicate key is set aside; the events around it are written
+    assert [t.symbol for t in rows(db, Trade)] == ["X"]
+    assert [s.symbol for s in rows(db, Signal)] == ["Z"]
+    with open(writer.dead_letter_path, encoding="utf-8") as f:
+        dead = [json.loads(line) for line in f]
+    assert [(e["symbol"], e["seq"]) for e in dead] == [("Y", 2)]
+    assert len(alerts) == 1 and writer.dead == 1
+
+    # The checkpoint moved past it: the next run does not retry it
+    assert writer.committed == writer.seq == 3
+    assert WriteBehindWriter(journal, enabled=True)._load_checkpoint() == 3
+
+
+def test_relay_routes_executed_flags_to_the_recording_shard():
+    ring = HashRing(["shard-0", "shard-1"])
+    relay = ExecutedRelay(ring, recorder=object())
+    at = datetime(2024, 1, 2, 15, 0)
+    for symbol in ("AAPL", "MSFT", "SPY", "QQQ"):
+        relay.mark_executed(symbol, "BUY", at)
+
+    taken = {shard: relay.take(shard) for shard in ("shard-0", "shard-1")}
+    assert sorted(f for flags in taken.values() for f in flags) == sorted((s, "BUY", at) for s in ("AAPL", "MSFT", "SPY", "QQQ"))
+    for shard, flags in taken.items():
+        assert all(ring.shard_for(symbol) == shard for symbol, _, _ in flags)
+    assert relay.take("shard-0") == []
@@ -0,0 +1,229 @@
+"""
+Offline benchmarks: indicators, signal generation, cycle throughput and backtest speed.
+Everything runs on synthetic OHLCV data (fixed seed), with no network or database.
+
+    python -m tools.benchmark                                  # run, print, write benchmark.json
+    python -m tools.benchmark --sizes 10 100 --output new.json
+    python -m tools.benchmark --baseline benchmark.json        # exit 1 on a regression
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+from datetime import datetime
+from types import SimpleNamespace
+import numpy as np
+import pandas as pd
+from config.settings import settings
+
+CYCLE_SIZES = (10, 100, 1_000, 5_000)
+WINDOW = 100          # bars per symbol in a live cycle
+INDICATOR_BARS = 1_000
+BACKTEST_BARS = 100_000
+
+
+def synthetic_bars(n, seed=0, start="2024-01-02 14:30"):
+    """n minute bars of a random walk with consistent OHLC, indexed by UTC timestamp"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, n)))
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    spread = np.abs(rng.normal(0, 0.0005, n)) * close
+    return pd.DataFrame({
+        "open": open_,
+        "high": np.maximum(open_, close) + spread,
+        "low": np.minimum(open_, close) - spread,
+        "close": close,
+        "volume": rng.integers(100, 10_000, n),
+    }, index=pd.date_range(start, periods=n, freq="min", tz="UTC", name="timestamp"))
+
+
+def measure(fn, repeat=5, min_time=0.05):
+    """Best seconds per call over 'repeat' runs, each looping until min_time has passed"""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        if time.perf_counter() - start >= min_time:
+            break
+        number *= 2
+
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+class _ReplayCollector:
+    """Serves each symbol's next WINDOW-bar slice per call, like a live feed advancing a minute"""
+
+    def __init__(self, frames):
+        self.frames = frames
+        self.step = 0
+
+    def fetch_bars_batch(self, symbols, limit=WINDOW, chunk_size=None):
+        self.step += 1
+        return {s: self.frames[s].iloc[self.step:self.step + limit] for s in symbols}
+
+
+class _NullExecutor:
+    """Accepts signals and stop checks without touching a broker or database"""
+
+    account = SimpleNamespace(invalidate=lambda: None)
+
+    def check_risk_management(self, current_prices):
+        return []
+
+    def execute_signals(self, signals):
+        pass
+
+
+def bench_indicators():
+    from strategy.indicators import Indicators, KernelIndicators
+
+    data = synthetic_bars(INDICATOR_BARS)
+    kernels = KernelIndicators()
+    kernels.compute(data, settings.SMA_SHORT, settings.SMA_LONG, settings.RSI_PERIOD)  # JIT warm-up (numba)
+    return {
+        f"indicators.{name}": {"seconds": measure(lambda fn=fn: fn(data)), "bars": INDICATOR_BARS}
+        for name, fn in (
+            ("sma", lambda d: Indicators.sma(d, settings.SMA_LONG)),
+            ("ema", lambda d: Indicators.ema(d, settings.SMA_LONG)),
+            ("rsi", lambda d: Indicators.rsi(d, settings.RSI_PERIOD)),
+            ("atr", lambda d: Indicators.atr(d)),
+            ("macd", lambda d: Indicators.macd(d)),
+            # All six strategy indicators: pandas reference vs the fused kernel
+            ("all.pandas", lambda d: Indicators().compute(d, settings.SMA_SHORT, settings.SMA_LONG, settings.RSI_PERIOD)),
+            ("all.numpy", lambda d: kernels.compute(d, settings.SMA_SHORT, settings.SMA_LONG, settings.RSI_PERIOD)),
+        )
+    }
+
+
+def bench_signals():
+    from strategy.low_risk_swing import LowRiskSwingStrategy
+
+    data = synthetic_bars(WINDOW)
+    strategy = LowRiskSwingStrategy()
+    results = {"generate_signal": {"seconds": measure(lambda: strategy.generate_signal(data)), "bars": WINDOW}}
+
+    # Incremental path: one new bar per call on a warm stream
+    updates = 2_000
+    stream = synthetic_bars(WINDOW + updates)
+    strategy.generate_signal(stream.iloc[:WINDOW], symbol="BENCH")
+    start = time.perf_counter()
+    for i in range(1, updates + 1):
+        strategy.generate_signal(stream.iloc[i:i + WINDOW], symbol="BENCH")
+    results["generate_signal.incremental"] = {"seconds": (time.perf_counter() - start) / updates, "bars": 1}
+    return results
+
+
+def bench_cycles(sizes, cycles=3):
+    from bots.runner import TradingBot
+    from strategy.low_risk_swing import LowRiskSwingStrategy
+
+    results = {}
+    screen, screen_min = settings.SCREEN_SIGNALS, settings.SCREEN_MIN_SYMBOLS
+    settings.SCREEN_MIN_SYMBOLS = 0  # measured at every size, to find the break-even
+    for size in sizes:
+        symbols = [f"SYM{i:05d}" for i in range(size)]
+        frames = {s: synthetic_bars(WINDOW + cycles + 1, seed=i) for i, s in enumerate(symbols)}
+        # Every symbol evaluated, then only those the Screener lets through
+        for name, screened in ((f"run_cycle.{size}", False), (f"run_cycle.{size}.screened", True)):
+            settings.SCREEN_SIGNALS = screened
+            bot = TradingBot(
+                collector=_ReplayCollector(frames), strategy=LowRiskSwingStrategy(),
+                executor=_NullExecutor(), symbols=symbols
+            )
+            bot.run_cycle()  # warm-up: seeds the streaming indicators
+
+            start = time.perf_counter()
+            for _ in range(cycles):
+                bot.run_cycle()
+            seconds = (time.perf_counter() - start) / cycles
+            results[name] = {"seconds": seconds, "symbols_per_second": size / seconds}
+    settings.SCREEN_SIGNALS, settings.SCREEN_MIN_SYMBOLS = screen, screen_min
+    return results
+
+
+def bench_backtest():
+    from bots.backtester import Backtester
+
+    data = {"BENCH": synthetic_bars(BACKTEST_BARS)}
+    backtester = Backtester()
+    start = time.perf_counter()
+    backtester.simulate(backtester.prepare(data))
+    seconds = time.perf_counter() - start
+    return {"backtest": {"seconds": seconds, "bars_per_second": BACKTEST_BARS / seconds}}
+
+
+def run(sizes=CYCLE_SIZES):
+    # Nothing may leave the machine
+    settings.DISCORD_WEBHOOK_TRADES = settings.DISCORD_WEBHOOK_ALERTS = settings.DISCORD_WEBHOOK_DEBUG = None
+    settings.BAR_CACHE_ENABLED = False
+    settings.RECORD_SIGNALS = False
+
+    results = {}
+    for bench in (bench_indicators, bench_signals, lambda: bench_cycles(sizes), bench_backtest):
+        results.update(bench())
+    return {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "machine": platform.machine(),
+        },
+        "results": results,
+    }
+
+
+def compare(current, baseline, tolerance):
+    """Prints current vs baseline; returns the names that got slower than 'tolerance' allows"""
+    regressions = []
+    for name, result in current["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            continue
+        ratio = result["seconds"] / before["seconds"]
+        flag = ""
+        if ratio > 1 + tolerance:
+            regressions.append(name)
+            flag = "  <-- REGRESSION"
+        print(f"{name:<32} {before['seconds'] * 1e3:>10.3f}ms -> {result['seconds'] * 1e3:>10.3f}ms  x{ratio:.2f}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(CYCLE_SIZES), help="symbols per mocked cycle")
+    parser.add_argument("--output", default="benchmark.json", help="where to write the results")
+    parser.add_argument("--baseline", help="results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown vs baseline (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    report = run(args.sizes)
+    for name, result in report["results"].items():
+        extra = "".join(f"  {k}={v:,.0f}" for k, v in result.items() if k.endswith("per_second"))
+        print(f"{name:<32} {result['seconds'] * 1e3:>10.3f}ms{extra}")
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            print(f"❌ {len(regressions)} regression(s): {', '.join(regressions)}")
+            return 1
+        print("✅ No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+import threading
+from types import SimpleNamespace
+
+
+class AccountSnapshot:
+    """
+    Account equity and open positions held in memory.
+    Loaded with one get_account + one get_all_positions request (concurrently)
+    and served from memory until invalidated. Lookups never round-trip to
+    the broker, and a missing position is a dict miss, not a caught 404.
+
+    Our own fills are applied locally (record_fill) so the rest of a batch
+    sees them, and mark the snapshot stale so the next cycle reloads the
+    broker's numbers.
+    """
+
+    def __init__(self, client, dispatcher=None):
+        self.client = client
+        self.dispatcher = dispatcher
+        self.account = None
+        self.positions = {}
+        self.stale = True
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        """Next lookup (or begin_cycle) reloads from the broker"""
+        self.stale = True
+
+    def begin_cycle(self):
+        """Reloads if stale; called once before a batch of signals is executed"""
+        with self._lock:
+            if self.stale:
+                self._load()
+
+    def _load(self, concurrent=True):
+        fetches = [self.client.get_account, self.client.get_all_positions]
+        if concurrent and self.dispatcher:
+            account, positions = self.dispatcher.map(lambda fetch: fetch(), fetches)
+        else:
+            account, positions = [fetch() for fetch in fetches]
+
+        self.account = account
+        self.positions = {p.symbol: p for p in positions}
+        self.stale = False
+
+    def _ensure(self):
+        # May run on a dispatcher thread, so load serially rather than
+        # waiting on the (possibly busy) pool
+        if self.account is None:
+            with self._lock:
+                if self.account is None:
+                    self._load(concurrent=False)
+
+    @property
+    def portfolio_value(self):
+        self._ensure()
+        return float(self.account.portfolio_value)
+
+    def position(self, symbol):
+        """Open position for symbol, or None"""
+        self._ensure()
+        return self.positions.get(symbol)
+
+    @property
+    def exposure(self):
+        """Market value of all open positions"""
+        self._ensure()
+        return sum(float(getattr(p, 'market_value', 0) or 0) for p in list(self.positions.values()))
+
+    def record_fill(self, symbol, side, qty, price=None):
+        """Applies one of our own orders locally and marks the snapshot stale"""
+        with self._lock:
+            if side == 'buy':
+                self.positions[symbol] = SimpleNamespace(
+                    symbol=symbol, qty=str(qty), qty_available=str(qty),
+                    market_value=str(qty * price) if price else '0'
+                )
+            else:
+                self.positions.pop(symbol, None)
+            self.stale = True
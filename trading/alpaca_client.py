@@ -1,22 +1,86 @@
+import threading
+from requests.adapters import HTTPAdapter
 from alpaca.trading.client import TradingClient
 from alpaca.trading.requests import MarketOrderRequest, StopOrderRequest
 from alpaca.trading.enums import OrderSide, TimeInForce
 from config.settings import settings
+from monitoring.metrics import metrics
 from notifications.discord_logger import discord_logger
+from trading.rate_limiter import TokenBucket
+
+# Shared by every component that talks to the trading API.
+# The sustained rate leaves room for the burst, so no 60s window exceeds the limit.
+rate_limiter = TokenBucket(
+    settings.ALPACA_RATE_LIMIT - settings.ALPACA_RATE_BURST, burst=settings.ALPACA_RATE_BURST
+)
+
+_trading_client = None
+_client_lock = threading.Lock()
+
+# alpaca-py's RESTClient has no public way to size or share its HTTP
+# session, so pooling uses its private '_session' (a requests.Session,
+# checked against alpaca-py 0.43 and 0.44). Without it, clients fall back
+# to their own default session.
+
+
+def mount_pool(client, size):
+    """Gives the client's HTTP session a connection pool of 'size' connections"""
+    session = getattr(client, "_session", None)
+    if session is None:
+        print(f"{type(client).__name__} has no _session: using its default connection pool")
+        return
+    session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=size))
+
+
+def share_session(client, source):
+    """Points 'client' at the HTTP session (and connection pool) of 'source'"""
+    session = getattr(source, "_session", None)
+    if session is None or not hasattr(client, "_session"):
+        print(f"{type(client).__name__} has no _session: not sharing the trading client's connection pool")
+        return
+    client._session = session
+
+
+def get_trading_client():
+    """
+    The process-wide TradingClient. Its HTTP session keeps a connection
+    pool large enough for the order workers, so concurrent orders reuse
+    open connections instead of handshaking each time.
+    """
+    global _trading_client
+    with _client_lock:
+        if _trading_client is None:
+            client = TradingClient(
+                settings.ALPACA_API_KEY,
+                settings.ALPACA_SECRET_KEY,
+                paper=settings.ALPACA_PAPER
+            )
+            mount_pool(client, settings.ORDER_WORKERS * 2)
+            _trading_client = client
+        return _trading_client
+
+
+def throttle(endpoint):
+    """Waits for the shared rate limit, then counts the call"""
+    rate_limiter.acquire()
+    metrics.inc("api_calls_total", api="trading", endpoint=endpoint)
+
 
 class AlpacaClient:
-    def __init__(self):
-        # Initialize the modern TradingClient
-        self.client = TradingClient(
-            settings.ALPACA_API_KEY,
-            settings.ALPACA_SECRET_KEY,
-            paper=settings.ALPACA_PAPER
-        )
+    def __init__(self, client=None):
+        # One shared TradingClient (and connection pool) per process
+        self.client = client or get_trading_client()
 
     def get_account(self):
         """Get account information"""
+        throttle("account")
         return self.client.get_account()
 
+    def get_all_positions(self):
+        """All open positions in one request"""
+        throttle("positions")
+        return self.client.get_all_positions()
+
     def get_portfolio_value(self):
         """Get current total equity"""
         account = self.get_account()
@@ -24,12 +88,14 @@ class AlpacaClient:
 
     def get_position(self, symbol):
         """Get current position for symbol. Returns None if no position."""
+        throttle("position")
         try:
             # alpaca-py throws an APIError if position doesn't exist
             return self.client.get_open_position(symbol)
         except Exception:
             return None
 
+    @metrics.timed("stage_seconds", stage="submit_order")
     def submit_order(self, symbol, qty, side, order_type='market', stop_loss_price=None):
         """
         Submit order using modern Request objects.
@@ -62,6 +128,7 @@ class AlpacaClient:
 
             # 3. Submit
             if order_request:
+                throttle("orders")
                 order = self.client.submit_order(order_request)
                 
                 # Log success
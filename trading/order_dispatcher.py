@@ -0,0 +1,42 @@
+from concurrent.futures import ThreadPoolExecutor
+from config.settings import settings
+from notifications.discord_logger import discord_logger
+
+
+class OrderDispatcher:
+    """
+    Runs independent broker calls (one per order) on a thread pool.
+    Every call still goes through AlpacaClient, so the shared token bucket
+    paces them: a burst of signals goes out as fast as the rate limit
+    allows instead of one round trip after another.
+    """
+
+    def __init__(self, max_workers=None):
+        self.pool = ThreadPoolExecutor(
+            max_workers=max_workers or settings.ORDER_WORKERS, thread_name_prefix="orders"
+        )
+
+    def submit(self, fn, *args):
+        return self.pool.submit(fn, *args)
+
+    def map(self, fn, *iterables):
+        """Runs fn over the inputs concurrently, results in input order"""
+        return list(self.pool.map(fn, *iterables))
+
+    def run_all(self, jobs):
+        """
+        Runs (label, fn, *args) jobs concurrently and waits for all of them.
+        A failing job is logged under its label and does not affect the others.
+        Returns {label: result} for the jobs that succeeded.
+        """
+        futures = [(job[0], self.pool.submit(*job[1:])) for job in jobs]
+        results = {}
+        for label, future in futures:
+            try:
+                results[label] = future.result()
+            except Exception as e:
+                discord_logger.log_error(f"Order failed for {label}: {str(e)}")
+        return results
+
+    def shutdown(self):
+        self.pool.shutdown(wait=True)
@@ -1,100 +1,165 @@
-from datetime import datetime
+import threading
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+from trading.account_snapshot import AccountSnapshot
 from trading.alpaca_client import AlpacaClient
+from trading.order_dispatcher import OrderDispatcher
+from trading.risk_engine import RiskEngine
 from config.settings import settings
 from data.storage.database import SessionLocal
 from data.storage.models import Trade
+from data.storage.write_behind import write_behind
+from monitoring.metrics import metrics
+from notifications.discord_logger import discord_logger
+
+MARKET_TZ = ZoneInfo("America/New_York")
 
 class OrderExecutor:
-    def __init__(self):
-        self.client = AlpacaClient()
+    def __init__(self, client=None, dispatcher=None, clock=None, recorder=None):
+        self.client = client or AlpacaClient()
+        self.dispatcher = dispatcher or OrderDispatcher()
+        # Trade rows are written behind the order path (see write_behind.py)
+        self.recorder = recorder or write_behind
+        self.account = AccountSnapshot(self.client, self.dispatcher)
+        self.risk = RiskEngine(self.client, pool=self.dispatcher.pool, account=self.account, recorder=self.recorder)
+
+        # Portfolio-wide limits: new entries per trading day (MAX_TRADES_PER_DAY)
+        # 'clock' returns the current UTC time (a simulated market's clock offline)
+        self.clock = clock or (lambda: datetime.now(timezone.utc))
+        self.trade_day = None
+        self.trades_today = 0
+        self._trades_lock = threading.Lock()
     
     def check_risk_management(self, current_prices):
         """Checks if we need to close positions based on Stop Loss"""
+        return self.risk.check(current_prices)
+    
+    def execute_signals(self, signals):
+        """
+        Executes a cycle's signals, a list of (symbol, signal, price, atr[, signal_time]),
+        concurrently ('signal_time' keys the recorded Signal row to flag as executed).
+        Account and positions come from the snapshot (reloaded here only if
+        stale), and all orders are out when this returns.
+        """
+        signals = [s for s in signals if s[1] != 'HOLD']
+        if not signals:
+            return
+
+        self.account.begin_cycle()
+        signals = self.admit(signals)
+        self.dispatcher.run_all([(s[0], self.execute_signal, *s) for s in signals])
+
+    def admit(self, signals):
+        """
+        Applies the portfolio-wide limits to a batch, in order. New entries
+        beyond MAX_TRADES_PER_DAY, or that would lift the value held in
+        positions above MAX_PORTFOLIO_EXPOSURE of equity, are dropped.
+        Exits are never held back.
+        """
+        self._roll_day()
+        entries = self.trades_today
+        equity = self.account.portfolio_value
+        exposure = self.account.exposure
+        size = equity * settings.MAX_POSITION_SIZE
+
+        admitted = []
+        for signal in signals:
+            symbol = signal[0]
+            if signal[1] == 'BUY' and not self.account.position(symbol):
+                if entries >= settings.MAX_TRADES_PER_DAY:
+                    self._block(symbol, "daily trade limit", f"{settings.MAX_TRADES_PER_DAY} trades today")
+                    continue
+                if exposure + size > equity * settings.MAX_PORTFOLIO_EXPOSURE:
+                    self._block(symbol, "exposure limit", f"${exposure:,.0f} of ${equity:,.0f} already invested")
+                    continue
+                entries += 1
+                exposure += size
+            admitted.append(signal)
+        return admitted
+
+    @staticmethod
+    def _block(symbol, reason, details):
+        metrics.inc("signals_blocked_total", reason=reason.replace(" ", "_"))
+        discord_logger.log_stage("Decision", f"⛔ BUY skipped: {reason} ({details})", symbol)
+
+    def now(self):
+        """Current time as the naive UTC the Trade table stores"""
+        return self.clock().astimezone(timezone.utc).replace(tzinfo=None)
+
+    def load(self):
+        """
+        Loads the open trades and today's entry count from the DB, after
+        committing anything still queued. Run once at startup: from then
+        on both are kept in memory, so the order path never waits on the DB.
+        """
+        self.risk.load()  # waits for the write-behind queue first
+
+        day = self.clock().astimezone(MARKET_TZ).date()
+        # Midnight in New York, as the naive UTC the Trade table stores
+        start = datetime.combine(day, datetime.min.time(), MARKET_TZ).astimezone(timezone.utc).replace(tzinfo=None)
         db = SessionLocal()
-        open_trades = db.query(Trade).filter(Trade.status == 'open').all()
-        executed_actions = []
+        try:
+            count = db.query(Trade).filter(Trade.entry_time >= start).count()
+        finally:
+            db.close()
+        with self._trades_lock:
+            self.trade_day, self.trades_today = day, count
 
-        for trade in open_trades:
-            symbol = trade.symbol
-            if symbol not in current_prices:
-                continue
-                
-            price = current_prices[symbol]
-            
-            # Check Stop Loss
-            if price <= float(trade.stop_loss):
-                # STRICT TYPING: Convert DB Decimal to float
-                qty = float(trade.quantity)
-                
-                print(f"🛑 STOP LOSS triggered for {symbol} at ${price}")
-                self.client.submit_order(symbol, qty, 'sell')
-                
-                # Update DB
-                trade.status = 'closed_sl'
-                trade.exit_price = price
-                trade.exit_time = datetime.utcnow()
-                executed_actions.append(f"Sold {symbol} (Stop Loss)")
-            
-        if executed_actions:
-            db.commit()
-        db.close()
-        
-        return executed_actions
-    
-    def execute_signal(self, symbol, signal, current_price, atr):
+    def _roll_day(self):
+        """Resets the entry count when the trading day changes (loads it first if load() was not run)"""
+        if self.trade_day is None:
+            self.load()
+        day = self.clock().astimezone(MARKET_TZ).date()
+        if day == self.trade_day:
+            return
+
+        # Every entry goes through admit(), so none were made yet on the new day
+        with self._trades_lock:
+            self.trade_day, self.trades_today = day, 0
+
+    def execute_signal(self, symbol, signal, current_price, atr, signal_time=None):
         """Execute Buy/Sell based on strategy signal"""
         if signal == 'HOLD':
             return
         
-        # Check existing position
-        position = self.client.get_position(symbol)
+        # Check existing position (from the in-memory snapshot)
+        position = self.account.position(symbol)
         
         if signal == 'BUY' and not position:
             # 1. Calculate Size
-            portfolio_value = self.client.get_portfolio_value()
+            portfolio_value = self.account.portfolio_value
             max_risk = portfolio_value * settings.MAX_POSITION_SIZE
             qty = int(max_risk / current_price)
             
             if qty < 1: return
 
-            # 2. Calculate Stop Loss Price
-            stop_loss = current_price - (atr * 2.0)
+            # 2. Calculate Stop Loss Price (same rule as the backtester)
+            stop_loss = current_price - (atr * settings.STOP_LOSS_ATR_MULTIPLIER)
 
             # 3. Submit Market Buy
             order = self.client.submit_order(symbol, qty, 'buy')
             
             if order:
+                self.account.record_fill(symbol, 'buy', qty, current_price)
+                with self._trades_lock:
+                    self.trades_today += 1
+
                 # 4. Optional: Submit a server-side Stop Loss order immediately
                 # self.client.submit_order(symbol, qty, 'sell', order_type='stop', stop_loss_price=stop_loss)
                 
-                # 5. Record in Database
-                db = SessionLocal()
-                trade = Trade(
-                    symbol=symbol,
-                    side='buy',
-                    quantity=qty,
-                    entry_price=current_price,
-                    stop_loss=stop_loss,
-                    status='open'
-                )
-                db.add(trade)
-                db.commit()
-                db.close()
+                # 5. Record in Database (queued; committed in the background)
+                self.recorder.open_trade(symbol, 'buy', qty, current_price, stop_loss, entry_time=self.now())
+                self.recorder.mark_executed(symbol, signal, signal_time)
+                self.risk.track(symbol, stop_loss, qty)
         
         elif signal == 'SELL' and position:
             # Alpaca-py returns strings for qty_available, convert to float
             qty = float(position.qty_available)
             if qty > 0:
-                self.client.submit_order(symbol, qty, 'sell')
+                if self.client.submit_order(symbol, qty, 'sell'):
+                    self.account.record_fill(symbol, 'sell', qty)
+                    self.recorder.mark_executed(symbol, signal, signal_time)
                 
-                # Close in Database
-                db = SessionLocal()
-                trade = db.query(Trade).filter(
-                    Trade.symbol == symbol, Trade.status == 'open'
-                ).first()
-                if trade:
-                    trade.status = 'closed'
-                    trade.exit_price = current_price
-                    trade.exit_time = datetime.utcnow()
-                    db.commit()
-                db.close()
\ No newline at end of file
+                # Close in Database (queued; committed in the background)
+                self.recorder.close_trade(symbol, 'closed', current_price, exit_time=self.now())
+                self.risk.untrack([symbol])
\ No newline at end of file
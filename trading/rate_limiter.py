@@ -0,0 +1,31 @@
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket. acquire() blocks until a token is available,
+    so callers on any thread share one request budget.
+    'rate_per_minute' is the sustained rate, 'burst' how many calls may go
+    out back to back after an idle period.
+    """
+
+    def __init__(self, rate_per_minute, burst=1):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Takes one token, sleeping just long enough if the bucket is empty"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
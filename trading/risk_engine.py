@@ -0,0 +1,136 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import numpy as np
+from data.storage.database import SessionLocal
+from data.storage.models import Trade
+from data.storage.write_behind import write_behind
+
+
+class RiskEngine:
+    """
+    Keeps an in-memory index of open trades (symbol, stop, qty) and checks
+    every stop against the latest prices in one vectorized comparison.
+    Our own entries and exits update the index directly (track/untrack);
+    it is loaded from the DB only at start (load(), from OrderExecutor.load)
+    and after mark_dirty().
+    """
+
+    def __init__(self, client, pool=None, account=None, max_workers=8, recorder=None):
+        self.client = client
+        self.account = account  # AccountSnapshot to update after exits
+        self.pool = pool or ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="risk-exit")
+        self.recorder = recorder or write_behind
+
+        self.symbols = np.empty(0, dtype=object)
+        self.stops = np.empty(0)
+        self.quantities = np.empty(0)
+        self.index = {}  # symbol -> row numbers in the arrays above
+        self._dirty = True
+        self._lock = threading.Lock()
+
+    def mark_dirty(self):
+        """
+        Call after something other than this process opens or closes a
+        trade. The next check reloads the index, which waits for the
+        write-behind queue: prefer calling load() off the order path.
+        """
+        self._dirty = True
+
+    def refresh(self):
+        """Reloads open trades from the DB if the index is stale (normally only before load() has run)"""
+        if self._dirty:
+            self.load()
+
+    def load(self):
+        """Loads the open trades from the DB into the index"""
+        # Trades still waiting in the write-behind queue must be in the DB first
+        self.recorder.sync()
+        db = SessionLocal()
+        try:
+            rows = db.query(Trade.symbol, Trade.stop_loss, Trade.quantity).filter(
+                Trade.status == 'open'
+            ).all()
+        finally:
+            db.close()
+
+        with self._lock:
+            self._set_rows(
+                np.array([r.symbol for r in rows], dtype=object),
+                np.array([r.stop_loss if r.stop_loss is not None else np.nan for r in rows], dtype=np.float64),
+                np.array([float(r.quantity) for r in rows], dtype=np.float64),
+            )
+            self._dirty = False
+
+    def track(self, symbol, stop, qty):
+        """Adds a trade we just opened"""
+        self.refresh()
+        with self._lock:
+            self._set_rows(
+                np.append(self.symbols, np.array([symbol], dtype=object)),
+                np.append(self.stops, stop if stop is not None else np.nan),
+                np.append(self.quantities, float(qty)),
+            )
+
+    def untrack(self, symbols):
+        """Drops the trades of symbols we just closed"""
+        with self._lock:
+            keep = ~np.isin(self.symbols, list(symbols))
+            self._set_rows(self.symbols[keep], self.stops[keep], self.quantities[keep])
+
+    def _set_rows(self, symbols, stops, quantities):
+        # Arrays are replaced, never modified, so a running check() keeps a consistent view
+        index = {}
+        for i, symbol in enumerate(symbols):
+            index.setdefault(symbol, []).append(i)
+        self.symbols, self.stops, self.quantities, self.index = symbols, stops, quantities, index
+
+    def check(self, current_prices):
+        """
+        Closes every open trade whose price is at or below its stop.
+        'current_prices' maps symbol -> latest price (dict or Series).
+        Returns a list of action descriptions.
+        """
+        self.refresh()
+        with self._lock:
+            symbols, stops, quantities, index = self.symbols, self.stops, self.quantities, self.index
+        if not len(symbols):
+            return []
+
+        # One comparison for all positions; missing prices (NaN) never trigger.
+        # A single streamed bar only touches its own symbol's rows.
+        if len(current_prices) < len(index):
+            rows = [i for s in current_prices.keys() for i in index.get(s, ())]
+            if not rows:
+                return []
+            rows = np.array(rows, dtype=np.intp)
+            prices = np.full(len(symbols), np.nan)
+            prices[rows] = [current_prices[s] for s in symbols[rows]]
+        else:
+            prices = np.array([current_prices.get(s, np.nan) for s in symbols], dtype=np.float64)
+        triggered = np.flatnonzero(prices <= stops)
+        if not len(triggered):
+            return []
+
+        for i in triggered:
+            print(f"🛑 STOP LOSS triggered for {symbols[i]} at ${prices[i]}")
+
+        # Submit all exits concurrently
+        orders = list(self.pool.map(
+            lambda i: self.client.submit_order(symbols[i], quantities[i], 'sell'),
+            triggered
+        ))
+        filled = [i for i, order in zip(triggered, orders) if order]
+        if not filled:
+            return []
+
+        if self.account:
+            for i in filled:
+                self.account.record_fill(symbols[i], 'sell', quantities[i])
+
+        # Closed through the write-behind queue: no DB round trip here
+        now = datetime.utcnow()
+        for i in filled:
+            self.recorder.close_trade(symbols[i], 'closed_sl', float(prices[i]), now)
+        self.untrack({symbols[i] for i in filled})
+        return [f"Sold {symbols[i]} (Stop Loss)" for i in filled]
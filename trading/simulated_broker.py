@@ -0,0 +1,119 @@
+import itertools
+import threading
+from types import SimpleNamespace
+
+
+class SimulatedBroker:
+    """
+    AlpacaClient's surface backed by a SimulatedMarket instead of the API.
+    Market orders fill immediately at the latest close, moved against us by
+    'slippage_bps'. Stop orders rest until a later bar's low reaches the
+    stop, then fill at the stop (or the open, if it gapped through), less
+    slippage. Long only, cash account: orders that need more cash or shares
+    than we have are rejected (None), as AlpacaClient does on failure.
+    """
+
+    def __init__(self, market, cash=100_000.0, slippage_bps=5.0):
+        self.market = market
+        self.cash = float(cash)
+        self.slippage = slippage_bps / 10_000
+        self.positions = {}    # symbol -> [qty, avg_entry_price]
+        self.stop_orders = []  # resting stop orders
+        self.fills = []
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        market.listeners.append(self._trigger_stops)
+
+    # ------------------------------------------------------------- account
+
+    def get_account(self):
+        equity = self.get_portfolio_value()
+        return SimpleNamespace(
+            cash=str(self.cash), portfolio_value=str(equity), equity=str(equity), buying_power=str(self.cash)
+        )
+
+    def get_portfolio_value(self):
+        with self._lock:
+            return self.cash + sum(
+                qty * (self.market.price(symbol) or price) for symbol, (qty, price) in self.positions.items()
+            )
+
+    def get_all_positions(self):
+        with self._lock:
+            return [self._position(symbol) for symbol in self.positions]
+
+    def get_position(self, symbol):
+        with self._lock:
+            return self._position(symbol) if symbol in self.positions else None
+
+    def _position(self, symbol):
+        qty, avg_price = self.positions[symbol]
+        price = self.market.price(symbol) or avg_price
+        return SimpleNamespace(
+            symbol=symbol, qty=str(qty), qty_available=str(qty), avg_entry_price=str(avg_price),
+            current_price=str(price), market_value=str(qty * price),
+            unrealized_pl=str(qty * (price - avg_price)),
+        )
+
+    # -------------------------------------------------------------- orders
+
+    def submit_order(self, symbol, qty, side, order_type='market', stop_loss_price=None):
+        side = side.lower()
+        with self._lock:
+            if order_type == 'stop':
+                if not stop_loss_price:
+                    return None
+                order = self._order(symbol, qty, side, 'accepted', stop_price=stop_loss_price)
+                self.stop_orders.append(order)
+                return order
+
+            price = self.market.price(symbol)
+            if price is None:
+                return None
+            return self._fill(self._order(symbol, qty, side, 'new'), price)
+
+    def _order(self, symbol, qty, side, status, stop_price=None):
+        return SimpleNamespace(
+            id=next(self._ids), symbol=symbol, qty=float(qty), side=side, status=status,
+            stop_price=stop_price, filled_avg_price=None, filled_at=None,
+        )
+
+    def _fill(self, order, price):
+        """Fills 'order' at 'price' plus slippage; None if cash or shares are short"""
+        price *= 1 + self.slippage if order.side == 'buy' else 1 - self.slippage
+        held, avg_price = self.positions.get(order.symbol, (0.0, 0.0))
+
+        if order.side == 'buy':
+            cost = order.qty * price
+            if cost > self.cash:
+                return None
+            self.cash -= cost
+            self.positions[order.symbol] = [held + order.qty, (held * avg_price + cost) / (held + order.qty)]
+        else:
+            if order.qty > held + 1e-9:
+                return None
+            self.cash += order.qty * price
+            if held - order.qty > 1e-9:
+                self.positions[order.symbol][0] = held - order.qty
+            else:
+                self.positions.pop(order.symbol)
+
+        order.status = 'filled'
+        order.filled_avg_price = price
+        order.filled_at = self.market.now
+        self.fills.append(order)
+        return order
+
+    def _trigger_stops(self, previous_ns, now_ns):
+        """Market listener: fills resting stops hit by the bars that just became visible"""
+        with self._lock:
+            resting = []
+            for order in self.stop_orders:
+                bars = self.market.bars_between(order.symbol, previous_ns, now_ns)
+                hit = (bars["low"].values <= order.stop_price).nonzero()[0] if len(bars) else []
+                if len(hit):
+                    bar = bars.iloc[hit[0]]
+                    self._fill(order, min(float(bar["open"]), order.stop_price))
+                else:
+                    resting.append(order)
+            self.stop_orders = resting